@@ -1,5 +1,11 @@
 from flask import Blueprint, request, jsonify
 from backend.db_connection import db
+from backend.admin.suspension_expiry import run_expiry_sweep, get_expiry_metrics
+from backend.transactions.transaction_archive import run_archive, get_archive_metrics
+from backend.admin.suspension_cascade import SUSPENSION_TYPES, suspend_students
+from backend.db_connection.query_profiler import get_profile, reset_profile
+from backend.events.outbox import record_event
+from backend.events.dispatcher import get_dispatcher_status, read_settled, run_dispatch_cycle
 
 admins = Blueprint('admins', __name__)
 
@@ -175,59 +181,116 @@ def create_suspension():
         data = request.get_json()
         
         stu_id = data.get("stuId")  # Fixed: was "studId"
-        suspension_type = data.get("type", "temporary")
+        suspension_type = data.get("type", "temp")
         report_id = data.get("reportId")
         end_date = data.get("endDate")
         
-        if not stu_id:
+        if stu_id is None:
             return jsonify({"error": "stuId is required"}), 400
+        if not isinstance(stu_id, int) or isinstance(stu_id, bool):
+            return jsonify({"error": "stuId must be an integer"}), 400
+        if suspension_type not in SUSPENSION_TYPES:
+            return jsonify({"error": f"type must be one of: {list(SUSPENSION_TYPES)}"}), 400
         
-        cursor = db.get_db().cursor()
-
-        cursor.execute("SELECT * FROM student WHERE stuId = %s", (stu_id,))  # Fixed: was "studId"
-        student = cursor.fetchone()
+        result = suspend_students(db.get_db(), [stu_id], suspension_type, report_id, end_date)
         
-        if student is None:
-            cursor.close()
+        if not result["suspended"]:
             return jsonify({"error": "Student not found"}), 404
-        
-        insert_query = """
-            INSERT INTO suspension (stuId, reportId, type, startDate, endDate)
-            VALUES (%s, %s, %s, CURRENT_TIMESTAMP, %s)
-        """
-        cursor.execute(insert_query, (stu_id, report_id, suspension_type, end_date))
 
-        cursor.execute(
-            "UPDATE student SET accountStatus = 'suspended' WHERE stuId = %s",
-            (stu_id,)
-        )
+        return jsonify({
+            "message": "Suspension created successfully",
+            "suspensionId": result["suspensionIds"][0],
+            "stages": result["stages"]
+        }), 201
+    
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        cursor.execute(
-            "UPDATE listing SET listingStatus = 'removed' WHERE providerId = %s AND listingStatus = 'active'",
-            (stu_id,)
-        )
 
-        cursor.execute("""
-            UPDATE transact t
-            JOIN listing l ON t.listId = l.listingId
-            SET t.transactStatus = 'cancelled'
-            WHERE l.providerId = %s AND t.transactStatus IN ('requested', 'confirmed')
-        """, (stu_id,))
+@admins.route("/suspensions/bulk", methods=["POST"])
+def create_bulk_suspension():
+    """Suspend many students in one request and one DB transaction"""
+    try:
+        data = request.get_json()
         
-        db.get_db().commit()
-
-        suspension_id = cursor.lastrowid
-        cursor.close()
+        stu_ids = data.get("stuIds")
+        suspension_type = data.get("type", "temp")
+        report_id = data.get("reportId")
+        end_date = data.get("endDate")
+        
+        if not stu_ids or not isinstance(stu_ids, list):
+            return jsonify({"error": "stuIds array is required"}), 400
+        if not all(isinstance(s, int) and not isinstance(s, bool) for s in stu_ids):
+            return jsonify({"error": "stuIds must be integers"}), 400
+        if suspension_type not in SUSPENSION_TYPES:
+            return jsonify({"error": f"type must be one of: {list(SUSPENSION_TYPES)}"}), 400
+        
+        result = suspend_students(db.get_db(), stu_ids, suspension_type, report_id, end_date)
+        
+        if not result["suspended"]:
+            return jsonify({"error": "No matching students found", "notFound": result["notFound"]}), 404
 
         return jsonify({
-            "message": "Suspension created successfully",
-            "suspensionId": suspension_id
+            "message": f'{len(result["suspended"])} students suspended successfully',
+            "suspended": result["suspended"],
+            "notFound": result["notFound"],
+            "suspensionIds": result["suspensionIds"],
+            "stages": result["stages"]
         }), 201
     
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@admins.route("/suspensions/expiry", methods=["GET"])
+def get_suspension_expiry_status():
+    """Counters for the background suspension expiry job"""
+    try:
+        return jsonify(get_expiry_metrics()), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@admins.route("/suspensions/expiry", methods=["POST"])
+def run_suspension_expiry():
+    """Run an expiry sweep now instead of waiting for the scheduler"""
+    try:
+        data = request.get_json(silent=True) or {}
+        summary = run_expiry_sweep(
+            batch_size=data.get("batchSize"),
+            restore_listings=data.get("restoreListings")
+        )
+        return jsonify(summary), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@admins.route("/transactions/archive", methods=["GET"])
+def get_transaction_archive_status():
+    """Counters for the background transaction archiver"""
+    try:
+        return jsonify(get_archive_metrics()), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@admins.route("/transactions/archive", methods=["POST"])
+def run_transaction_archive():
+    """Archive old bookings now instead of waiting for the scheduler"""
+    try:
+        data = request.get_json(silent=True) or {}
+        summary = run_archive(
+            batch_size=data.get("batchSize"),
+            retention_days=data.get("retentionDays"),
+            max_batches=data.get("maxBatches")
+        )
+        if summary is None:
+            return jsonify({"error": "An archive run is already in progress"}), 409
+        return jsonify(summary), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @admins.route("/suspensions/<int:suspension_id>", methods=["GET"])
 def get_suspension_by_id(suspension_id):
     try:
@@ -293,13 +356,13 @@ def update_suspension(suspension_id):
             params.append(data["endDate"])
         
         if "type" in data:
-            if data["type"] not in ["temporary", "permanent"]:
+            if data["type"] not in SUSPENSION_TYPES:
                 cursor.close()
-                return jsonify({"error": "Type must be 'temporary' or 'permanent'"}), 400
+                return jsonify({"error": f"type must be one of: {list(SUSPENSION_TYPES)}"}), 400
             updates.append("type = %s")
             params.append(data["type"])
             
-            if data["type"] == "permanent":
+            if data["type"] == "perm":
                 updates.append("endDate = NULL")
         
         if not updates:
@@ -310,6 +373,11 @@ def update_suspension(suspension_id):
         params.append(suspension_id)
         
         cursor.execute(query, params)
+        record_event(cursor, "suspension.updated", "student", suspension["stuId"], {
+            "suspensionId": suspension_id,
+            "type": data.get("type", suspension["type"]),
+            "endDate": None if data.get("type") == "perm" else data.get("endDate", suspension["endDate"])
+        })
         db.get_db().commit()
         cursor.close()
         
@@ -361,6 +429,10 @@ def lift_suspension(suspension_id):
                 (stu_id,)
             )
         
+        record_event(cursor, "suspension.lifted", "student", stu_id, {
+            "suspensionId": suspension_id,
+            "reactivated": result["active_count"] == 0
+        })
         db.get_db().commit()
         cursor.close()
         
@@ -371,4 +443,86 @@ def lift_suspension(suspension_id):
         }), 200
         
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+
+# ---------------
+# EVENT ROUTES
+# ---------------
+
+@admins.route("/events", methods=["GET"])
+def get_events():
+    """
+    Read the outbox event stream in order, for consumers outside the API.
+    Query params: after (last eventId processed, default 0), limit (max 1000),
+    type (repeatable event type filter). Pass nextAfter as the next after.
+    """
+    try:
+        after = int(request.args.get("after", "0"))
+        limit = min(int(request.args.get("limit", "100")), 1000)
+        event_types = request.args.getlist("type")
+
+        # Read from the primary so pollers see events as soon as they commit
+        cursor = db.primary.get_db().cursor()
+        events, next_after = read_settled(cursor, after, limit, event_types)
+        cursor.close()
+
+        return jsonify({
+            "events": [
+                {
+                    "eventId": e.event_id,
+                    "eventType": e.event_type,
+                    "entity": e.entity,
+                    "entityId": e.entity_id,
+                    "payload": e.payload,
+                    "createDate": e.created.isoformat()
+                }
+                for e in events
+            ],
+            "nextAfter": next_after
+        }), 200
+    except ValueError:
+        return jsonify({"error": "after and limit must be integers"}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@admins.route("/events/dispatcher", methods=["GET"])
+def get_event_dispatcher_status():
+    """Dispatcher counters and each consumer's offset and lag"""
+    try:
+        return jsonify(get_dispatcher_status()), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@admins.route("/events/dispatcher", methods=["POST"])
+def run_event_dispatch():
+    """Deliver pending events now instead of waiting for the dispatcher thread"""
+    try:
+        return jsonify(run_dispatch_cycle()), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# ---------------
+# DEBUG ROUTES
+# ---------------
+
+@admins.route("/debug/queries", methods=["GET"])
+def get_query_profile():
+    """Per-route SQL timing, top statement fingerprints and recent slow queries"""
+    try:
+        limit = int(request.args.get("limit", "50"))
+        return jsonify(get_profile(limit)), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@admins.route("/debug/queries", methods=["DELETE"])
+def clear_query_profile():
+    try:
+        reset_profile()
+        return jsonify({"message": "Query profile cleared"}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
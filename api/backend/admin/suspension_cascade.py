@@ -0,0 +1,202 @@
+#------------------------------------------------------------
+# Set-based suspension cascade.
+#
+# Suspending a student touches four tables: suspension, student,
+# listing and transact. Doing that one statement and one student
+# at a time under REPEATABLE READ holds gap locks on large listing
+# and transact ranges. This module applies the whole cascade for
+# many students at once:
+#   * rows are locked in one global order (student -> listing ->
+#     transact, ascending primary keys) so concurrent cascades
+#     queue instead of deadlocking
+#   * each stage is a single multi-row statement per chunk
+#   * the transaction runs under READ COMMITTED so only the rows
+#     actually changed stay locked
+# The same transaction writes one student.suspended outbox event
+# per student ("this provider's listings were removed") and one
+# transaction.status_changed per cancelled booking, so consumers
+# keyed on booking events (availability index, buyer affinity)
+# see the cancellations too.
+#------------------------------------------------------------
+import time
+
+from backend.events.outbox import record_events
+
+
+# Max ids per IN (...) list
+CHUNK_SIZE = 500
+
+# Bookings the cascade cancels
+OPEN_STATUSES = ("requested", "confirmed")
+
+# Values of suspension.type
+SUSPENSION_TYPES = ("temp", "perm")
+
+
+def _chunks(ids, size=CHUNK_SIZE):
+    for i in range(0, len(ids), size):
+        yield ids[i:i + size]
+
+
+def _placeholders(ids):
+    return ", ".join(["%s"] * len(ids))
+
+
+def _stage(stages, name, started, rows):
+    stages[name] = {
+        "rows": rows,
+        "ms": round((time.perf_counter() - started) * 1000, 3)
+    }
+
+
+def suspend_students(conn, stu_ids, suspension_type="temp", report_id=None, end_date=None):
+    """
+    Suspend every student in stu_ids in a single DB transaction.
+
+    Returns a dict with the suspended and missing student ids, the new
+    suspension ids and the affected row count/time for each stage.
+    The caller owns the connection; this function commits or rolls back.
+    """
+    stu_ids = sorted({int(s) for s in stu_ids})
+    stages = {}
+    result = {
+        "suspended": [],
+        "notFound": [],
+        "suspensionIds": [],
+        "stages": stages
+    }
+
+    if not stu_ids:
+        return result
+
+    cursor = conn.cursor()
+    try:
+        # Must be issued before the transaction's first statement
+        cursor.execute("SET TRANSACTION ISOLATION LEVEL READ COMMITTED")
+
+        # Stage 1: lock the student rows in primary-key order
+        started = time.perf_counter()
+        found = []
+        for chunk in _chunks(stu_ids):
+            cursor.execute(
+                f"SELECT stuId FROM student WHERE stuId IN ({_placeholders(chunk)}) "
+                f"ORDER BY stuId FOR UPDATE",
+                chunk
+            )
+            found.extend(row["stuId"] for row in cursor.fetchall())
+        _stage(stages, "lock_students", started, len(found))
+
+        found_set = set(found)
+        result["notFound"] = [s for s in stu_ids if s not in found_set]
+        if not found:
+            conn.rollback()
+            return result
+
+        # Stage 2: one multi-row INSERT for the suspension records.
+        # Auto-increment ids of a multi-row insert are consecutive.
+        started = time.perf_counter()
+        inserted = 0
+        for chunk in _chunks(found):
+            values_sql = ", ".join(["(%s, %s, %s, CURRENT_TIMESTAMP, %s)"] * len(chunk))
+            params = []
+            for stu_id in chunk:
+                params.extend([stu_id, report_id, suspension_type, end_date])
+            cursor.execute(
+                f"INSERT INTO suspension (stuId, reportId, type, startDate, endDate) VALUES {values_sql}",
+                params
+            )
+            first_id = cursor.lastrowid
+            result["suspensionIds"].extend(range(first_id, first_id + cursor.rowcount))
+            inserted += cursor.rowcount
+        _stage(stages, "insert_suspensions", started, inserted)
+
+        # Stage 3: flip account status
+        started = time.perf_counter()
+        updated = 0
+        for chunk in _chunks(found):
+            cursor.execute(
+                f"UPDATE student SET accountStatus = 'suspended' WHERE stuId IN ({_placeholders(chunk)})",
+                chunk
+            )
+            updated += cursor.rowcount
+        _stage(stages, "update_students", started, updated)
+
+        # Stage 4: remove the providers' active listings
+        started = time.perf_counter()
+        removed = 0
+        for chunk in _chunks(found):
+            cursor.execute(
+                f"""
+                UPDATE listing
+                SET listingStatus = 'removed',
+                    lastUpdate = NOW()
+                WHERE providerId IN ({_placeholders(chunk)})
+                  AND listingStatus = 'active'
+                ORDER BY listingId
+                """,
+                chunk
+            )
+            removed += cursor.rowcount
+        _stage(stages, "remove_listings", started, removed)
+
+        # Stage 5: cancel open bookings on any of their listings. The rows
+        # are read (and locked, in transactId order) first so each
+        # cancellation can be recorded with its previous status.
+        started = time.perf_counter()
+        open_bookings = []
+        for chunk in _chunks(found):
+            cursor.execute(
+                f"""
+                SELECT t.transactId, t.transactStatus, t.version, t.buyerId, t.listId
+                FROM transact t
+                JOIN listing l ON t.listId = l.listingId
+                WHERE l.providerId IN ({_placeholders(chunk)})
+                  AND t.transactStatus IN ({_placeholders(OPEN_STATUSES)})
+                ORDER BY t.transactId
+                FOR UPDATE OF t
+                """,
+                chunk + list(OPEN_STATUSES)
+            )
+            open_bookings.extend(cursor.fetchall())
+
+        cancelled = 0
+        for chunk in _chunks([row["transactId"] for row in open_bookings]):
+            cursor.execute(
+                f"""
+                UPDATE transact
+                SET transactStatus = 'cancelled',
+                    version = version + 1
+                WHERE transactId IN ({_placeholders(chunk)})
+                """,
+                chunk
+            )
+            cancelled += cursor.rowcount
+        _stage(stages, "cancel_transactions", started, cancelled)
+
+        # Stage 6: outbox events, one per suspended student and one per
+        # cancelled booking
+        started = time.perf_counter()
+        events = [
+            ("student.suspended", "student", stu_id,
+             {"suspensionId": suspension_id, "type": suspension_type, "endDate": end_date,
+              "cascade": True})
+            for stu_id, suspension_id in zip(found, result["suspensionIds"])
+        ]
+        events.extend(
+            ("transaction.status_changed", "transaction", row["transactId"],
+             {"from": row["transactStatus"], "to": "cancelled", "version": row["version"] + 1,
+              "buyerId": row["buyerId"], "listId": row["listId"]})
+            for row in open_bookings
+        )
+        recorded = record_events(cursor, events)
+        _stage(stages, "record_events", started, recorded)
+
+        conn.commit()
+        result["suspended"] = found
+        return result
+
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
@@ -0,0 +1,264 @@
+#------------------------------------------------------------
+# Background job that expires temporary suspensions.
+#
+# Suspension status is only computed on read (see
+# get_all_suspensions), so a student whose temp suspension has
+# ended would stay 'suspended' until an admin lifts it by hand.
+# Each sweep selects, through idx_suspension_end, students still
+# marked suspended whose suspensions have all ended, reactivates
+# them in batches and, optionally, restores the listings that
+# create_suspension() removed. The query itself says what is due,
+# so a suspension created already expired or shortened by a PUT
+# is picked up by the next sweep.
+#------------------------------------------------------------
+import os
+import threading
+import time
+from datetime import datetime
+
+from backend.db_connection import db
+from backend.events.outbox import record_event
+from backend.metrics.metrics import register_collector
+
+
+# Sweep settings, overridable from the .env file
+DEFAULT_INTERVAL_SECONDS = 60
+DEFAULT_BATCH_SIZE = 200
+
+_state_lock = threading.Lock()
+_stop_event = threading.Event()
+_worker = None
+_metrics = {
+    "runs": 0,
+    "last_run_at": None,
+    "last_run_seconds": 0.0,
+    "last_error": None,
+    "suspensions_scanned": 0,
+    "students_reactivated": 0,
+    "listings_restored": 0,
+    "last_batch_rows_per_second": 0.0,
+    "max_lag_seconds": 0.0,
+}
+
+
+def _due_suspensions(cursor, batch_size):
+    """
+    Next batch of students still marked suspended whose suspensions have
+    all ended, each with its most recently ended suspension. A 'perm'
+    suspension never ends, whatever its endDate.
+    """
+    cursor.execute("""
+        SELECT s.suspensionId, s.stuId, s.startDate, s.endDate
+        FROM suspension s
+        JOIN student st ON st.stuId = s.stuId
+        WHERE s.type = 'temp'
+          AND s.endDate <= NOW()
+          AND st.accountStatus = 'suspended'
+          AND NOT EXISTS (
+              SELECT 1
+              FROM suspension active
+              WHERE active.stuId = s.stuId
+                AND (active.type = 'perm' OR active.endDate IS NULL OR active.endDate > NOW())
+          )
+          AND NOT EXISTS (
+              SELECT 1
+              FROM suspension later
+              WHERE later.stuId = s.stuId
+                AND later.endDate <= NOW()
+                AND (later.endDate > s.endDate
+                     OR (later.endDate = s.endDate AND later.suspensionId > s.suspensionId))
+          )
+        ORDER BY s.endDate, s.suspensionId
+        LIMIT %s
+    """, (batch_size,))
+    return cursor.fetchall()
+
+
+def _expire_batch(conn, rows, restore_listings):
+    """Reactivate the students in one batch inside a single DB transaction"""
+    cursor = conn.cursor()
+    reactivated = 0
+    restored = 0
+
+    try:
+        for row in rows:
+            # Skip students that are still covered by another suspension
+            cursor.execute("""
+                SELECT COUNT(*) AS active_count
+                FROM suspension
+                WHERE stuId = %s
+                  AND (type = 'perm' OR endDate IS NULL OR endDate > NOW())
+            """, (row["stuId"],))
+            if cursor.fetchone()["active_count"] > 0:
+                continue
+
+            cursor.execute("""
+                UPDATE student
+                SET accountStatus = 'active'
+                WHERE stuId = %s AND accountStatus = 'suspended'
+            """, (row["stuId"],))
+
+            if cursor.rowcount == 0:
+                continue
+            reactivated += cursor.rowcount
+
+            # Only listings removed by the suspension cascade are restored;
+            # create_suspension() stamps lastUpdate when it removes them.
+            if restore_listings:
+                cursor.execute("""
+                    UPDATE listing
+                    SET listingStatus = 'active',
+                        lastUpdate = NOW()
+                    WHERE providerId = %s
+                      AND listingStatus = 'removed'
+                      AND lastUpdate >= %s
+                """, (row["stuId"], row["startDate"]))
+                restored += cursor.rowcount
+
+            record_event(cursor, "student.reactivated", "student", row["stuId"], {
+                "suspensionId": row["suspensionId"],
+                "listingsRestored": restore_listings
+            })
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    return reactivated, restored
+
+
+def run_expiry_sweep(batch_size=None, restore_listings=None):
+    """
+    Reactivate every student whose suspensions have all ended.
+    Must be called inside an app context. Returns the sweep summary.
+    """
+    if batch_size is None:
+        batch_size = int(os.getenv("SUSPENSION_EXPIRY_BATCH_SIZE", DEFAULT_BATCH_SIZE))
+    if restore_listings is None:
+        restore_listings = os.getenv("SUSPENSION_EXPIRY_RESTORE_LISTINGS", "false").lower() == "true"
+
+    started = time.monotonic()
+    summary = {"scanned": 0, "reactivated": 0, "restored": 0, "batches": 0, "max_lag_seconds": 0.0}
+
+    with _state_lock:
+        conn = db.get_db()
+        while True:
+            cursor = conn.cursor()
+            rows = _due_suspensions(cursor, batch_size)
+            cursor.close()
+
+            if not rows:
+                break
+
+            batch_started = time.monotonic()
+            reactivated, restored = _expire_batch(conn, rows, restore_listings)
+            batch_seconds = time.monotonic() - batch_started
+
+            # Lag: how long the oldest suspension in this batch sat expired
+            oldest_lag = (datetime.now() - rows[0]["endDate"]).total_seconds()
+
+            summary["batches"] += 1
+            summary["scanned"] += len(rows)
+            summary["reactivated"] += reactivated
+            summary["restored"] += restored
+            summary["max_lag_seconds"] = max(summary["max_lag_seconds"], oldest_lag)
+
+            _metrics["last_batch_rows_per_second"] = (
+                len(rows) / batch_seconds if batch_seconds > 0 else float(len(rows))
+            )
+
+            # Rows are only due while their students stay suspended; stop
+            # rather than reselect a batch that reactivated no one
+            if len(rows) < batch_size or reactivated == 0:
+                break
+
+        _metrics["runs"] += 1
+        _metrics["last_run_at"] = datetime.now().isoformat()
+        _metrics["last_run_seconds"] = round(time.monotonic() - started, 4)
+        _metrics["last_error"] = None
+        _metrics["suspensions_scanned"] += summary["scanned"]
+        _metrics["students_reactivated"] += summary["reactivated"]
+        _metrics["listings_restored"] += summary["restored"]
+        _metrics["max_lag_seconds"] = summary["max_lag_seconds"]
+
+    return summary
+
+
+def get_expiry_metrics():
+    """Snapshot of the job counters"""
+    with _state_lock:
+        snapshot = dict(_metrics)
+        snapshot["running"] = _worker is not None and _worker.is_alive()
+    return snapshot
+
+
+def _collect_expiry_metrics():
+    snapshot = get_expiry_metrics()
+    return [
+        ("huskyhub_suspension_expiry_runs_total", "counter",
+         "Suspension expiry sweeps completed", [({}, snapshot["runs"])]),
+        ("huskyhub_suspension_expiry_reactivated_total", "counter",
+         "Students reactivated by the expiry job", [({}, snapshot["students_reactivated"])]),
+        ("huskyhub_suspension_expiry_lag_seconds", "gauge",
+         "Age of the oldest expired suspension handled by the last sweep",
+         [({}, snapshot["max_lag_seconds"])]),
+        ("huskyhub_suspension_expiry_rows_per_second", "gauge",
+         "Throughput of the last processed batch",
+         [({}, snapshot["last_batch_rows_per_second"])]),
+    ]
+
+
+register_collector(_collect_expiry_metrics)
+
+
+def _run_forever(app, interval):
+    while not _stop_event.is_set():
+        try:
+            with app.app_context():
+                try:
+                    summary = run_expiry_sweep()
+                finally:
+                    # flask-mysql only closes connections on request teardown,
+                    # so release this context's connection explicitly
+                    db.teardown_request(None)
+            if summary["scanned"]:
+                app.logger.info(
+                    f'Suspension expiry sweep: {summary["reactivated"]} students reactivated, '
+                    f'{summary["restored"]} listings restored, lag {summary["max_lag_seconds"]:.0f}s'
+                )
+        except Exception as e:
+            _metrics["last_error"] = str(e)
+            app.logger.error(f'Suspension expiry sweep failed: {str(e)}')
+        _stop_event.wait(interval)
+
+
+def start_expiry_scheduler(app):
+    """
+    Start the in-process sweep thread.
+    SUSPENSION_EXPIRY_INTERVAL (seconds) controls how often it runs; 0 disables it.
+    """
+    global _worker
+
+    interval = int(os.getenv("SUSPENSION_EXPIRY_INTERVAL", DEFAULT_INTERVAL_SECONDS))
+    if interval <= 0:
+        app.logger.info("Suspension expiry scheduler disabled")
+        return None
+
+    if _worker is not None and _worker.is_alive():
+        return _worker
+
+    _stop_event.clear()
+    _worker = threading.Thread(
+        target=_run_forever, args=(app, interval),
+        name="suspension-expiry", daemon=True
+    )
+    _worker.start()
+    app.logger.info(f"Suspension expiry scheduler started (every {interval}s)")
+    return _worker
+
+
+def stop_expiry_scheduler():
+    _stop_event.set()
@@ -0,0 +1,217 @@
+#------------------------------------------------------------
+# Global availability index for "who is available when".
+#
+# GET /listings?availableFrom=...&availableTo=... needs the
+# listings with a free slot overlapping a window. Scanning every
+# slot of every listing per search grows with the whole table,
+# so free future slots are bucketed by day instead:
+#
+#   days[d] = (start, end, listing) arrays of the free slots
+#             touching day d, sorted by start
+#
+# A window visits only its own days; in each bucket the slots
+# starting before the window ends are a prefix (one
+# searchsorted), of which those ending after it starts match.
+# A slot spanning several days sits in each of their buckets.
+#
+# A slot is free unless a confirmed booking of its listing
+# starts inside it (the same rule as the provider calendar, see
+# intervals.py). Slots that already ended are left out.
+#
+# The index is a snapshot kept by a SnapshotManager (see
+# backend/events/snapshots.py). Availability and booking outbox
+# events re-select the touched listings' slots and bookings and
+# swap in a copy with only their day buckets rebuilt. A full
+# rebuild runs on first use and in the background once the
+# index is older than AVAILABILITY_INDEX_REBUILD_SECONDS, which
+# also drops past slots.
+#------------------------------------------------------------
+import numpy as np
+
+from backend.availability import intervals
+from backend.events.dispatcher import subscribe
+from backend.events.snapshots import SnapshotManager
+from backend.metrics.metrics import register_collector
+
+
+DAY_SECONDS = 86400
+DEFAULT_REBUILD_SECONDS = 3600
+MAX_WINDOW_DAYS = 92
+
+CONSUMER = "availability_index"
+AVAILABILITY_EVENTS = ("availability.added", "availability.updated", "availability.removed")
+BOOKING_EVENTS = ("transaction.created", "transaction.status_changed")
+
+SLOT_SELECT = """
+    SELECT a.listId, a.startTime, a.endTime
+    FROM availability a
+    WHERE a.endTime > NOW()
+"""
+
+# Bookings that can take a future slot; completed ones are in the past
+BOOKING_SELECT = """
+    SELECT t.listId, t.bookDate
+    FROM transact t
+    WHERE t.transactStatus = 'confirmed'
+      AND t.bookDate >= %s
+"""
+
+_EMPTY = np.zeros(0, dtype=np.int64)
+
+
+def _free_slots(slots, bookings):
+    """(start, end, listing) arrays of the slots no booking holds"""
+    listing = np.array([slot["listId"] for slot in slots], dtype=np.int64)
+    start = intervals.to_seconds([slot["startTime"] for slot in slots])
+    end = intervals.to_seconds([slot["endTime"] for slot in slots])
+
+    taken = intervals.containing_slot(
+        listing, start, end,
+        np.array([booking["listId"] for booking in bookings], dtype=np.int64),
+        intervals.to_seconds([booking["bookDate"] for booking in bookings]),
+    )
+    free = np.ones(len(slots), dtype=np.bool_)
+    free[taken[taken >= 0]] = False
+    return start[free], end[free], listing[free]
+
+
+def _by_day(start, end, listing):
+    """{day: (start, end, listing)} with every slot in each day it touches"""
+    if len(start) == 0:
+        return {}
+    first = start // DAY_SECONDS
+    spans = (np.maximum(end - 1, start) // DAY_SECONDS) - first + 1
+    rows = np.repeat(np.arange(len(start)), spans)
+    days = np.repeat(first, spans) + (np.arange(len(rows)) - np.repeat(np.cumsum(spans) - spans, spans))
+
+    order = np.lexsort((start[rows], days))
+    rows, days = rows[order], days[order]
+    bounds = np.flatnonzero(np.append(True, days[1:] != days[:-1]))
+    buckets = {}
+    for lo, hi in zip(bounds, np.append(bounds[1:], len(rows))):
+        picked = rows[lo:hi]
+        buckets[int(days[lo])] = (start[picked], end[picked], listing[picked])
+    return buckets
+
+
+def _listing_days(buckets):
+    listing_days = {}
+    for day, (_, _, listing) in buckets.items():
+        for listing_id in np.unique(listing).tolist():
+            listing_days.setdefault(listing_id, set()).add(day)
+    return listing_days
+
+
+class SlotIndex:
+    """Free future slots bucketed by day"""
+
+    def __init__(self, days, listing_days):
+        self.days = days
+        self.listing_days = listing_days
+        self.slots = sum(len(bucket[0]) for bucket in days.values())
+
+    @classmethod
+    def build(cls, slots, bookings):
+        days = _by_day(*_free_slots(slots, bookings)) if slots else {}
+        return cls(days, _listing_days(days))
+
+    def patched(self, listing_ids, slots, bookings):
+        """A copy with the given listings' slots replaced by the re-selected ones"""
+        listing_ids = np.asarray(sorted(listing_ids), dtype=np.int64)
+        fresh = _by_day(*_free_slots(slots, bookings)) if slots else {}
+
+        days = dict(self.days)
+        listing_days = dict(self.listing_days)
+        affected = set(fresh)
+        for listing_id in listing_ids.tolist():
+            affected |= listing_days.pop(listing_id, set())
+
+        for day in affected:
+            parts = []
+            old = days.pop(day, None)
+            if old is not None:
+                keep = ~np.isin(old[2], listing_ids)
+                parts.append(tuple(column[keep] for column in old))
+            if day in fresh:
+                parts.append(fresh[day])
+            if not parts:
+                continue
+            start, end, listing = (np.concatenate(columns) for columns in zip(*parts))
+            if len(start):
+                order = np.argsort(start, kind="stable")
+                days[day] = (start[order], end[order], listing[order])
+
+        for listing_id, touched in _listing_days(fresh).items():
+            listing_days[listing_id] = touched
+        return SlotIndex(days, listing_days)
+
+    def available(self, window_start, window_end):
+        """Sorted listingIds with a free slot overlapping [window_start, window_end)"""
+        found = []
+        for day in range(window_start // DAY_SECONDS, (window_end - 1) // DAY_SECONDS + 1):
+            bucket = self.days.get(day)
+            if bucket is None:
+                continue
+            start, end, listing = bucket
+            n = np.searchsorted(start, window_end, side="left")
+            found.append(listing[:n][end[:n] > window_start])
+        return np.unique(np.concatenate(found)) if found else _EMPTY
+
+
+class AvailabilityIndex(SnapshotManager):
+    name = "availability_index"
+    label = "Availability index"
+    max_age_setting = "AVAILABILITY_INDEX_REBUILD_SECONDS"
+    default_max_age_seconds = DEFAULT_REBUILD_SECONDS
+    consumer = CONSUMER
+    size_metric = ("slots", "slots", "Free future slot entries in the availability index")
+
+    def available(self, start, end):
+        """Sorted listingIds with a free slot overlapping the datetime window"""
+        window_start, window_end = intervals.to_seconds([start, end]).tolist()
+        return self.current().available(window_start, window_end)
+
+    def _select(self, cursor, listing_ids=None):
+        """Future slots and the bookings that may hold them, optionally for some listings"""
+        slot_query, booking_query, params = SLOT_SELECT, BOOKING_SELECT, []
+        if listing_ids is not None:
+            placeholders = ", ".join(["%s"] * len(listing_ids))
+            slot_query += f" AND a.listId IN ({placeholders})"
+            booking_query += f" AND t.listId IN ({placeholders})"
+            params = list(listing_ids)
+
+        cursor.execute(slot_query, params)
+        slots = cursor.fetchall()
+        if not slots:
+            return slots, []
+        cursor.execute(booking_query, [min(slot["startTime"] for slot in slots)] + params)
+        return slots, cursor.fetchall()
+
+    def load(self, cursor):
+        return SlotIndex.build(*self._select(cursor))
+
+    def select_changes(self, cursor, events):
+        """Re-select the slots and bookings of the listings the events touched"""
+        listing_ids = sorted({
+            int(event.payload["listId"]) if event.event_type in BOOKING_EVENTS else event.entity_id
+            for event in events
+        })
+        slots, bookings = self._select(cursor, listing_ids)
+        return (listing_ids, slots, bookings), len(listing_ids)
+
+    def patch(self, index, changes):
+        return index.patched(*changes)
+
+    def describe(self, index):
+        return {
+            "slots": index.slots if index is not None else 0,
+            "days": len(index.days) if index is not None else 0,
+        }
+
+
+availability_index = AvailabilityIndex()
+
+register_collector(availability_index.collect)
+
+subscribe(CONSUMER, availability_index.apply_events,
+          event_types=AVAILABILITY_EVENTS + BOOKING_EVENTS, batch=True)
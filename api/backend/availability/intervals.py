@@ -0,0 +1,173 @@
+#------------------------------------------------------------
+# Sweep-line merging of availability and booking intervals.
+#
+# A provider's calendar is the union of the availability slots
+# of all their listings minus the time they are booked. Both
+# sets overlap freely (the same hour offered on three listings,
+# two bookings in one slot), so instead of comparing intervals
+# pairwise every interval becomes two boundary events (+1 at
+# its start, -1 at its end). One sort of the boundaries and a
+# running sum give, for each elementary segment between two
+# consecutive boundaries, how many slots and bookings cover it;
+# adjacent segments with the same state are then merged into
+# blocks. Everything is numpy over int64 epoch seconds, so the
+# cost is one O(n log n) sort however many listings and months
+# of slots are involved.
+#------------------------------------------------------------
+from datetime import datetime, timedelta
+
+import numpy as np
+
+
+FREE = 1
+BUSY = 2
+STATUS_NAMES = {FREE: "free", BUSY: "busy"}
+
+# Bookings that hold the provider's time
+BUSY_STATUSES = ("confirmed", "completed")
+
+# Length assumed for a booking that is not inside one of its listing's slots
+DEFAULT_BOOKING_MINUTES = 60
+
+
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+
+def to_seconds(values):
+    """List of naive datetimes as int64 epoch seconds"""
+    # Several times faster than converting through datetime64
+    return np.fromiter(((value - _EPOCH) // _SECOND for value in values),
+                       dtype=np.int64, count=len(values))
+
+
+def from_seconds(seconds):
+    """Epoch seconds back to naive datetimes"""
+    return np.asarray(seconds, dtype=np.int64).astype("datetime64[s]").tolist()
+
+
+def containing_slot(slot_listing, slot_start, slot_end, booking_listing, booking_start):
+    """
+    Per booking, the index of the slot of its listing that contains its
+    start time (the latest-starting one if several do), or -1. All
+    arguments are int64 arrays (times in epoch seconds).
+    """
+    booking_start = np.asarray(booking_start, dtype=np.int64)
+    found = np.full(len(booking_start), -1, dtype=np.int64)
+    if len(slot_start) == 0 or len(booking_start) == 0:
+        return found
+
+    # One sorted key over (listing, start) finds each booking's slot
+    # with a single searchsorted
+    slot_listing = np.asarray(slot_listing, dtype=np.int64)
+    slot_key = (slot_listing << 32) + slot_start
+    order = np.argsort(slot_key, kind="stable")
+    booking_key = (np.asarray(booking_listing, dtype=np.int64) << 32) + booking_start
+    i = np.searchsorted(slot_key[order], booking_key, side="right") - 1
+    candidate = order[np.maximum(i, 0)]
+    inside = ((i >= 0)
+              & (slot_listing[candidate] == booking_listing)
+              & (np.asarray(slot_end)[candidate] > booking_start))
+    found[inside] = candidate[inside]
+    return found
+
+
+def booked_intervals(slot_listing, slot_start, slot_end, booking_listing, booking_start,
+                     default_seconds=DEFAULT_BOOKING_MINUTES * 60):
+    """
+    (start, end) arrays for bookings: a booking holds the slot of its
+    listing that contains its start time, or default_seconds when no slot
+    does.
+    """
+    booking_start = np.asarray(booking_start, dtype=np.int64)
+    slot = containing_slot(slot_listing, slot_start, slot_end, booking_listing, booking_start)
+    end = booking_start + default_seconds
+    if len(slot_end):
+        end = np.where(slot >= 0, np.asarray(slot_end)[np.maximum(slot, 0)], end)
+    return booking_start, end
+
+
+def sweep(free_start, free_end, busy_start, busy_end, window_start, window_end):
+    """
+    Merge free and busy intervals (epoch seconds) inside the window into
+    non-overlapping blocks. Busy wins wherever both apply. Returns
+    (starts, ends, statuses) arrays in time order; time covered by
+    neither is left out.
+    """
+    free_start = np.clip(free_start, window_start, window_end)
+    free_end = np.clip(free_end, window_start, window_end)
+    busy_start = np.clip(busy_start, window_start, window_end)
+    busy_end = np.clip(busy_end, window_start, window_end)
+    free = free_end > free_start
+    busy = busy_end > busy_start
+
+    times = np.concatenate([free_start[free], free_end[free], busy_start[busy], busy_end[busy]])
+    if len(times) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+
+    n_free, n_busy = int(free.sum()), int(busy.sum())
+    free_delta = np.concatenate([np.ones(n_free), -np.ones(n_free), np.zeros(2 * n_busy)]).astype(np.int64)
+    busy_delta = np.concatenate([np.zeros(2 * n_free), np.ones(n_busy), -np.ones(n_busy)]).astype(np.int64)
+
+    order = np.argsort(times, kind="stable")
+    times = times[order]
+    free_count = np.cumsum(free_delta[order])
+    busy_count = np.cumsum(busy_delta[order])
+
+    # The state after the last event at each distinct time holds until the next one
+    last = np.flatnonzero(np.append(times[1:] != times[:-1], True))
+    points = times[last]
+    status = np.where(busy_count[last] > 0, BUSY, np.where(free_count[last] > 0, FREE, 0))
+
+    # Segment k is [points[k], points[k + 1]); merge runs of equal status
+    seg_start, seg_status = points[:-1], status[:-1]
+    run_start = np.flatnonzero(np.append(True, seg_status[1:] != seg_status[:-1]))
+    run_end = np.append(run_start[1:], len(seg_status))
+    starts, ends, statuses = seg_start[run_start], points[run_end], seg_status[run_start]
+
+    keep = statuses != 0
+    return starts[keep], ends[keep], statuses[keep]
+
+
+def blocks(starts, ends, statuses):
+    """sweep() output as response dicts"""
+    return [
+        {"start": start, "end": end, "status": STATUS_NAMES[int(status)]}
+        for start, end, status in zip(from_seconds(starts), from_seconds(ends), statuses)
+    ]
+
+
+def total_minutes(starts, ends, statuses, status):
+    return int((ends - starts)[statuses == status].sum() // 60)
+
+
+def _parse_naive(value):
+    """ISO date or datetime; one with an offset is converted to naive server time"""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        # Stored and compared datetimes are naive server time (UTC in the containers)
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def parse_window(args, default_days, max_days, now, names=("from", "to")):
+    """
+    (start, end) naive datetimes from the from/to query params (ISO dates
+    or datetimes, with or without an offset). Defaults to default_days from
+    today; raises ValueError on bad input or a window longer than max_days.
+    """
+    from_name, to_name = names
+    try:
+        start = (_parse_naive(args[from_name]) if args.get(from_name)
+                 else now.replace(hour=0, minute=0, second=0, microsecond=0))
+        end = (_parse_naive(args[to_name]) if args.get(to_name)
+               else start + timedelta(days=default_days))
+    except ValueError:
+        raise ValueError(f"{from_name} and {to_name} must be ISO dates or datetimes")
+    if end <= start:
+        raise ValueError(f"{to_name} must be after {from_name}")
+    if end - start > timedelta(days=max_days):
+        raise ValueError(f"window must be at most {max_days} days")
+    return start, end
+
@@ -0,0 +1,70 @@
+#------------------------------------------------------------
+# Short-lived cache for page bundles.
+#
+# Entries expire after BUNDLE_CACHE_SECONDS. Any successful
+# write request bumps a generation counter, which invalidates
+# every cached bundle at once, so a page reloaded right after
+# accepting a booking or editing a listing never shows the old
+# data.
+#------------------------------------------------------------
+import threading
+import time
+
+from backend.metrics.metrics import record_cache
+
+
+DEFAULT_TTL_SECONDS = 15
+MAX_ENTRIES = 5000
+
+_lock = threading.Lock()
+_entries = {}
+_generation = [0]
+_ttl_seconds = [DEFAULT_TTL_SECONDS]
+
+
+def configure(ttl_seconds):
+    _ttl_seconds[0] = ttl_seconds
+
+
+def get_or_load(bundle, key, loader):
+    """
+    Return (value, hit) for (bundle, key), calling loader() on a miss.
+    A loader result of None (e.g. not found) is not cached.
+    """
+    if _ttl_seconds[0] <= 0:
+        return loader(), False
+
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get((bundle, key))
+        generation = _generation[0]
+    if entry is not None and entry[0] == generation and entry[1] > now:
+        record_cache(f"bundle_{bundle}", True)
+        return entry[2], True
+
+    record_cache(f"bundle_{bundle}", False)
+    value = loader()
+    if value is not None:
+        with _lock:
+            # A write that landed while we were loading makes this value stale
+            if generation == _generation[0]:
+                if len(_entries) >= MAX_ENTRIES:
+                    _evict(now)
+                _entries[(bundle, key)] = (generation, now + _ttl_seconds[0], value)
+    return value, False
+
+
+def invalidate_all():
+    with _lock:
+        _generation[0] += 1
+        _entries.clear()
+
+
+def _evict(now):
+    # Called with _lock held: drop expired entries, then the oldest half
+    for cache_key in [k for k, e in _entries.items() if e[1] <= now]:
+        del _entries[cache_key]
+    if len(_entries) >= MAX_ENTRIES:
+        oldest = sorted(_entries, key=lambda k: _entries[k][1])[:len(_entries) // 2]
+        for cache_key in oldest:
+            del _entries[cache_key]
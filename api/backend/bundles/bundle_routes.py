@@ -0,0 +1,212 @@
+from flask import Blueprint, request, jsonify
+from backend.db_connection import async_db
+from backend.bundles import bundle_cache
+from flask import current_app
+
+# Create bundles blueprint
+bundles = Blueprint("bundles", __name__)
+
+# Each bundle returns everything one Streamlit page needs in a single
+# response. Its queries are independent, so they are run concurrently
+# with async_db.gather(), and the assembled bundle is cached briefly
+# (see bundle_cache.py). The X-Cache header reports HIT or MISS.
+
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+
+@bundles.after_app_request
+def invalidate_after_write(response):
+    """Any successful write may change a bundle, so drop the cached ones"""
+    if request.method in WRITE_METHODS and response.status_code < 400:
+        bundle_cache.invalidate_all()
+    return response
+
+
+def _bundle_response(value, hit):
+    response = jsonify(value)
+    response.headers["X-Cache"] = "HIT" if hit else "MISS"
+    return response, 200
+
+
+# ============================================
+# GET /bundles/client-home/{buyerId}
+# Booking stats for the student home page [Emma-3]
+# ============================================
+@bundles.route("/client-home/<int:buyer_id>", methods=["GET"])
+def get_client_home(buyer_id):
+    """Booking counts by status for 10_Emma_Client_Home"""
+    try:
+        current_app.logger.info(f'GET /bundles/client-home/{buyer_id}')
+
+        def load():
+            stats, = async_db.gather(async_db.fetch_one("""
+                SELECT
+                    COUNT(*) AS total_bookings,
+                    COALESCE(SUM(t.transactStatus = 'requested'), 0) AS pending_requests,
+                    COALESCE(SUM(t.transactStatus = 'confirmed'), 0) AS confirmed_bookings,
+                    COALESCE(SUM(t.transactStatus = 'completed'), 0) AS completed_services
+                FROM transact_all t
+                WHERE t.buyerId = %s
+            """, (buyer_id,)))
+            return {"buyerId": buyer_id, "stats": stats}
+
+        value, hit = bundle_cache.get_or_load("client_home", buyer_id, load)
+        return _bundle_response(value, hit)
+
+    except Exception as e:
+        current_app.logger.error(f'Error building client home bundle: {str(e)}')
+        return jsonify({'error': str(e)}), 500
+
+
+# ============================================
+# GET /bundles/provider-home/{providerId}
+# Metrics and pending requests for the provider dashboard [Jessica-5, Jessica-6]
+# ============================================
+@bundles.route("/provider-home/<int:provider_id>", methods=["GET"])
+def get_provider_home(provider_id):
+    """Performance metrics and pending booking requests for 20_Jessica_Provider_Home"""
+    try:
+        current_app.logger.info(f'GET /bundles/provider-home/{provider_id}')
+
+        def load():
+            metrics, pending = async_db.gather(
+                # Listings and bookings are aggregated separately and the
+                # review numbers come from the student's rating counters, so
+                # no aggregate is multiplied by another table's row count
+                async_db.fetch_one("""
+                    SELECT
+                        s.stuId,
+                        CONCAT(s.firstName, ' ', s.lastName) AS provider_name,
+                        COALESCE(ls.total_services_offered, 0) AS total_services_offered,
+                        COALESCE(ls.active_services, 0) AS active_services,
+                        COALESCE(bk.total_bookings, 0) AS total_bookings,
+                        COALESCE(bk.completed_bookings, 0) AS completed_bookings,
+                        COALESCE(bk.total_earnings, 0) AS total_earnings,
+                        ROUND(s.providerRatingSum / NULLIF(s.providerRatingCount, 0), 2) AS average_rating,
+                        s.providerRatingCount AS total_reviews
+                    FROM student s
+                    LEFT JOIN (
+                        SELECT
+                            l.providerId,
+                            COUNT(*) AS total_services_offered,
+                            COUNT(CASE WHEN l.listingStatus = 'active' THEN 1 END) AS active_services
+                        FROM listing l
+                        WHERE l.providerId = %s
+                        GROUP BY l.providerId
+                    ) ls ON ls.providerId = s.stuId
+                    LEFT JOIN (
+                        SELECT
+                            l.providerId,
+                            COUNT(*) AS total_bookings,
+                            COUNT(CASE WHEN t.transactStatus = 'completed' THEN 1 END) AS completed_bookings,
+                            SUM(CASE WHEN t.transactStatus = 'completed'
+                                THEN t.paymentAmt END) AS total_earnings
+                        FROM listing l
+                        INNER JOIN transact_all t ON l.listingId = t.listId
+                        WHERE l.providerId = %s
+                        GROUP BY l.providerId
+                    ) bk ON bk.providerId = s.stuId
+                    WHERE s.stuId = %s
+                """, (provider_id, provider_id, provider_id)),
+                async_db.fetch_all("""
+                    SELECT
+                        t.transactId,
+                        t.bookDate,
+                        t.transactStatus,
+                        t.paymentAmt,
+                        l.listingId,
+                        l.title AS service_name,
+                        buyer.stuId AS buyer_id,
+                        CONCAT(buyer.firstName, ' ', buyer.lastName) AS buyer_name,
+                        (SELECT COUNT(*)
+                         FROM report r
+                         WHERE r.reportedListingId = l.listingId
+                            OR r.reportedStuId = l.providerId
+                            OR r.reportedStuId = buyer.stuId) AS total_reports
+                    FROM transact t
+                    INNER JOIN listing l ON t.listId = l.listingId
+                    INNER JOIN student buyer ON t.buyerId = buyer.stuId
+                    WHERE l.providerId = %s
+                      AND t.transactStatus = 'requested'
+                    ORDER BY t.bookDate DESC
+                """, (provider_id,)),
+            )
+            if not metrics:
+                return None
+            return {"providerId": provider_id, "metrics": metrics, "pendingRequests": pending}
+
+        value, hit = bundle_cache.get_or_load("provider_home", provider_id, load)
+        if value is None:
+            return jsonify({"error": "Student not found"}), 404
+        return _bundle_response(value, hit)
+
+    except Exception as e:
+        current_app.logger.error(f'Error building provider home bundle: {str(e)}')
+        return jsonify({'error': str(e)}), 500
+
+
+# ============================================
+# GET /bundles/listing-page/{listingId}
+# Listing, provider and open slots [Emma-1, Emma-2, Emma-3]
+# (reviews are paged separately from GET /listings/{id}/reviews)
+# ============================================
+@bundles.route("/listing-page/<int:listing_id>", methods=["GET"])
+def get_listing_page(listing_id):
+    """Listing detail and upcoming availability for 12_Provider_Profile"""
+    try:
+        current_app.logger.info(f'GET /bundles/listing-page/{listing_id}')
+
+        def load():
+            listing, availability = async_db.gather(
+                async_db.fetch_one("""
+                    SELECT
+                        l.listingId,
+                        l.title,
+                        l.description,
+                        l.price,
+                        l.unit,
+                        l.imageUrl,
+                        l.createDate,
+                        l.lastUpdate,
+                        l.listingStatus,
+                        c.categoryId,
+                        c.name AS category_name,
+                        c.type AS category_type,
+                        provider.stuId AS provider_id,
+                        CONCAT(provider.firstName, ' ', provider.lastName) AS provider_name,
+                        provider.email AS provider_email,
+                        provider.phone AS provider_phone,
+                        provider.bio AS provider_bio,
+                        provider.verifiedStatus AS provider_verified,
+                        provider.profilePhotoUrl AS provider_photo,
+                        (SELECT ROUND(AVG(r.rating), 2) FROM review r
+                         WHERE r.listId = l.listingId) AS avg_rating,
+                        (SELECT COUNT(*) FROM review r
+                         WHERE r.listId = l.listingId) AS review_count
+                    FROM listing l
+                    INNER JOIN category c ON l.categoryId = c.categoryId
+                    INNER JOIN student provider ON l.providerId = provider.stuId
+                    WHERE l.listingId = %s
+                """, (listing_id,)),
+                async_db.fetch_all("""
+                    SELECT
+                        a.availabilityId,
+                        a.startTime,
+                        a.endTime
+                    FROM availability a
+                    WHERE a.listId = %s AND a.startTime > NOW()
+                    ORDER BY a.startTime ASC
+                """, (listing_id,)),
+            )
+            if not listing:
+                return None
+            return {"listing": listing, "availability": availability}
+
+        value, hit = bundle_cache.get_or_load("listing_page", listing_id, load)
+        if value is None:
+            return jsonify({'error': 'Listing not found'}), 404
+        return _bundle_response(value, hit)
+
+    except Exception as e:
+        current_app.logger.error(f'Error building listing page bundle: {str(e)}')
+        return jsonify({'error': str(e)}), 500
@@ -1,10 +1,82 @@
 #------------------------------------------------------------
 # This file creates a shared DB connection resource
 #------------------------------------------------------------
-from flaskext.mysql import MySQL
-from pymysql import cursors
+import threading
+
+import pymysql
+from flaskext.mysql import MySQL, _ctx_stack
+from backend.db_connection.query_profiler import ProfilingCursor
+from backend.db_connection.router import DBRouter
+from backend.db_connection.async_db import async_db
+
+
+class TrackedMySQL(MySQL):
+    """
+    flask-mysql opens one connection per request context and closes it
+    on teardown. This subclass counts those connections so /metrics can
+    report how many are open at once.
+
+    choose_host, when set, returns the (host, port) to connect to instead
+    of MYSQL_DATABASE_HOST/PORT; the replica pool uses it.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.choose_host = None
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self.connections_in_use = 0
+        self.connections_peak = 0
+
+    def _open(self):
+        if self.choose_host is None:
+            return super().connect()
+
+        host, port = self.choose_host()
+        config = self.app.config
+        return pymysql.connect(**dict(
+            self.connect_args,
+            host=host,
+            port=port,
+            user=config["MYSQL_DATABASE_USER"],
+            password=config["MYSQL_DATABASE_PASSWORD"] or "",
+            db=config["MYSQL_DATABASE_DB"],
+            charset=config["MYSQL_DATABASE_CHARSET"],
+        ))
+
+    def connect(self):
+        conn = self._open()
+        with self._lock:
+            self.connections_opened += 1
+            self.connections_in_use += 1
+            self.connections_peak = max(self.connections_peak, self.connections_in_use)
+        return conn
+
+    def teardown_request(self, exception):
+        ctx = _ctx_stack.top
+        conn = getattr(ctx, "mysql_dbs", {}).get(self.prefix)
+        was_open = conn is not None and conn.open
+        super().teardown_request(exception)
+        if was_open:
+            ctx.mysql_dbs.pop(self.prefix, None)
+            with self._lock:
+                self.connections_in_use -= 1
+
+    def connection_stats(self):
+        with self._lock:
+            return {
+                "opened": self.connections_opened,
+                "in_use": self.connections_in_use,
+                "peak": self.connections_peak,
+            }
 
 
 # the parameter instructs the connection to return data 
-# as a dictionary object. 
-db = MySQL(cursorclass=cursors.DictCursor)
\ No newline at end of file
+# as a dictionary object. ProfilingCursor is a DictCursor
+# that also records per-request query timing.
+# db sends writes to the primary and reads to DB_REPLICA_HOSTS
+# when replicas are configured (see router.py).
+db = DBRouter(
+    primary=TrackedMySQL(cursorclass=ProfilingCursor),
+    replica=TrackedMySQL(prefix="mysql_replica", cursorclass=ProfilingCursor, connect_timeout=2),
+)
@@ -0,0 +1,164 @@
+#------------------------------------------------------------
+# Concurrent execution of independent read queries.
+#
+# A route that needs several unrelated result sets normally runs
+# them one after another on its request connection, paying one
+# MySQL round trip per query. async_db keeps an aiomysql pool on
+# a single event loop thread shared by the whole process; a route
+# describes its queries and async_db.gather() runs them at the
+# same time on pooled connections, then hands the results back
+# in order:
+#
+#   detail, reports = async_db.gather(
+#       async_db.fetch_one(detail_sql, (transaction_id,)),
+#       async_db.fetch_all(reports_sql, (transaction_id,)),
+#   )
+#
+# The queries must not depend on each other's results, and each
+# runs on its own autocommit connection, so gather() is only for
+# reads. The pool connects to the primary, so reads through it
+# always see the caller's own writes. ASYNC_DB_ENABLED=false (or
+# a missing aiomysql package) runs the same queries sequentially
+# on db.get_db() instead.
+#------------------------------------------------------------
+import asyncio
+import threading
+import time
+from collections import namedtuple
+
+from flask import current_app
+
+from backend.db_connection.query_profiler import add_samples
+
+
+Query = namedtuple("Query", ["sql", "args", "fetch"])
+
+
+class AsyncDB:
+    def __init__(self):
+        self.enabled = False
+        self.timeout = 10.0
+        self._config = {}
+        self._lock = threading.Lock()
+        self._loop = None
+        self._pool = None
+
+    def init_app(self, app):
+        self.enabled = app.config.get("ASYNC_DB_ENABLED", True)
+        self.timeout = float(app.config.get("ASYNC_DB_TIMEOUT_SECONDS", 10))
+        self._config = {
+            "host": app.config["MYSQL_DATABASE_HOST"],
+            "port": app.config["MYSQL_DATABASE_PORT"],
+            "user": app.config["MYSQL_DATABASE_USER"],
+            "password": app.config["MYSQL_DATABASE_PASSWORD"] or "",
+            "db": app.config["MYSQL_DATABASE_DB"],
+            "minsize": 1,
+            "maxsize": int(app.config.get("ASYNC_DB_POOL_SIZE", 10)),
+            "autocommit": True,
+        }
+        if not self.enabled:
+            app.logger.info("Async query pool disabled; gathered queries run sequentially")
+
+    # ============================================
+    # Query descriptions
+    # ============================================
+    def fetch_one(self, sql, args=None):
+        return Query(sql, args, "one")
+
+    def fetch_all(self, sql, args=None):
+        return Query(sql, args, "all")
+
+    # ============================================
+    # Execution
+    # ============================================
+    def gather(self, *queries):
+        """Run the queries concurrently and return their results in order"""
+        loop = self._ensure_pool() if self.enabled else None
+        if loop is None:
+            return self._run_sequentially(queries)
+
+        future = asyncio.run_coroutine_threadsafe(self._gather(queries), loop)
+        outcomes = future.result(self.timeout)
+        add_samples([sample for _, sample in outcomes])
+        return [result for result, _ in outcomes]
+
+    def _run_sequentially(self, queries):
+        # Imported here: backend.db_connection imports this module
+        from backend.db_connection import db
+
+        cursor = db.get_db().cursor()
+        try:
+            results = []
+            for query in queries:
+                cursor.execute(query.sql, query.args)
+                results.append(cursor.fetchone() if query.fetch == "one" else cursor.fetchall())
+            return results
+        finally:
+            cursor.close()
+
+    async def _gather(self, queries):
+        return await asyncio.gather(*(self._execute(query) for query in queries))
+
+    async def _execute(self, query):
+        import aiomysql
+
+        started = time.perf_counter()
+        async with self._pool.acquire() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(query.sql, query.args)
+                executed = time.perf_counter()
+                if query.fetch == "one":
+                    result = await cursor.fetchone()
+                else:
+                    result = await cursor.fetchall()
+                sample = {
+                    "sql": query.sql,
+                    "args": query.args,
+                    "exec_ms": (executed - started) * 1000,
+                    "fetch_ms": (time.perf_counter() - executed) * 1000,
+                    "rows": cursor.rowcount,
+                }
+        return result, sample
+
+    def _ensure_pool(self):
+        """Start the event loop thread and create the pool on first use"""
+        if self._pool is not None:
+            return self._loop
+
+        with self._lock:
+            if self._pool is not None:
+                return self._loop
+            try:
+                import aiomysql
+            except ImportError:
+                current_app.logger.warning("aiomysql is not installed; gathered queries run sequentially")
+                self.enabled = False
+                return None
+
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="async-db", daemon=True)
+            thread.start()
+            try:
+                pool = asyncio.run_coroutine_threadsafe(
+                    aiomysql.create_pool(**self._config), loop
+                ).result(self.timeout)
+            except Exception:
+                loop.call_soon_threadsafe(loop.stop)
+                raise
+            self._loop = loop
+            self._pool = pool
+            current_app.logger.info(f'Async query pool started (max {self._config["maxsize"]} connections)')
+        return self._loop
+
+    def close(self):
+        with self._lock:
+            if self._pool is None:
+                return
+            self._pool.close()
+            asyncio.run_coroutine_threadsafe(self._pool.wait_closed(), self._loop).result(self.timeout)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._pool = None
+            self._loop = None
+
+
+async_db = AsyncDB()
@@ -0,0 +1,80 @@
+#------------------------------------------------------------
+# Helpers for the /batch endpoints: fetch many rows by primary
+# key with chunked IN (...) queries, keep the caller's order,
+# report the ids that were not found, and select only the
+# requested fields.
+#------------------------------------------------------------
+
+# Upper bound on ids per request, and ids per IN (...) list
+MAX_BATCH_IDS = 500
+CHUNK_SIZE = 100
+
+
+def parse_ids(raw, max_ids=MAX_BATCH_IDS):
+    """
+    Parse "3,1,7" into [3, 1, 7], dropping repeats but keeping order.
+    Raises ValueError with a message suitable for a 400 response.
+    """
+    if not raw:
+        raise ValueError("ids parameter required, e.g. ?ids=3,1,7")
+
+    ids = []
+    seen = set()
+    for part in raw.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if not part.isdigit():
+            raise ValueError(f"Invalid id: {part}")
+        value = int(part)
+        if value not in seen:
+            seen.add(value)
+            ids.append(value)
+
+    if not ids:
+        raise ValueError("ids parameter required, e.g. ?ids=3,1,7")
+    if len(ids) > max_ids:
+        raise ValueError(f"At most {max_ids} ids per request")
+    return ids
+
+
+def select_fields(columns, raw_fields, id_field):
+    """
+    Pick the requested subset of columns (a dict of field -> SQL expression).
+    The id field is always included so results can be matched to ids.
+    """
+    if not raw_fields:
+        return dict(columns)
+
+    requested = [f.strip() for f in raw_fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in columns]
+    if unknown:
+        raise ValueError(f"Unknown fields: {unknown}. Available: {list(columns)}")
+
+    names = [id_field] + [f for f in requested if f != id_field]
+    return {name: columns[name] for name in names}
+
+
+def fetch_by_ids(cursor, columns, from_clause, id_expr, id_field, ids, chunk_size=CHUNK_SIZE):
+    """
+    Run SELECT <columns> <from_clause> WHERE <id_expr> IN (...) in chunks.
+    Returns (rows in the order of ids, ids with no row).
+    """
+    select_list = ",\n                ".join(f"{expr} AS {name}" for name, expr in columns.items())
+    by_id = {}
+
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        placeholders = ", ".join(["%s"] * len(chunk))
+        cursor.execute(f"""
+            SELECT
+                {select_list}
+            {from_clause}
+            WHERE {id_expr} IN ({placeholders})
+        """, chunk)
+        for row in cursor.fetchall():
+            by_id[row[id_field]] = row
+
+    results = [by_id[i] for i in ids if i in by_id]
+    not_found = [i for i in ids if i not in by_id]
+    return results, not_found
@@ -0,0 +1,310 @@
+#------------------------------------------------------------
+# Per-request SQL profiling.
+#
+# ProfilingCursor replaces the plain DictCursor handed out by
+# db.get_db().cursor(). Every execute() records a normalized
+# statement fingerprint, row count, execution time and fetch
+# time. At the end of each request the samples are folded into
+# per-route and per-fingerprint aggregates; statements slower
+# than SLOW_QUERY_MS are logged together with their EXPLAIN plan.
+# The aggregates are served by GET /admin/debug/queries.
+#------------------------------------------------------------
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from flask import current_app, g, has_app_context, has_request_context, request
+from pymysql import cursors
+
+
+# Histogram bucket upper bounds in milliseconds
+BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+_config = {
+    "enabled": True,
+    "slow_query_ms": 200.0,
+    "explain_slow": True,
+}
+
+_lock = threading.Lock()
+_routes = {}
+_fingerprints = {}
+_slow_queries = deque(maxlen=50)
+
+_WHITESPACE = re.compile(r"\s+")
+_STRINGS = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDERS = re.compile(r"%s")
+_IN_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_COMMENTS = re.compile(r"--[^\n]*")
+
+
+def fingerprint(sql):
+    """Normalize a statement so calls that differ only in values group together"""
+    text = _COMMENTS.sub(" ", sql)
+    text = _STRINGS.sub("?", text)
+    text = _PLACEHOLDERS.sub("?", text)
+    text = _NUMBERS.sub("?", text)
+    text = _WHITESPACE.sub(" ", text).strip()
+    text = _IN_LISTS.sub("(?+)", text)
+    return text
+
+
+def _new_histogram():
+    return [0] * (len(BUCKETS_MS) + 1)
+
+
+def _observe(histogram, value_ms):
+    for i, bound in enumerate(BUCKETS_MS):
+        if value_ms <= bound:
+            histogram[i] += 1
+            return
+    histogram[-1] += 1
+
+
+def _histogram_dict(histogram):
+    labels = [f"le_{b}ms" for b in BUCKETS_MS] + ["le_inf"]
+    return dict(zip(labels, histogram))
+
+
+class ProfilingCursor(cursors.DictCursor):
+    """DictCursor that records timing for every statement it runs"""
+
+    def execute(self, query, args=None):
+        if not _config["enabled"]:
+            return super().execute(query, args)
+
+        started = time.perf_counter()
+        try:
+            return super().execute(query, args)
+        finally:
+            exec_ms = (time.perf_counter() - started) * 1000
+            self._last_sample = {
+                "sql": query,
+                "args": args,
+                "exec_ms": exec_ms,
+                "fetch_ms": 0.0,
+                "rows": self.rowcount,
+            }
+            _record(self, self._last_sample)
+
+    def _timed_fetch(self, fetch, *args):
+        started = time.perf_counter()
+        result = fetch(*args)
+        sample = getattr(self, "_last_sample", None)
+        if sample is not None:
+            sample["fetch_ms"] += (time.perf_counter() - started) * 1000
+        return result
+
+    def fetchone(self):
+        if not _config["enabled"]:
+            return super().fetchone()
+        return self._timed_fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        if not _config["enabled"]:
+            return super().fetchmany(size)
+        return self._timed_fetch(super().fetchmany, size)
+
+    def fetchall(self):
+        if not _config["enabled"]:
+            return super().fetchall()
+        return self._timed_fetch(super().fetchall)
+
+
+def _explain(cursor, sql, args):
+    """EXPLAIN a slow statement on the same connection with a plain cursor"""
+    verb = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+    if verb not in ("SELECT", "UPDATE", "DELETE", "INSERT", "REPLACE"):
+        return None
+    try:
+        statement = cursor.mogrify(sql, args)
+        plain = cursor.connection.cursor(cursors.DictCursor)
+        plain.execute("EXPLAIN " + statement)
+        plan = plain.fetchall()
+        plain.close()
+        return plan
+    except Exception as e:
+        return [{"error": str(e)}]
+
+
+def _record(cursor, sample):
+    if has_request_context():
+        samples = g.setdefault("query_samples", [])
+        samples.append(sample)
+
+    if sample["exec_ms"] >= _config["slow_query_ms"]:
+        route = _route_key() if has_request_context() else "<background>"
+        plan = _explain(cursor, sample["sql"], sample["args"]) if _config["explain_slow"] else None
+        entry = {
+            "at": datetime.now().isoformat(),
+            "route": route,
+            "fingerprint": fingerprint(sample["sql"]),
+            "exec_ms": round(sample["exec_ms"], 3),
+            "rows": sample["rows"],
+            "explain": plan,
+        }
+        with _lock:
+            _slow_queries.append(entry)
+        _logger().warning(
+            f'Slow query ({entry["exec_ms"]} ms, {entry["rows"]} rows) on {route}: '
+            f'{entry["fingerprint"][:300]} | plan: {plan}'
+        )
+
+    if not has_request_context():
+        _aggregate("<background>", [sample], sample["exec_ms"])
+
+
+def add_samples(samples):
+    """Record statements that ran outside ProfilingCursor (e.g. on the async pool)"""
+    if not _config["enabled"] or not samples:
+        return
+    if has_request_context() and "query_samples" in g:
+        g.query_samples.extend(samples)
+    else:
+        _aggregate("<background>", samples, sum(s["exec_ms"] + s["fetch_ms"] for s in samples))
+
+
+def _logger():
+    if has_app_context():
+        return current_app.logger
+    return logging.getLogger(__name__)
+
+
+def _route_key():
+    rule = request.url_rule.rule if request.url_rule else "<unmatched>"
+    return f"{request.method} {rule}"
+
+
+def _aggregate(route, samples, request_ms):
+    with _lock:
+        stats = _routes.get(route)
+        if stats is None:
+            stats = _routes[route] = {
+                "requests": 0,
+                "queries": 0,
+                "rows": 0,
+                "sql_ms_total": 0.0,
+                "request_ms_total": 0.0,
+                "sql_ms_histogram": _new_histogram(),
+                "queries_per_request_max": 0,
+            }
+
+        sql_ms = 0.0
+        for sample in samples:
+            total_ms = sample["exec_ms"] + sample["fetch_ms"]
+            sql_ms += total_ms
+
+            key = fingerprint(sample["sql"])
+            fp = _fingerprints.get(key)
+            if fp is None:
+                fp = _fingerprints[key] = {
+                    "calls": 0,
+                    "rows": 0,
+                    "exec_ms_total": 0.0,
+                    "fetch_ms_total": 0.0,
+                    "max_ms": 0.0,
+                    "histogram": _new_histogram(),
+                    "routes": set(),
+                }
+            fp["calls"] += 1
+            fp["rows"] += max(sample["rows"], 0)
+            fp["exec_ms_total"] += sample["exec_ms"]
+            fp["fetch_ms_total"] += sample["fetch_ms"]
+            fp["max_ms"] = max(fp["max_ms"], total_ms)
+            fp["routes"].add(route)
+            _observe(fp["histogram"], total_ms)
+
+        stats["requests"] += 1
+        stats["queries"] += len(samples)
+        stats["rows"] += sum(max(s["rows"], 0) for s in samples)
+        stats["sql_ms_total"] += sql_ms
+        stats["request_ms_total"] += request_ms
+        stats["queries_per_request_max"] = max(stats["queries_per_request_max"], len(samples))
+        _observe(stats["sql_ms_histogram"], sql_ms)
+
+
+def get_profile(limit=50):
+    """Snapshot of the route and fingerprint aggregates plus recent slow queries"""
+    with _lock:
+        routes = {}
+        for route, stats in _routes.items():
+            requests_seen = stats["requests"] or 1
+            routes[route] = {
+                "requests": stats["requests"],
+                "queries": stats["queries"],
+                "rows": stats["rows"],
+                "avg_queries_per_request": round(stats["queries"] / requests_seen, 2),
+                "max_queries_per_request": stats["queries_per_request_max"],
+                "avg_sql_ms": round(stats["sql_ms_total"] / requests_seen, 3),
+                "avg_request_ms": round(stats["request_ms_total"] / requests_seen, 3),
+                "sql_ms_histogram": _histogram_dict(stats["sql_ms_histogram"]),
+            }
+
+        ranked = sorted(
+            _fingerprints.items(),
+            key=lambda item: item[1]["exec_ms_total"] + item[1]["fetch_ms_total"],
+            reverse=True
+        )[:limit]
+        queries = []
+        for key, fp in ranked:
+            queries.append({
+                "fingerprint": key,
+                "calls": fp["calls"],
+                "rows": fp["rows"],
+                "exec_ms_total": round(fp["exec_ms_total"], 3),
+                "fetch_ms_total": round(fp["fetch_ms_total"], 3),
+                "avg_ms": round((fp["exec_ms_total"] + fp["fetch_ms_total"]) / fp["calls"], 3),
+                "max_ms": round(fp["max_ms"], 3),
+                "histogram": _histogram_dict(fp["histogram"]),
+                "routes": sorted(fp["routes"]),
+            })
+
+        return {
+            "enabled": _config["enabled"],
+            "slow_query_ms": _config["slow_query_ms"],
+            "routes": routes,
+            "queries": queries,
+            "slow_queries": list(_slow_queries),
+        }
+
+
+def reset_profile():
+    with _lock:
+        _routes.clear()
+        _fingerprints.clear()
+        _slow_queries.clear()
+
+
+def init_query_profiler(app):
+    """
+    Hook the profiler into the request cycle.
+    QUERY_PROFILING=false turns it off, SLOW_QUERY_MS sets the slow-log threshold
+    and SLOW_QUERY_EXPLAIN=false skips the EXPLAIN for slow statements.
+    """
+    _config["enabled"] = os.getenv("QUERY_PROFILING", "true").lower() == "true"
+    _config["slow_query_ms"] = float(os.getenv("SLOW_QUERY_MS", "200"))
+    _config["explain_slow"] = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+
+    if not _config["enabled"]:
+        app.logger.info("Query profiling disabled")
+        return
+
+    @app.before_request
+    def _start_query_profile():
+        g.query_samples = []
+        g.query_profile_started = time.perf_counter()
+
+    @app.teardown_request
+    def _finish_query_profile(exception=None):
+        samples = g.pop("query_samples", None)
+        started = g.pop("query_profile_started", None)
+        if samples is None or started is None:
+            return
+        _aggregate(_route_key(), samples, (time.perf_counter() - started) * 1000)
+
+    app.logger.info(f'Query profiling enabled (slow query threshold {_config["slow_query_ms"]} ms)')
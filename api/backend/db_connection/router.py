@@ -0,0 +1,243 @@
+#------------------------------------------------------------
+# Read/write split between the primary and a replica pool.
+#
+# DBRouter stands in for the single MySQL object, so route code
+# keeps calling db.get_db(). The first get_db() of a request
+# picks the target:
+#
+#   - writes (anything but GET/HEAD) and background jobs use
+#     the primary;
+#   - a session that made a successful write within the last
+#     DB_READ_YOUR_WRITES_SECONDS keeps reading from the primary
+#     so it sees its own changes;
+#   - other reads go to the next replica in DB_REPLICA_HOSTS,
+#     unless that replica is unreachable or lags by more than
+#     DB_REPLICA_MAX_LAG_SECONDS, in which case they fall back
+#     to the primary.
+#
+# Without DB_REPLICA_HOSTS every request uses the primary.
+#
+# Read-your-writes is tracked in the Flask session cookie, so it
+# only holds for clients that send cookies back. The Streamlit
+# pages call the API through one requests.Session per browser
+# session (app/src/modules/api.py) for this reason; a client
+# using bare requests.get/post may read a lagging replica right
+# after its own write.
+#------------------------------------------------------------
+import itertools
+import threading
+import time
+
+import pymysql
+from flask import current_app, g, has_request_context, request, session
+
+
+READ_METHODS = ("GET", "HEAD")
+
+# Session key holding the time until which reads stay on the primary
+STICKY_SESSION_KEY = "db_primary_until"
+
+
+def parse_hosts(value):
+    """'db-replica:3306,10.0.0.5' -> [('db-replica', 3306), ('10.0.0.5', 3306)]"""
+    hosts = []
+    for item in (value or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        host, _, port = item.partition(":")
+        hosts.append((host, int(port) if port else 3306))
+    return hosts
+
+
+class DBRouter:
+    """
+    Hands out a primary or replica connection per request context.
+    primary and replica are TrackedMySQL instances with different prefixes,
+    so flask-mysql keeps their per-request connections apart.
+    """
+
+    def __init__(self, primary, replica):
+        self.primary = primary
+        self.replica = replica
+        self.hosts = []
+        self.max_lag_seconds = 5.0
+        self.lag_check_seconds = 5.0
+        self.sticky_seconds = 10.0
+        self._host_cycle = None
+        self._lock = threading.Lock()
+        # host -> (checked_at, lag_seconds or None when unreachable/broken)
+        self._lag = {}
+        self._counts = {"primary": 0, "replica": 0, "sticky": 0, "lagging": 0, "unavailable": 0}
+
+    @property
+    def prefix(self):
+        return self.primary.prefix
+
+    def init_app(self, app):
+        self.primary.init_app(app)
+
+        self.hosts = parse_hosts(app.config.get("DB_REPLICA_HOSTS"))
+        self.max_lag_seconds = float(app.config.get("DB_REPLICA_MAX_LAG_SECONDS", 5))
+        self.lag_check_seconds = float(app.config.get("DB_REPLICA_LAG_CHECK_SECONDS", 5))
+        self.sticky_seconds = float(app.config.get("DB_READ_YOUR_WRITES_SECONDS", 10))
+
+        if not self.hosts:
+            app.logger.info("No read replicas configured; all queries use the primary")
+            return
+
+        self._host_cycle = itertools.cycle(self.hosts)
+        self.replica.init_app(app)
+        self.replica.choose_host = self._request_host
+        if app.secret_key:
+            app.after_request(self._mark_session_after_write)
+        else:
+            app.logger.warning("SECRET_KEY is not set; read-your-writes stickiness is disabled")
+        app.logger.info(
+            f"Routing reads to replicas {self.hosts} "
+            f"(max lag {self.max_lag_seconds}s, read-your-writes {self.sticky_seconds}s)"
+        )
+
+    # ============================================
+    # Routing
+    # ============================================
+    def get_db(self):
+        if not has_request_context():
+            return self.primary.get_db()
+
+        target = g.get("db_target")
+        if target is None:
+            target = self._choose_target()
+            if target == "replica" and self._replica_connection() is None:
+                target = "primary"
+            g.db_target = target
+
+        if target == "replica":
+            return self.replica.get_db()
+        return self.primary.get_db()
+
+    def _choose_target(self):
+        if not self.hosts or request.method not in READ_METHODS:
+            return self._count("primary")
+
+        if session.get(STICKY_SESSION_KEY, 0) > time.time():
+            self._count("sticky")
+            return self._count("primary")
+
+        return "replica"
+
+    def _replica_connection(self):
+        host = self._next_host()
+
+        # Skip a replica that was recently found lagging or unreachable
+        # without paying for a new connection
+        cached = self._cached_lag(host)
+        if cached is not None and not self._usable(cached[1]):
+            return self._fall_back("lagging" if cached[1] is not None else "unavailable")
+
+        g.db_replica_host = host
+        try:
+            conn = self.replica.get_db()
+        except pymysql.err.MySQLError as e:
+            current_app.logger.warning(f"Read replica {host[0]}:{host[1]} unavailable, using primary: {str(e)}")
+            self._store_lag(host, None)
+            return self._fall_back("unavailable")
+
+        if not self._usable(self._replica_lag(conn, host)):
+            self.replica.teardown_request(None)
+            return self._fall_back("lagging")
+
+        self._count("replica")
+        return conn
+
+    def _fall_back(self, reason):
+        self._count(reason)
+        self._count("primary")
+        return None
+
+    def _usable(self, lag):
+        return lag is not None and lag <= self.max_lag_seconds
+
+    def _next_host(self):
+        with self._lock:
+            return next(self._host_cycle)
+
+    def _request_host(self):
+        return g.db_replica_host
+
+    def _cached_lag(self, host):
+        with self._lock:
+            cached = self._lag.get(host)
+        if cached is not None and time.monotonic() - cached[0] < self.lag_check_seconds:
+            return cached
+        return None
+
+    def _store_lag(self, host, lag):
+        with self._lock:
+            self._lag[host] = (time.monotonic(), lag)
+
+    def _replica_lag(self, conn, host):
+        """
+        Seconds the replica is behind, cached per host for DB_REPLICA_LAG_CHECK_SECONDS.
+        None means replication is configured but stopped or broken.
+        A server with no replication configured (e.g. a standalone container
+        standing in for a replica in development) reports 0.
+        """
+        cached = self._cached_lag(host)
+        if cached is not None:
+            return cached[1]
+
+        cursor = conn.cursor(pymysql.cursors.DictCursor)
+        try:
+            try:
+                cursor.execute("SHOW REPLICA STATUS")
+                row = cursor.fetchone()
+                column = "Seconds_Behind_Source"
+            except pymysql.err.MySQLError:
+                # MySQL < 8.0.22 and MariaDB only know the old name
+                cursor.execute("SHOW SLAVE STATUS")
+                row = cursor.fetchone()
+                column = "Seconds_Behind_Master"
+            lag = 0.0 if row is None else row.get(column)
+            lag = float(lag) if lag is not None else None
+        except pymysql.err.MySQLError:
+            lag = None
+        finally:
+            cursor.close()
+
+        self._store_lag(host, lag)
+        return lag
+
+    def _mark_session_after_write(self, response):
+        if request.method not in READ_METHODS and response.status_code < 400:
+            session[STICKY_SESSION_KEY] = time.time() + self.sticky_seconds
+        return response
+
+    def _count(self, key):
+        with self._lock:
+            self._counts[key] += 1
+        return key
+
+    # ============================================
+    # flask-mysql compatibility
+    # ============================================
+    def connect(self):
+        return self.primary.connect()
+
+    def teardown_request(self, exception):
+        self.primary.teardown_request(exception)
+        if self.hosts:
+            self.replica.teardown_request(exception)
+
+    def connection_stats(self):
+        return {"primary": self.primary.connection_stats(), "replica": self.replica.connection_stats()}
+
+    def routing_stats(self):
+        """Routing decisions since startup and the last measured lag per replica"""
+        with self._lock:
+            return {
+                "decisions": dict(self._counts),
+                "replicas": {
+                    f"{host}:{port}": lag for (host, port), (_, lag) in self._lag.items()
+                },
+            }
@@ -0,0 +1,424 @@
+#------------------------------------------------------------
+# Outbox dispatcher.
+#
+# A background thread tails outbox_event in eventId order and
+# delivers each event to the subscribed consumers. Every
+# consumer has its own offset (last delivered eventId):
+#   * durable consumers keep it in outbox_offset, so they resume
+#     where they stopped after a restart (and start from the
+#     beginning of the outbox the first time);
+#   * in-process consumers (caches) keep it in memory and start
+#     at the current end of the outbox.
+# The offset only moves after the handler returns, so delivery
+# is at-least-once: a handler that raises sees the same events
+# again on the next cycle, and handlers must be idempotent.
+#
+# Auto-increment ids are assigned at INSERT but become visible
+# at COMMIT, so a short transaction can commit event 11 before
+# a longer one commits event 10. A consumer therefore stops at
+# a hole in the id sequence until the event after the hole is
+# OUTBOX_GAP_TIMEOUT_SECONDS old; after that the hole is taken
+# to be a rolled-back insert and skipped.
+#------------------------------------------------------------
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from flask import request
+
+from backend.db_connection import db
+from backend.events.outbox import latest_event_id, read_events
+from backend.metrics.metrics import register_collector
+
+
+# Dispatch settings, overridable from the .env file
+DEFAULT_INTERVAL_SECONDS = 1.0
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_GAP_TIMEOUT_SECONDS = 10.0
+DEFAULT_RETENTION_HOURS = 168
+PRUNE_EVERY_CYCLES = 300
+
+_state_lock = threading.Lock()
+_consumers_lock = threading.Lock()
+_stop_event = threading.Event()
+_wake = threading.Event()
+_worker = None
+_consumers = {}
+_settings = {
+    "batch_size": DEFAULT_BATCH_SIZE,
+    "gap_timeout_seconds": DEFAULT_GAP_TIMEOUT_SECONDS,
+    "retention_hours": DEFAULT_RETENTION_HOURS,
+}
+_metrics = {
+    "cycles": 0,
+    "last_cycle_at": None,
+    "last_cycle_seconds": 0.0,
+    "last_error": None,
+    "latest_event_id": 0,
+    "events_pruned": 0,
+}
+
+
+class _Consumer:
+    def __init__(self, name, handler, event_types, durable, batch):
+        self.name = name
+        self.handler = handler
+        self.event_types = set(event_types) if event_types else None
+        self.durable = durable
+        self.batch = batch
+        self.offset = None
+        self.delivered = 0
+        self.failures = 0
+        self.last_error = None
+        self.waiting_on_gap = False
+        self.reset_to = None
+
+
+def subscribe(name, handler, event_types=None, durable=False, batch=False):
+    """
+    Register a consumer. handler(event) is called per event, or
+    handler([events]) once per batch when batch=True. event_types limits
+    delivery to those types; the offset still advances past the others.
+    """
+    with _consumers_lock:
+        if name in _consumers:
+            raise ValueError(f"Consumer {name} is already subscribed")
+        _consumers[name] = _Consumer(name, handler, event_types, durable, batch)
+
+
+def subscribe_queue(name, event_types=None, durable=False, maxsize=10000):
+    """
+    Deliver events into a local queue.Queue and return it. When the queue
+    is full the delivery fails and is retried, so a slow reader applies
+    back-pressure instead of losing events.
+    """
+    events = queue.Queue(maxsize=maxsize)
+
+    def enqueue(event):
+        events.put(event, timeout=1)
+
+    subscribe(name, enqueue, event_types=event_types, durable=durable)
+    return events
+
+
+def set_offset(name, event_id):
+    """
+    Move a consumer's offset, e.g. to the eventId a cache was rebuilt at so
+    that everything after it is (re)delivered. Applied before its next batch.
+    """
+    with _consumers_lock:
+        _consumers[name].reset_to = event_id
+
+
+def notify():
+    """Wake the dispatcher now instead of at the next interval"""
+    _wake.set()
+
+
+def _load_offset(cursor, consumer):
+    if not consumer.durable:
+        return latest_event_id(cursor)
+    cursor.execute("SELECT lastEventId FROM outbox_offset WHERE consumer = %s", (consumer.name,))
+    row = cursor.fetchone()
+    return row["lastEventId"] if row else 0
+
+
+def _save_offset(conn, consumer):
+    if not consumer.durable:
+        return
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            INSERT INTO outbox_offset (consumer, lastEventId)
+            VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE
+                lastEventId = GREATEST(lastEventId, VALUES(lastEventId)),
+                updatedAt = NOW()
+        """, (consumer.name, consumer.offset))
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+def _settled(events, offset, db_now, gap_timeout):
+    """Leading events that are safe to deliver (see the hole note above)"""
+    expected = offset + 1
+    for i, event in enumerate(events):
+        if event.event_id != expected:
+            age = (db_now - event.created).total_seconds()
+            if age < gap_timeout:
+                return events[:i], True
+        expected = event.event_id + 1
+    return events, False
+
+
+def read_settled(cursor, after_id, limit, event_types=None):
+    """
+    Events after after_id that are safe to consume, for pollers outside
+    the process. Returns (events matching event_types, next offset).
+    """
+    cursor.execute("SELECT NOW(3) AS db_now")
+    db_now = cursor.fetchone()["db_now"]
+    ready, _ = _settled(read_events(cursor, after_id, limit), after_id, db_now,
+                        _settings["gap_timeout_seconds"])
+    wanted = [e for e in ready if not event_types or e.event_type in event_types]
+    return wanted, (ready[-1].event_id if ready else after_id)
+
+
+def _deliver(consumer, events):
+    """
+    Hand events to the consumer, moving its in-memory offset past each
+    one that was handled. Raises whatever the handler raised.
+    """
+    wanted = [e for e in events if consumer.event_types is None or e.event_type in consumer.event_types]
+    if consumer.batch:
+        if wanted:
+            consumer.handler(wanted)
+        consumer.delivered += len(wanted)
+        consumer.offset = events[-1].event_id
+        return
+
+    for event in events:
+        if consumer.event_types is None or event.event_type in consumer.event_types:
+            consumer.handler(event)
+            consumer.delivered += 1
+        consumer.offset = event.event_id
+
+
+def _dispatch_consumer(conn, consumer, db_now):
+    """Deliver up to one batch; returns the number of events consumed"""
+    with _consumers_lock:
+        if consumer.reset_to is not None:
+            consumer.offset, consumer.reset_to = consumer.reset_to, None
+
+    cursor = conn.cursor()
+    try:
+        if consumer.offset is None:
+            consumer.offset = _load_offset(cursor, consumer)
+        events = read_events(cursor, consumer.offset, _settings["batch_size"])
+    finally:
+        cursor.close()
+    conn.commit()
+
+    ready, consumer.waiting_on_gap = _settled(
+        events, consumer.offset, db_now, _settings["gap_timeout_seconds"]
+    )
+    if not ready:
+        return 0
+
+    start = consumer.offset
+    try:
+        _deliver(consumer, ready)
+        consumer.last_error = None
+    except Exception as e:
+        consumer.failures += 1
+        consumer.last_error = str(e)
+        raise
+    finally:
+        # Keep whatever was handled before a failure
+        if consumer.offset != start:
+            _save_offset(conn, consumer)
+
+    return len(ready)
+
+
+def _prune(conn):
+    """Drop events past the retention window that every consumer has seen"""
+    with _consumers_lock:
+        offsets = [c.offset for c in _consumers.values() if c.durable]
+    if any(offset is None for offset in offsets):
+        return 0
+
+    cursor = conn.cursor()
+    try:
+        query = """
+            DELETE FROM outbox_event
+            WHERE createDate < NOW() - INTERVAL %s HOUR
+        """
+        params = [_settings["retention_hours"]]
+        if offsets:
+            query += " AND eventId <= %s"
+            params.append(min(offsets))
+        query += " ORDER BY eventId LIMIT 5000"
+        cursor.execute(query, params)
+        pruned = cursor.rowcount
+        conn.commit()
+    finally:
+        cursor.close()
+    return pruned
+
+
+def run_dispatch_cycle():
+    """
+    Deliver pending events to every consumer until each is caught up
+    (or blocked by a failure or an unsettled gap). Must be called inside
+    an app context. Returns {consumer: events consumed}.
+    """
+    started = time.monotonic()
+    summary = {}
+
+    with _state_lock:
+        conn = db.get_db()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT NOW(3) AS db_now")
+            db_now = cursor.fetchone()["db_now"]
+            _metrics["latest_event_id"] = latest_event_id(cursor)
+        finally:
+            cursor.close()
+        conn.commit()
+
+        with _consumers_lock:
+            consumers = list(_consumers.values())
+
+        errors = []
+        for consumer in consumers:
+            summary[consumer.name] = 0
+            try:
+                while True:
+                    consumed = _dispatch_consumer(conn, consumer, db_now)
+                    summary[consumer.name] += consumed
+                    if consumed < _settings["batch_size"] or consumer.waiting_on_gap:
+                        break
+            except Exception as e:
+                conn.rollback()
+                errors.append(f"{consumer.name}: {str(e)}")
+
+        _metrics["cycles"] += 1
+        if _metrics["cycles"] % PRUNE_EVERY_CYCLES == 0 and _settings["retention_hours"] > 0:
+            _metrics["events_pruned"] += _prune(conn)
+
+        _metrics["last_cycle_at"] = datetime.now().isoformat()
+        _metrics["last_cycle_seconds"] = round(time.monotonic() - started, 4)
+        _metrics["last_error"] = "; ".join(errors) or None
+
+    return summary
+
+
+def get_dispatcher_status():
+    """Dispatcher counters and every consumer's offset"""
+    with _state_lock:
+        snapshot = dict(_metrics)
+        snapshot["running"] = _worker is not None and _worker.is_alive()
+        with _consumers_lock:
+            snapshot["consumers"] = [
+                {
+                    "consumer": c.name,
+                    "durable": c.durable,
+                    "eventTypes": sorted(c.event_types) if c.event_types else None,
+                    "offset": c.offset,
+                    "lag": None if c.offset is None else max(_metrics["latest_event_id"] - c.offset, 0),
+                    "delivered": c.delivered,
+                    "failures": c.failures,
+                    "lastError": c.last_error,
+                    "waitingOnGap": c.waiting_on_gap,
+                }
+                for c in _consumers.values()
+            ]
+    return snapshot
+
+
+# Built-in in-process consumer: events seen per type, for /metrics
+_event_counts = {}
+
+
+def _count_events(events):
+    with _consumers_lock:
+        for event in events:
+            _event_counts[event.event_type] = _event_counts.get(event.event_type, 0) + 1
+
+
+subscribe("metrics", _count_events, batch=True)
+
+
+def _collect_dispatcher_metrics():
+    snapshot = get_dispatcher_status()
+    consumers = snapshot["consumers"]
+    with _consumers_lock:
+        event_counts = sorted(_event_counts.items())
+    return [
+        ("huskyhub_outbox_events_total", "counter",
+         "Outbox events dispatched since startup, by type",
+         [({"type": event_type}, count) for event_type, count in event_counts]),
+        ("huskyhub_outbox_latest_event_id", "gauge",
+         "Highest eventId in the outbox at the last dispatch cycle",
+         [({}, snapshot["latest_event_id"])]),
+        ("huskyhub_outbox_delivered_total", "counter",
+         "Events handed to each consumer",
+         [({"consumer": c["consumer"]}, c["delivered"]) for c in consumers]),
+        ("huskyhub_outbox_delivery_failures_total", "counter",
+         "Handler failures per consumer (the events are retried)",
+         [({"consumer": c["consumer"]}, c["failures"]) for c in consumers]),
+        ("huskyhub_outbox_consumer_lag_events", "gauge",
+         "Events in the outbox that a consumer has not processed yet",
+         [({"consumer": c["consumer"]}, c["lag"] if c["lag"] is not None else -1) for c in consumers]),
+    ]
+
+
+register_collector(_collect_dispatcher_metrics)
+
+
+def _run_forever(app, interval):
+    while not _stop_event.is_set():
+        try:
+            with app.app_context():
+                try:
+                    run_dispatch_cycle()
+                finally:
+                    # flask-mysql only closes connections on request teardown,
+                    # so release this context's connection explicitly
+                    db.teardown_request(None)
+            if _metrics["last_error"]:
+                app.logger.error(f'Outbox dispatch failed: {_metrics["last_error"]}')
+        except Exception as e:
+            _metrics["last_error"] = str(e)
+            app.logger.error(f'Outbox dispatch failed: {str(e)}')
+        _wake.wait(interval)
+        _wake.clear()
+
+
+def _wake_after_write(response):
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        notify()
+    return response
+
+
+def start_dispatcher(app):
+    """
+    Start the in-process dispatch thread.
+    OUTBOX_DISPATCH_INTERVAL (seconds) is the polling interval when no write
+    wakes it earlier; 0 disables it. OUTBOX_BATCH_SIZE,
+    OUTBOX_GAP_TIMEOUT_SECONDS and OUTBOX_RETENTION_HOURS tune delivery
+    and pruning.
+    """
+    global _worker
+
+    interval = float(os.getenv("OUTBOX_DISPATCH_INTERVAL", DEFAULT_INTERVAL_SECONDS))
+    _settings["batch_size"] = int(os.getenv("OUTBOX_BATCH_SIZE", DEFAULT_BATCH_SIZE))
+    _settings["gap_timeout_seconds"] = float(os.getenv("OUTBOX_GAP_TIMEOUT_SECONDS", DEFAULT_GAP_TIMEOUT_SECONDS))
+    _settings["retention_hours"] = int(os.getenv("OUTBOX_RETENTION_HOURS", DEFAULT_RETENTION_HOURS))
+
+    if interval <= 0:
+        app.logger.info("Outbox dispatcher disabled")
+        return None
+
+    if _worker is not None and _worker.is_alive():
+        return _worker
+
+    app.after_request(_wake_after_write)
+
+    _stop_event.clear()
+    _worker = threading.Thread(
+        target=_run_forever, args=(app, interval),
+        name="outbox-dispatcher", daemon=True
+    )
+    _worker.start()
+    app.logger.info(f"Outbox dispatcher started (every {interval}s)")
+    return _worker
+
+
+def stop_dispatcher():
+    _stop_event.set()
+    _wake.set()
@@ -0,0 +1,89 @@
+#------------------------------------------------------------
+# Transactional outbox.
+#
+# Write paths call record_event()/record_events() with the
+# cursor they are already writing with, before they commit, so
+# an event row exists exactly when the change it describes was
+# committed. The dispatcher (see dispatcher.py) tails the
+# outbox_event table by eventId and hands events to subscribers.
+#
+# Event types are "<entity>.<what happened>", e.g.
+# listing.created, transaction.status_changed, student.suspended.
+# Payloads stay small: ids and the fields that changed, not
+# whole rows.
+#------------------------------------------------------------
+import json
+from collections import namedtuple
+
+
+Event = namedtuple("Event", ["event_id", "event_type", "entity", "entity_id", "payload", "created"])
+
+# Max events per multi-row INSERT
+INSERT_CHUNK_SIZE = 500
+
+
+def _encode(payload):
+    return json.dumps(payload or {}, separators=(",", ":"), default=str)
+
+
+def record_events(cursor, events):
+    """
+    Append (event_type, entity, entity_id, payload) tuples to the outbox
+    in the cursor's transaction. Uses a separate cursor on the same
+    connection so the caller's rowcount/lastrowid are left untouched.
+    """
+    events = list(events)
+    if not events:
+        return 0
+
+    outbox_cursor = cursor.connection.cursor()
+    try:
+        for start in range(0, len(events), INSERT_CHUNK_SIZE):
+            chunk = events[start:start + INSERT_CHUNK_SIZE]
+            params = []
+            for event_type, entity, entity_id, payload in chunk:
+                params.extend([event_type, entity, entity_id, _encode(payload)])
+            outbox_cursor.execute(
+                "INSERT INTO outbox_event (eventType, entity, entityId, payload) VALUES "
+                + ", ".join(["(%s, %s, %s, %s)"] * len(chunk)),
+                params
+            )
+    finally:
+        outbox_cursor.close()
+    return len(events)
+
+
+def record_event(cursor, event_type, entity, entity_id, payload=None):
+    """Append one event to the outbox in the cursor's transaction"""
+    return record_events(cursor, [(event_type, entity, entity_id, payload)])
+
+
+def _to_event(row):
+    payload = row["payload"]
+    if isinstance(payload, (str, bytes)):
+        payload = json.loads(payload)
+    return Event(row["eventId"], row["eventType"], row["entity"], row["entityId"],
+                 payload, row["createDate"])
+
+
+def read_events(cursor, after_id, limit, event_types=None):
+    """Events with eventId > after_id in id order, at most limit of them"""
+    query = """
+        SELECT eventId, eventType, entity, entityId, payload, createDate
+        FROM outbox_event
+        WHERE eventId > %s
+    """
+    params = [after_id]
+    if event_types:
+        query += f" AND eventType IN ({', '.join(['%s'] * len(event_types))})"
+        params.extend(event_types)
+    query += " ORDER BY eventId LIMIT %s"
+    params.append(limit)
+
+    cursor.execute(query, params)
+    return [_to_event(row) for row in cursor.fetchall()]
+
+
+def latest_event_id(cursor):
+    cursor.execute("SELECT COALESCE(MAX(eventId), 0) AS latest FROM outbox_event")
+    return cursor.fetchone()["latest"]
@@ -0,0 +1,187 @@
+#------------------------------------------------------------
+# Managers for in-memory snapshots of SQL data.
+#
+# The listing catalog, the category taxonomy and the similar-
+# listing, typeahead and availability indexes each serve reads
+# from an immutable snapshot: it is replaced, never mutated, so
+# readers take the current one without a lock. SnapshotManager
+# is the part they share:
+#   * build() loads a snapshot from SQL and swaps it in. A
+#     manager that consumes outbox events first reads the
+#     outbox position and moves its consumer offset there
+#     (set_offset), so events after the build are replayed on
+#     top of it;
+#   * current() builds on first use and rebuilds in the
+#     background once the snapshot is older than the
+#     max_age_setting from app.config;
+#   * apply_events() re-selects what a batch of events touched
+#     (select_changes) and swaps in a patched copy (patch);
+#   * status() and collect() report builds, patches and size
+#     for /metrics.
+# Subclasses set the class attributes and implement load(),
+# plus select_changes()/patch() if they subscribe to events.
+#------------------------------------------------------------
+import threading
+import time
+
+from flask import current_app
+
+from backend.db_connection import db
+from backend.events.dispatcher import set_offset
+from backend.events.outbox import latest_event_id
+from backend.metrics.metrics import record_cache
+
+
+class SnapshotManager:
+    # Cache name for record_cache and prefix of the metric names
+    name = None
+    # Human-readable name for log messages
+    label = None
+    # app.config key and default for the age that triggers a rebuild
+    max_age_setting = None
+    default_max_age_seconds = 3600
+    # Outbox consumer kept in step with the builds; None without events
+    consumer = None
+    # (metric suffix, status key, help text) of the size gauge
+    size_metric = None
+
+    def __init__(self):
+        self._current = None
+        self._lock = threading.Lock()
+        self._rebuilding = False
+        self.built_at = None
+        self.max_age_seconds = self.default_max_age_seconds
+        self.stats = {"builds": 0, "last_build_ms": 0.0, "patches": 0,
+                      "rows_patched": 0, "last_error": None}
+
+    def init_app(self, app):
+        self.max_age_seconds = app.config.get(self.max_age_setting, self.default_max_age_seconds)
+
+    # ============================================
+    # Subclass hooks
+    # ============================================
+    def load(self, cursor):
+        """A new snapshot from SQL"""
+        raise NotImplementedError
+
+    def select_changes(self, cursor, events):
+        """(changes, row count) for a batch of events; a count of 0 skips the patch"""
+        raise NotImplementedError
+
+    def patch(self, snapshot, changes):
+        """A copy of snapshot with changes applied"""
+        raise NotImplementedError
+
+    def is_stale(self, snapshot):
+        return time.monotonic() - self.built_at > self.max_age_seconds
+
+    def describe(self, snapshot):
+        """Size figures of a snapshot for status()"""
+        return {}
+
+    # ============================================
+    # Reads and builds
+    # ============================================
+    def peek(self):
+        """Current snapshot without building one, or None"""
+        return self._current
+
+    def current(self):
+        """Current snapshot, built on first use; a stale one is rebuilt in the background"""
+        snapshot = self._current
+        record_cache(self.name, snapshot is not None)
+        if snapshot is None:
+            snapshot = self.build()
+        elif self.is_stale(snapshot):
+            self._rebuild_in_background(current_app._get_current_object())
+        return snapshot
+
+    def build(self):
+        """Full build from SQL"""
+        with self._lock:
+            started = time.perf_counter()
+            cursor = db.get_db().cursor()
+            try:
+                through = latest_event_id(cursor) if self.consumer else None
+                snapshot = self.load(cursor)
+            finally:
+                cursor.close()
+
+            self._current = snapshot
+            self.built_at = time.monotonic()
+            if self.consumer:
+                set_offset(self.consumer, through)
+
+            self.stats["builds"] += 1
+            self.stats["last_build_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            self.stats["last_error"] = None
+            return snapshot
+
+    def _rebuild_in_background(self, app):
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+
+        def rebuild():
+            try:
+                with app.app_context():
+                    try:
+                        self.build()
+                    finally:
+                        db.teardown_request(None)
+            except Exception as e:
+                self.stats["last_error"] = str(e)
+                app.logger.error(f"{self.label} rebuild failed: {str(e)}")
+            finally:
+                self._rebuilding = False
+
+        threading.Thread(target=rebuild, name=f"{self.name.replace('_', '-')}-build", daemon=True).start()
+
+    def apply_events(self, events):
+        """Outbox handler: patch in what the events touched"""
+        if self._current is None:
+            return
+
+        cursor = db.get_db().cursor()
+        try:
+            changes, rows = self.select_changes(cursor, events)
+        finally:
+            cursor.close()
+
+        with self._lock:
+            if self._current is not None and rows:
+                self._current = self.patch(self._current, changes)
+                self.stats["patches"] += 1
+                self.stats["rows_patched"] += rows
+
+    # ============================================
+    # Status and metrics
+    # ============================================
+    def status(self):
+        snapshot = self._current
+        return dict(
+            self.stats,
+            built=snapshot is not None,
+            ageSeconds=round(time.monotonic() - self.built_at, 1) if snapshot is not None else None,
+            **self.describe(snapshot),
+        )
+
+    def collect(self):
+        """Samples for register_collector()"""
+        status = self.status()
+        samples = [
+            (f"huskyhub_{self.name}_build_ms", "gauge",
+             f"Duration of the last full {self.label.lower()} build", [({}, status["last_build_ms"])]),
+            (f"huskyhub_{self.name}_age_seconds", "gauge",
+             f"Time since the last full {self.label.lower()} build (-1 before the first)",
+             [({}, status["ageSeconds"] if status["ageSeconds"] is not None else -1)]),
+        ]
+        if self.consumer:
+            samples.append((f"huskyhub_{self.name}_rows_patched_total", "counter",
+                            f"Rows refreshed in the {self.label.lower()} from outbox events",
+                            [({}, status["rows_patched"])]))
+        if self.size_metric:
+            suffix, key, help_text = self.size_metric
+            samples.append((f"huskyhub_{self.name}_{suffix}", "gauge", help_text, [({}, status[key])]))
+        return samples
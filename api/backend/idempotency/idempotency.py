@@ -0,0 +1,203 @@
+#------------------------------------------------------------
+# Idempotency keys for create endpoints.
+#
+# A client that may retry a POST sends an Idempotency-Key header
+# (any unique string, e.g. a UUID per form submission). The
+# @idempotent decorator:
+#
+#   1. answers from the in-memory cache if the key was seen;
+#   2. otherwise inserts a claim row into idempotency_key on the
+#      request's connection *before* the view runs, so the view's
+#      own commit makes the claim and the new row durable
+#      together, and a concurrent retry blocks on the claim's
+#      primary key until the first attempt finishes;
+#   3. stores the view's 2xx response on the claim row, or rolls
+#      the claim back on an error so the retry runs again.
+#
+# A replay returns the stored status and body with an
+# Idempotent-Replayed: true header. Reusing a key with a
+# different request body is rejected with 422. Keys expire after
+# IDEMPOTENCY_TTL_SECONDS.
+#------------------------------------------------------------
+import hashlib
+import json
+import threading
+import time
+from functools import wraps
+
+import pymysql
+from flask import Response, current_app, jsonify, make_response, request
+
+from backend.db_connection import db
+from backend.metrics.metrics import record_cache
+
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 100
+DEFAULT_TTL_SECONDS = 24 * 3600
+MAX_CACHED = 10000
+PURGE_EVERY_CLAIMS = 500
+
+_config = {"ttl_seconds": DEFAULT_TTL_SECONDS}
+_lock = threading.Lock()
+# (scope, key) -> (expires_at monotonic, request_hash, status, body)
+_cache = {}
+_claims = [0]
+
+
+def _request_hash():
+    body = request.get_json(silent=True)
+    if body is None:
+        raw = request.get_data()
+    else:
+        raw = json.dumps(body, sort_keys=True, separators=(",", ":"), default=str).encode()
+    return hashlib.sha256(raw).hexdigest()
+
+
+def _replay(status, body):
+    response = Response(body, status=status, mimetype="application/json")
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+
+def _mismatch():
+    return jsonify({"error": f"{HEADER} was already used with a different request body"}), 422
+
+
+def _cache_get(scope, key):
+    with _lock:
+        entry = _cache.get((scope, key))
+        if entry is not None and entry[0] <= time.monotonic():
+            del _cache[(scope, key)]
+            entry = None
+    return entry
+
+
+def _cache_put(scope, key, request_hash, status, body):
+    now = time.monotonic()
+    with _lock:
+        if len(_cache) >= MAX_CACHED:
+            for cache_key in [k for k, e in _cache.items() if e[0] <= now]:
+                del _cache[cache_key]
+            if len(_cache) >= MAX_CACHED:
+                # Still full: drop the entries closest to expiry
+                for cache_key in sorted(_cache, key=lambda k: _cache[k][0])[:MAX_CACHED // 10]:
+                    del _cache[cache_key]
+        _cache[(scope, key)] = (now + _config["ttl_seconds"], request_hash, status, body)
+
+
+def _claim(cursor, scope, key, request_hash):
+    """
+    Insert the claim row. Returns None when claimed, or the existing
+    (requestHash, statusCode, responseBody) when the key was used before.
+    """
+    try:
+        cursor.execute("""
+            INSERT INTO idempotency_key (scope, idemKey, requestHash, expiresAt)
+            VALUES (%s, %s, %s, NOW() + INTERVAL %s SECOND)
+        """, (scope, key, request_hash, int(_config["ttl_seconds"])))
+        return None
+    except pymysql.err.IntegrityError:
+        pass
+
+    cursor.execute("""
+        SELECT requestHash, statusCode, responseBody, expiresAt < NOW() AS expired
+        FROM idempotency_key
+        WHERE scope = %s AND idemKey = %s
+    """, (scope, key))
+    row = cursor.fetchone()
+
+    if row is None or row["expired"]:
+        # Expired (or purged in between): take the key over for this request
+        cursor.execute("""
+            REPLACE INTO idempotency_key (scope, idemKey, requestHash, expiresAt)
+            VALUES (%s, %s, %s, NOW() + INTERVAL %s SECOND)
+        """, (scope, key, request_hash, int(_config["ttl_seconds"])))
+        return None
+    return row
+
+
+def _purge_expired(cursor):
+    cursor.execute("DELETE FROM idempotency_key WHERE expiresAt < NOW() LIMIT 1000")
+
+
+def idempotent(scope):
+    """Make a create endpoint safe to retry with an Idempotency-Key header"""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = request.headers.get(HEADER, "").strip()
+            if not key:
+                return view(*args, **kwargs)
+            if len(key) > MAX_KEY_LENGTH:
+                return jsonify({"error": f"{HEADER} must be at most {MAX_KEY_LENGTH} characters"}), 400
+
+            request_hash = _request_hash()
+
+            cached = _cache_get(scope, key)
+            record_cache("idempotency", cached is not None)
+            if cached is not None:
+                if cached[1] != request_hash:
+                    return _mismatch()
+                return _replay(cached[2], cached[3])
+
+            conn = db.get_db()
+            cursor = conn.cursor()
+            try:
+                existing = _claim(cursor, scope, key, request_hash)
+            except Exception as e:
+                conn.rollback()
+                cursor.close()
+                current_app.logger.error(f"Idempotency claim failed for {scope}: {str(e)}")
+                return jsonify({"error": str(e)}), 500
+
+            if existing is not None:
+                conn.rollback()
+                cursor.close()
+                if existing["requestHash"] != request_hash:
+                    return _mismatch()
+                if existing["statusCode"] is None:
+                    return jsonify({"error": "A request with this Idempotency-Key is still being processed"}), 409
+                _cache_put(scope, key, request_hash, existing["statusCode"], existing["responseBody"])
+                return _replay(existing["statusCode"], existing["responseBody"])
+
+            response = make_response(view(*args, **kwargs))
+
+            if response.status_code >= 400:
+                # Nothing was created: release the key so a retry runs again
+                conn.rollback()
+                cursor.close()
+                return response
+
+            body = response.get_data(as_text=True)
+            try:
+                cursor.execute("""
+                    UPDATE idempotency_key
+                    SET statusCode = %s, responseBody = %s
+                    WHERE scope = %s AND idemKey = %s
+                """, (response.status_code, body, scope, key))
+                with _lock:
+                    _claims[0] += 1
+                    purge = _claims[0] % PURGE_EVERY_CLAIMS == 0
+                if purge:
+                    _purge_expired(cursor)
+                conn.commit()
+            except Exception as e:
+                # The view's changes are already committed; a retry gets a 409
+                # until the key expires instead of creating a duplicate.
+                conn.rollback()
+                current_app.logger.error(f"Could not store idempotent response for {scope}: {str(e)}")
+            finally:
+                cursor.close()
+
+            _cache_put(scope, key, request_hash, response.status_code, body)
+            return response
+
+        return wrapper
+    return decorator
+
+
+def init_idempotency(app):
+    """IDEMPOTENCY_TTL_SECONDS sets how long a key is remembered"""
+    _config["ttl_seconds"] = float(app.config.get("IDEMPOTENCY_TTL_SECONDS", DEFAULT_TTL_SECONDS))
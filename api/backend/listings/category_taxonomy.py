@@ -0,0 +1,142 @@
+#------------------------------------------------------------
+# Canonical category taxonomy.
+#
+# The category table holds many rows per real category (every
+# seed row is 'test prep', 'tutoring' or 'moving', as product
+# and as service, with its own description). Browsing and
+# analytics care about the real category, so categoryIds are
+# mapped to canonical groups: one group per normalized name,
+# identified by a slug ('test-prep').
+#
+# The taxonomy is an immutable snapshot:
+#   * group_of, a dense array indexed by categoryId holding the
+#     group index (-1 for ids it does not know), so mapping a
+#     column of categoryIds to groups is one array lookup and
+#     aggregating by group is one bincount;
+#   * a version hash of the mapping, served as the ETag of
+#     GET /listings/categories/groups so dropdowns can
+#     revalidate with If-None-Match instead of refetching.
+# Categories have no write API, so the taxonomy is reloaded in
+# the background once it is older than
+# CATEGORY_TAXONOMY_MAX_AGE_SECONDS; an unchanged mapping keeps
+# its version.
+#------------------------------------------------------------
+import hashlib
+import json
+
+import numpy as np
+
+from backend.events.snapshots import SnapshotManager
+from backend.metrics.metrics import register_collector
+
+
+DEFAULT_MAX_AGE_SECONDS = 300
+
+
+def _normalize(name):
+    return " ".join((name or "").lower().split())
+
+
+def slugify(name):
+    return "-".join(_normalize(name).split()) or "uncategorized"
+
+
+class Taxonomy:
+    """categoryId -> canonical group mapping"""
+
+    def __init__(self, groups, group_of, version):
+        # [{slug, name, types, categoryIds}] in slug order
+        self.groups = groups
+        self.group_of = group_of
+        self.version = version
+        self.index = {group["slug"]: i for i, group in enumerate(groups)}
+        self._members = {}
+
+    @classmethod
+    def build(cls, rows):
+        by_slug = {}
+        for row in rows:
+            slug = slugify(row["name"])
+            group = by_slug.setdefault(slug, {
+                "slug": slug,
+                "name": _normalize(row["name"]).title() or "Uncategorized",
+                "types": set(),
+                "categoryIds": [],
+            })
+            group["types"].add(row["type"])
+            group["categoryIds"].append(row["categoryId"])
+
+        groups = []
+        for slug in sorted(by_slug):
+            group = by_slug[slug]
+            groups.append(dict(group, types=sorted(group["types"]),
+                               categoryIds=sorted(group["categoryIds"])))
+
+        size = max((row["categoryId"] for row in rows), default=-1) + 1
+        group_of = np.full(size, -1, dtype=np.int64)
+        for i, group in enumerate(groups):
+            group_of[group["categoryIds"]] = i
+
+        version = hashlib.sha1(
+            json.dumps(groups, separators=(",", ":")).encode()
+        ).hexdigest()[:16]
+        return cls(groups, group_of, version)
+
+    def lookup(self, name_or_slug):
+        """Group index for a slug or a raw category name, None if unknown"""
+        return self.index.get(slugify(name_or_slug))
+
+    def groups_of(self, category_ids):
+        """Group index per categoryId (-1 for unknown ids), vectorized"""
+        category_ids = np.asarray(category_ids, dtype=np.int64)
+        if len(self.group_of) == 0:
+            return np.full(len(category_ids), -1, dtype=np.int64)
+        known = (category_ids >= 0) & (category_ids < len(self.group_of))
+        return np.where(known, self.group_of[np.where(known, category_ids, 0)], -1)
+
+    def members(self, group):
+        """Dense boolean array over categoryIds: True for the group's ids"""
+        members = self._members.get(group)
+        if members is None:
+            members = self._members[group] = self.group_of == group
+        return members
+
+    def count_by_group(self, category_ids, weights=None):
+        """Per group, the count (or weight sum) of the given categoryIds"""
+        groups = self.groups_of(category_ids)
+        return np.bincount(groups + 1, weights=weights, minlength=len(self.groups) + 1)[1:]
+
+    def to_dict(self):
+        return {"version": self.version, "groups": self.groups}
+
+
+class CategoryTaxonomy(SnapshotManager):
+    name = "category_taxonomy"
+    label = "Category taxonomy"
+    max_age_setting = "CATEGORY_TAXONOMY_MAX_AGE_SECONDS"
+    default_max_age_seconds = DEFAULT_MAX_AGE_SECONDS
+    size_metric = ("groups", "groups", "Canonical category groups in the taxonomy")
+
+    def __init__(self):
+        super().__init__()
+        self.stats["versions"] = 0
+
+    def load(self, cursor):
+        """Rebuild from the category table (descriptions are not needed)"""
+        cursor.execute("SELECT categoryId, name, type FROM category")
+        taxonomy = Taxonomy.build(cursor.fetchall())
+        # Runs under the build lock, so _current is the taxonomy being replaced
+        if self._current is None or self._current.version != taxonomy.version:
+            self.stats["versions"] += 1
+        return taxonomy
+
+    def describe(self, taxonomy):
+        return {
+            "version": taxonomy.version if taxonomy is not None else None,
+            "groups": len(taxonomy.groups) if taxonomy is not None else 0,
+        }
+
+
+category_taxonomy = CategoryTaxonomy()
+
+register_collector(category_taxonomy.collect)
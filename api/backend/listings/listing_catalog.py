@@ -0,0 +1,403 @@
+#------------------------------------------------------------
+# In-memory listing catalog for GET /listings and
+# GET /listings/facets.
+#
+# The browse query joins listing, category and student on every
+# request. The catalog runs that query once and keeps the result
+# as a snapshot:
+#   * one numpy array per filter/sort column (listingId,
+#     categoryId, providerId, price, status, rating, review
+#     count, rating score, verified provider, lastUpdate,
+#     createDate), so
+#     filters are vectorized comparisons and sorts are argsorts
+#     over the matching positions;
+#   * the original result rows, returned unchanged, so a catalog
+#     response is identical to the SQL one.
+#
+# Snapshots are swapped by a SnapshotManager (see
+# backend/events/snapshots.py). Listing, review and provider
+# outbox events re-select only the affected listings and patch
+# them in. A full rebuild happens on first use, after a rating
+# rescore changed every score, and in the background once the
+# snapshot is older than LISTING_CATALOG_MAX_AGE_SECONDS, as a
+# safety net for changes made outside the API.
+#------------------------------------------------------------
+import numpy as np
+from flask import current_app
+
+from backend.events.dispatcher import subscribe
+from backend.events.snapshots import SnapshotManager
+from backend.metrics.metrics import register_collector
+
+
+# Same columns as the browse query always returned
+LISTING_SELECT = """
+    SELECT
+        l.listingId,
+        l.title,
+        l.description,
+        l.price,
+        l.unit,
+        l.imageUrl,
+        l.createDate,
+        l.lastUpdate,
+        l.listingStatus,
+        c.categoryId,
+        c.name AS category_name,
+        c.type AS category_type,
+        provider.stuId AS provider_id,
+        CONCAT(provider.firstName, ' ', provider.lastName) AS provider_name,
+        provider.verifiedStatus AS provider_verified,
+        ROUND(l.ratingSum / NULLIF(l.ratingCount, 0), 2) AS listing_avg_rating,
+        l.ratingCount AS review_count,
+        l.ratingScore AS rating_score
+    FROM listing l
+    INNER JOIN category c ON l.categoryId = c.categoryId
+    INNER JOIN student provider ON l.providerId = provider.stuId
+    WHERE 1=1
+"""
+
+# sort parameter -> SQL ORDER BY, for the fallback path
+SORT_ORDERS = {
+    "recent": "l.lastUpdate DESC",
+    "newest": "l.createDate DESC",
+    "price": "l.price ASC",
+    "-price": "l.price DESC",
+    # Bayesian score (see backend/review/rating_score.py); unrated
+    # listings have NULL, which sorts last, and idx_listing_rating_score
+    # serves the order
+    "rating": "l.ratingScore DESC",
+}
+
+STATUS_CODES = {"draft": 0, "active": 1, "inactive": 2, "removed": 3}
+
+# Upper bounds of the price facet buckets
+PRICE_BUCKETS = (10, 25, 50, 100, 250)
+
+CONSUMER = "listing_catalog"
+DEFAULT_MAX_AGE_SECONDS = 600
+
+# Events that can change a row of the browse query
+LISTING_EVENTS = ("listing.created", "listing.updated", "listing.removed", "review.created")
+# Every rated listing's score changed (see rating_score.py)
+RESCORE_EVENTS = ("rating.rescored",)
+PROVIDER_EVENTS = ("student.updated", "student.verified", "student.suspended",
+                   "student.unsuspended", "student.reactivated", "suspension.lifted")
+
+COLUMN_TYPES = {
+    "listingId": np.int64,
+    "categoryId": np.int64,
+    "providerId": np.int64,
+    "price": np.float64,
+    "status": np.int8,
+    "rating": np.float64,
+    "reviews": np.int64,
+    "score": np.float64,
+    "verified": np.bool_,
+    "updated": np.float64,
+    "created": np.float64,
+}
+
+
+def _float_or_nan(value):
+    return float(value) if value is not None else np.nan
+
+
+def _column_values(row):
+    return (
+        row["listingId"],
+        row["categoryId"],
+        row["provider_id"],
+        float(row["price"]),
+        STATUS_CODES.get(row["listingStatus"], -1),
+        _float_or_nan(row["listing_avg_rating"]),
+        row["review_count"],
+        _float_or_nan(row["rating_score"]),
+        bool(row["provider_verified"]),
+        row["lastUpdate"].timestamp(),
+        row["createDate"].timestamp(),
+    )
+
+
+def _columns(rows):
+    values = [_column_values(row) for row in rows]
+    return {
+        name: np.fromiter((v[i] for v in values), dtype=dtype, count=len(values))
+        for i, (name, dtype) in enumerate(COLUMN_TYPES.items())
+    }
+
+
+def _search_text(row):
+    return f"{row['title']}\n{row['description']}".lower()
+
+
+class CatalogSnapshot:
+    """Immutable column arrays plus the result rows they were built from"""
+
+    def __init__(self, columns, rows, text, position):
+        self.columns = columns
+        self.rows = rows
+        self.text = text
+        self.position = position
+        self._orders = {}
+        self._provider_rating = None
+        self.price_bucket = np.searchsorted(PRICE_BUCKETS, columns["price"], side="right")
+        self.category_names = {row["categoryId"]: row["category_name"] for row in rows}
+
+    @classmethod
+    def build(cls, rows):
+        rows = list(rows)
+        return cls(
+            _columns(rows), rows, [_search_text(row) for row in rows],
+            {row["listingId"]: i for i, row in enumerate(rows)},
+        )
+
+    def patched(self, changed_rows):
+        """A copy with changed_rows replacing (or appended to) the existing rows"""
+        rows = list(self.rows)
+        text = list(self.text)
+        position = dict(self.position)
+        columns = {name: array.copy() for name, array in self.columns.items()}
+
+        appended = []
+        for row in changed_rows:
+            i = position.get(row["listingId"])
+            if i is None:
+                appended.append(row)
+                continue
+            rows[i] = row
+            text[i] = _search_text(row)
+            for name, value in zip(COLUMN_TYPES, _column_values(row)):
+                columns[name][i] = value
+
+        if appended:
+            extra = _columns(appended)
+            for name in columns:
+                columns[name] = np.concatenate([columns[name], extra[name]])
+            for row in appended:
+                position[row["listingId"]] = len(rows)
+                rows.append(row)
+                text.append(_search_text(row))
+
+        return CatalogSnapshot(columns, rows, text, position)
+
+    def __len__(self):
+        return len(self.rows)
+
+    # ============================================
+    # Queries
+    # ============================================
+    def mask(self, status=None, category_id=None, category_in=None, listing_in=None,
+             provider_id=None, search=None, verified=None, min_price=None, max_price=None):
+        """
+        Boolean mask of the rows that pass every given filter. category_in is
+        a boolean array indexed by categoryId (see Taxonomy.members);
+        listing_in is a sorted array of listingIds.
+        """
+        cols = self.columns
+        mask = np.ones(len(self.rows), dtype=np.bool_)
+
+        if status:
+            mask &= cols["status"] == STATUS_CODES.get(status, -2)
+        if category_id is not None:
+            mask &= cols["categoryId"] == category_id
+        if category_in is not None:
+            ids = cols["categoryId"]
+            known = ids < len(category_in)
+            if len(category_in):
+                mask &= known & category_in[np.where(known, ids, 0)]
+            else:
+                mask &= known
+        if listing_in is not None:
+            mask &= np.isin(cols["listingId"], listing_in, assume_unique=True)
+        if provider_id is not None:
+            mask &= cols["providerId"] == provider_id
+        if verified is not None:
+            mask &= cols["verified"] == verified
+        if min_price is not None:
+            mask &= cols["price"] >= min_price
+        if max_price is not None:
+            mask &= cols["price"] <= max_price
+
+        if search:
+            # Substring test only on the rows the column filters kept
+            term = search.lower()
+            for i in np.flatnonzero(mask):
+                if term not in self.text[i]:
+                    mask[i] = False
+        return mask
+
+    def match(self, **filters):
+        """Positions of the rows that pass every given filter"""
+        return np.flatnonzero(self.mask(**filters))
+
+    def order(self, sort="recent"):
+        """
+        All positions in sort order. Computed once per snapshot and key, so a
+        query only has to keep the positions its mask allows.
+        """
+        order = self._orders.get(sort)
+        if order is None:
+            cols = self.columns
+            if sort == "price":
+                key = cols["price"]
+            elif sort == "-price":
+                key = -cols["price"]
+            elif sort == "rating":
+                key = np.where(np.isnan(cols["score"]), np.inf, -cols["score"])
+            elif sort == "newest":
+                key = -cols["created"]
+            else:
+                key = -cols["updated"]
+            order = self._orders[sort] = np.argsort(key, kind="stable")
+        return order
+
+    def provider_rating(self):
+        """
+        Per row, the review-weighted average rating across all of that row's
+        provider's listings (NaN when the provider has no reviews)
+        """
+        if self._provider_rating is None:
+            cols = self.columns
+            reviews = cols["reviews"].astype(np.float64)
+            rated = np.nan_to_num(cols["rating"]) * reviews
+            total = np.bincount(cols["providerId"], weights=rated)
+            count = np.bincount(cols["providerId"], weights=reviews)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                self._provider_rating = (total / count)[cols["providerId"]]
+        return self._provider_rating
+
+    def query(self, sort="recent", limit=None, **filters):
+        """Result rows for the filters, in the requested order (the first limit of them)"""
+        mask = self.mask(**filters)
+        order = self.order(sort)
+        return [self.rows[i] for i in order[mask[order]][:limit]]
+
+    def facets(self, positions, taxonomy=None):
+        """
+        Counts per category, price bucket and provider verification, plus per
+        canonical category group when a taxonomy is given
+        """
+        cols = self.columns
+
+        # categoryIds are small integers, so a bincount beats sorting
+        counts = np.bincount(cols["categoryId"][positions])
+        categories = sorted(
+            ({"categoryId": int(c), "name": self.category_names.get(int(c)), "count": int(counts[c])}
+             for c in np.flatnonzero(counts)),
+            key=lambda facet: -facet["count"]
+        )
+
+        bucket_counts = np.bincount(self.price_bucket[positions], minlength=len(PRICE_BUCKETS) + 1)
+        bounds = (0,) + PRICE_BUCKETS + (None,)
+        price_buckets = [
+            {"min": bounds[i], "max": bounds[i + 1], "count": int(n)}
+            for i, n in enumerate(bucket_counts)
+        ]
+
+        verified = int(np.count_nonzero(cols["verified"][positions]))
+        facets = {
+            "total": int(len(positions)),
+            "categories": categories,
+            "priceBuckets": price_buckets,
+            "verifiedProvider": {"true": verified, "false": int(len(positions)) - verified},
+        }
+        if taxonomy is not None:
+            group_counts = taxonomy.count_by_group(cols["categoryId"][positions])
+            facets["categoryGroups"] = sorted(
+                ({"slug": taxonomy.groups[g]["slug"], "name": taxonomy.groups[g]["name"],
+                  "count": int(group_counts[g])}
+                 for g in np.flatnonzero(group_counts)),
+                key=lambda facet: -facet["count"]
+            )
+        return facets
+
+
+def touched_listings(events):
+    """
+    SQL condition on l (listing) and its params selecting the listings a
+    batch of listing, review and provider events touched. Provider events
+    select all of the provider's listings.
+    """
+    listing_ids = set()
+    provider_ids = set()
+    for event in events:
+        if event.event_type == "review.created":
+            listing_ids.add(event.payload["listId"])
+        elif event.event_type in LISTING_EVENTS:
+            listing_ids.add(event.entity_id)
+        else:
+            provider_ids.add(event.entity_id)
+
+    conditions = []
+    params = []
+    if listing_ids:
+        conditions.append(f"l.listingId IN ({', '.join(['%s'] * len(listing_ids))})")
+        params.extend(listing_ids)
+    if provider_ids:
+        conditions.append(f"l.providerId IN ({', '.join(['%s'] * len(provider_ids))})")
+        params.extend(provider_ids)
+    return f"({' OR '.join(conditions)})", params
+
+
+class ListingCatalog(SnapshotManager):
+    name = "listing_catalog"
+    label = "Listing catalog"
+    max_age_setting = "LISTING_CATALOG_MAX_AGE_SECONDS"
+    default_max_age_seconds = DEFAULT_MAX_AGE_SECONDS
+    consumer = CONSUMER
+    size_metric = ("rows", "rows", "Listings held in the in-memory catalog")
+
+    def __init__(self):
+        super().__init__()
+        self.enabled = True
+
+    def init_app(self, app):
+        """LISTING_CATALOG_ENABLED and LISTING_CATALOG_MAX_AGE_SECONDS from app.config"""
+        super().init_app(app)
+        self.enabled = app.config.get("LISTING_CATALOG_ENABLED", True)
+
+    def snapshot(self):
+        """
+        Current snapshot, loading it on first use. Returns None when the
+        catalog is disabled or could not be loaded, so callers use SQL.
+        """
+        if not self.enabled:
+            return None
+        try:
+            return self.current()
+        except Exception as e:
+            self.stats["last_error"] = str(e)
+            current_app.logger.error(f"Listing catalog load failed: {str(e)}")
+            return None
+
+    def load(self, cursor):
+        cursor.execute(LISTING_SELECT)
+        return CatalogSnapshot.build(cursor.fetchall())
+
+    def apply_events(self, events):
+        if self._current is not None and any(event.event_type in RESCORE_EVENTS for event in events):
+            # Too many rows to patch; the rebuild also covers the rest of the batch
+            self.build()
+            return
+        super().apply_events(events)
+
+    def select_changes(self, cursor, events):
+        condition, params = touched_listings(events)
+        cursor.execute(LISTING_SELECT + f" AND {condition}", params)
+        rows = cursor.fetchall()
+        return rows, len(rows)
+
+    def patch(self, snapshot, rows):
+        return snapshot.patched(rows)
+
+    def describe(self, snapshot):
+        return {"enabled": self.enabled, "rows": len(snapshot) if snapshot is not None else 0}
+
+
+listing_catalog = ListingCatalog()
+
+register_collector(listing_catalog.collect)
+
+subscribe(CONSUMER, listing_catalog.apply_events,
+          event_types=LISTING_EVENTS + PROVIDER_EVENTS + RESCORE_EVENTS, batch=True)
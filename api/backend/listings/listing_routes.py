@@ -1,11 +1,30 @@
+from datetime import datetime
+
+import numpy as np
 from flask import Blueprint, request, jsonify
+from backend.availability import intervals
+from backend.availability.availability_index import MAX_WINDOW_DAYS, availability_index
 from backend.db_connection import db
+from backend.db_connection.batch import parse_ids, select_fields, fetch_by_ids
+from backend.idempotency.idempotency import idempotent
+from backend.events.outbox import record_event
+from backend.listings.listing_catalog import (
+    CatalogSnapshot, LISTING_SELECT, SORT_ORDERS, listing_catalog
+)
+from backend.listings.category_taxonomy import category_taxonomy
+from backend.listings.personalized_ranking import rank
+from backend.listings.similar_listings import SUMMARY_FIELDS, similar_listings
+from backend.review.rating_histogram import rating_histograms
 from mysql.connector import Error
 from flask import current_app
 
 # Create listings blueprint
 listings = Blueprint("listings", __name__)
 
+REVIEW_PAGE_SIZE = 10
+MAX_REVIEW_PAGE_SIZE = 50
+REVIEW_CURSOR_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
 
 # ============================================
 # GET /listings
@@ -19,95 +38,242 @@ def get_listings():
     Query params:
     - status: Filter by listingStatus (active, inactive, removed)
     - categoryId: Filter by category
+    - categoryGroup / category: Filter by canonical category group (slug or name)
     - providerId: Filter by provider
     - search: Search in title and description
+    - verified: true/false, only listings by (un)verified providers
+    - minPrice / maxPrice: price range
+    - availableFrom / availableTo: only listings with a free slot overlapping
+      this window (ISO dates or datetimes; availableTo defaults to one day
+      after availableFrom)
+    - sort: recent (default), newest, price, -price, rating, relevance
+      (rating orders by Bayesian score, so a few perfect reviews do not
+      outrank many good ones; unrated listings come last)
+    - limit: return only the first N results
+    - buyerId: rank for this buyer (category affinity from their bookings,
+      provider rating, recency); implies sort=relevance unless sort is given
+    Served from the in-memory listing catalog; SQL is only used when the
+    catalog is unavailable.
     """
     try:
-        status = request.args.get('status')
-        category_id = request.args.get('categoryId')
-        category_name = request.args.get('category')
-        provider_id = request.args.get('providerId')
-        search_term = request.args.get('search') or request.args.get('q')
-        
-        current_app.logger.info(f'Getting listings - status: {status}, category: {category_id}, provider: {provider_id}')
-        
-        cursor = db.get_db().cursor()
-        
-        query = """
-            SELECT 
-                l.listingId,
-                l.title,
-                l.description,
-                l.price,
-                l.unit,
-                l.imageUrl,
-                l.createDate,
-                l.lastUpdate,
-                l.listingStatus,
-                c.categoryId,
-                c.name AS category_name,
-                c.type AS category_type,
-                provider.stuId AS provider_id,
-                CONCAT(provider.firstName, ' ', provider.lastName) AS provider_name,
-                provider.verifiedStatus AS provider_verified,
-                ROUND(AVG(r.rating), 2) AS listing_avg_rating,
-                COUNT(DISTINCT r.reviewId) AS review_count
-            FROM listing l
-            INNER JOIN category c ON l.categoryId = c.categoryId
-            INNER JOIN student provider ON l.providerId = provider.stuId
-            LEFT JOIN review r ON l.listingId = r.listId
-            WHERE 1=1
-        """
-        
-        params = []
-        
-        # Add filters
-        if status:
-            query += " AND l.listingStatus = %s"
-            params.append(status)
-        
-        if category_id:
-            query += " AND l.categoryId = %s"
-            params.append(category_id)
-        
-        if category_name and category_name != 'All':
-            query += " AND c.name = %s"
-            params.append(category_name)
-        
-        if provider_id:
-            query += " AND l.providerId = %s"
-            params.append(provider_id)
-        
-        if search_term:
-            query += " AND (l.title LIKE %s OR l.description LIKE %s)"
-            search_pattern = f"%{search_term}%"
-            params.extend([search_pattern, search_pattern])
-        
-        query += """
-            GROUP BY l.listingId, l.title, l.description, l.price, l.unit, l.imageUrl,
-                     l.createDate, l.lastUpdate, l.listingStatus,
-                     c.categoryId, c.name, c.type,
-                     provider.stuId, provider.firstName, provider.lastName, provider.verifiedStatus
-            ORDER BY l.lastUpdate DESC
-        """
-        
-        cursor.execute(query, params)
-        results = cursor.fetchall()
-        cursor.close()
+        filters, sort = _listing_filters(request.args)
+        buyer_id = _optional_int(request.args, 'buyerId')
+        limit = _optional_int(request.args, 'limit')
+        if buyer_id is not None and 'sort' not in request.args:
+            sort = 'relevance'
+        if sort == 'relevance' and buyer_id is None:
+            raise ValueError('sort=relevance requires buyerId')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        current_app.logger.info(f'Getting listings - {filters}, sort: {sort}, buyer: {buyer_id}')
+        _resolve_category_group(filters)
+        _resolve_availability(filters)
+
+        headers = {}
+        snapshot = listing_catalog.snapshot()
+        if snapshot is not None:
+            headers['X-Cache'] = 'HIT'
+        else:
+            headers['X-Cache'] = 'MISS'
+
+        if sort == 'relevance':
+            if snapshot is None:
+                snapshot = CatalogSnapshot.build(_query_listings(filters, 'recent'))
+                filters = {}
+            # Ties keep the default (most recently updated first) order
+            order = snapshot.order('recent')
+            positions = rank(snapshot, order[snapshot.mask(**filters)[order]], buyer_id)
+            results = [snapshot.rows[i] for i in positions[:limit]]
+            headers['X-Ranking'] = 'personalized'
+        elif snapshot is not None:
+            results = snapshot.query(sort=sort, limit=limit, **filters)
+        else:
+            results = _query_listings(filters, sort, limit)
         
         current_app.logger.info(f'Found {len(results)} listings')
-        return jsonify(results), 200
+        return jsonify(results), 200, headers
         
-    except Error as e:
+    except Exception as e:
         current_app.logger.error(f'Error getting listings: {str(e)}')
         return jsonify({'error': str(e)}), 500
 
 
+# ============================================
+# GET /listings/facets
+# Counts for the browse filters
+# ============================================
+@listings.route("/facets", methods=["GET"])
+def get_listing_facets():
+    """
+    Listing counts per category, canonical category group, price bucket and
+    provider verification for the same filters as GET /listings
+    """
+    try:
+        filters, _ = _listing_filters(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        _resolve_category_group(filters)
+        _resolve_availability(filters)
+        snapshot = listing_catalog.snapshot()
+        cache_status = 'HIT'
+        if snapshot is None:
+            snapshot = CatalogSnapshot.build(_query_listings(filters, 'recent'))
+            filters = {}
+            cache_status = 'MISS'
+        
+        facets = snapshot.facets(snapshot.match(**filters), category_taxonomy.current())
+        return jsonify(facets), 200, {'X-Cache': cache_status}
+        
+    except Exception as e:
+        current_app.logger.error(f'Error getting listing facets: {str(e)}')
+        return jsonify({'error': str(e)}), 500
+
+
+def _optional_int(args, name):
+    value = args.get(name)
+    if not value:
+        return None
+    if not value.isdigit():
+        raise ValueError(f'{name} must be an integer')
+    return int(value)
+
+
+def _optional_float(args, name):
+    value = args.get(name)
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f'{name} must be a number')
+
+
+def _listing_filters(args):
+    """Browse filters shared by GET /listings and GET /listings/facets"""
+    sort = args.get('sort', 'recent')
+    if sort not in SORT_ORDERS and sort != 'relevance':
+        raise ValueError(f"sort must be one of: {list(SORT_ORDERS) + ['relevance']}")
+
+    verified = args.get('verified')
+    if verified is not None:
+        if verified.lower() not in ('true', 'false', '1', '0'):
+            raise ValueError('verified must be true or false')
+        verified = verified.lower() in ('true', '1')
+
+    filters = {
+        'status': args.get('status'),
+        'category_id': _optional_int(args, 'categoryId'),
+        'category_group': args.get('categoryGroup') or args.get('category'),
+        'provider_id': _optional_int(args, 'providerId'),
+        'search': args.get('search') or args.get('q'),
+        'verified': verified,
+        'min_price': _optional_float(args, 'minPrice'),
+        'max_price': _optional_float(args, 'maxPrice'),
+        'available': None,
+    }
+    if args.get('availableFrom') or args.get('availableTo'):
+        if not args.get('availableFrom'):
+            raise ValueError('availableTo requires availableFrom')
+        filters['available'] = intervals.parse_window(
+            args, 1, MAX_WINDOW_DAYS, None, names=('availableFrom', 'availableTo')
+        )
+    return filters, sort
+
+
+def _resolve_availability(filters):
+    """
+    Replace the availability window in filters with the sorted listingIds
+    that have a free slot in it, from the availability index
+    """
+    window = filters.pop('available', None)
+    filters['listing_in'] = availability_index.available(*window) if window else None
+
+
+def _resolve_category_group(filters):
+    """
+    Replace the category group name/slug in filters with the taxonomy's
+    boolean categoryId mask (all False for an unknown group)
+    """
+    group_name = filters.pop('category_group', None)
+    filters['category_in'] = None
+    if group_name and group_name != 'All':
+        taxonomy = category_taxonomy.current()
+        group = taxonomy.lookup(group_name)
+        filters['category_in'] = taxonomy.members(group) if group is not None \
+            else np.zeros(0, dtype=np.bool_)
+
+
+def _query_listings(filters, sort, limit=None):
+    """The browse query in SQL, for when the catalog is unavailable"""
+    query = LISTING_SELECT
+    params = []
+    
+    if filters['status']:
+        query += " AND l.listingStatus = %s"
+        params.append(filters['status'])
+    
+    if filters['category_id'] is not None:
+        query += " AND l.categoryId = %s"
+        params.append(filters['category_id'])
+    
+    if filters['category_in'] is not None:
+        category_ids = np.flatnonzero(filters['category_in']).tolist()
+        if category_ids:
+            query += f" AND l.categoryId IN ({', '.join(['%s'] * len(category_ids))})"
+            params.extend(category_ids)
+        else:
+            query += " AND FALSE"
+    
+    if filters['listing_in'] is not None:
+        if len(filters['listing_in']):
+            query += f" AND l.listingId IN ({', '.join(['%s'] * len(filters['listing_in']))})"
+            params.extend(filters['listing_in'].tolist())
+        else:
+            query += " AND FALSE"
+    
+    if filters['provider_id'] is not None:
+        query += " AND l.providerId = %s"
+        params.append(filters['provider_id'])
+    
+    if filters['search']:
+        query += " AND (l.title LIKE %s OR l.description LIKE %s)"
+        search_pattern = f"%{filters['search']}%"
+        params.extend([search_pattern, search_pattern])
+    
+    if filters['verified'] is not None:
+        query += " AND provider.verifiedStatus = %s"
+        params.append(1 if filters['verified'] else 0)
+    
+    if filters['min_price'] is not None:
+        query += " AND l.price >= %s"
+        params.append(filters['min_price'])
+    
+    if filters['max_price'] is not None:
+        query += " AND l.price <= %s"
+        params.append(filters['max_price'])
+    
+    query += f" ORDER BY {SORT_ORDERS[sort]}"
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit)
+    
+    cursor = db.get_db().cursor()
+    cursor.execute(query, params)
+    results = cursor.fetchall()
+    cursor.close()
+    return results
+
+
 # ============================================
 # POST /listings
 # Create new service offering [Jessica-2]
 # ============================================
 @listings.route("/", methods=["POST"])
+@idempotent("listings")
 def create_listing():
     """
     Jessica-2: Create new service offering
@@ -141,6 +307,11 @@ def create_listing():
             data['unit'],
             data.get('imageUrl', '')
         ))
+        record_event(cursor, 'listing.created', 'listing', cursor.lastrowid, {
+            'categoryId': data['categoryId'],
+            'providerId': data['providerId'],
+            'price': data['price']
+        })
         
         db.get_db().commit()
         new_id = cursor.lastrowid
@@ -158,6 +329,75 @@ def create_listing():
         return jsonify({'error': str(e)}), 500
 
 
+# Fields available to GET /listings/batch, same names as GET /listings/{id}
+LISTING_BATCH_COLUMNS = {
+    'listingId': 'l.listingId',
+    'title': 'l.title',
+    'description': 'l.description',
+    'price': 'l.price',
+    'unit': 'l.unit',
+    'imageUrl': 'l.imageUrl',
+    'createDate': 'l.createDate',
+    'lastUpdate': 'l.lastUpdate',
+    'listingStatus': 'l.listingStatus',
+    'categoryId': 'c.categoryId',
+    'category_name': 'c.name',
+    'category_type': 'c.type',
+    'provider_id': 'provider.stuId',
+    'provider_name': "CONCAT(provider.firstName, ' ', provider.lastName)",
+    'provider_email': 'provider.email',
+    'provider_phone': 'provider.phone',
+    'provider_bio': 'provider.bio',
+    'provider_verified': 'provider.verifiedStatus',
+    'provider_photo': 'provider.profilePhotoUrl',
+    'avg_rating': '(SELECT ROUND(AVG(r.rating), 2) FROM review r WHERE r.listId = l.listingId)',
+    'review_count': '(SELECT COUNT(*) FROM review r WHERE r.listId = l.listingId)',
+}
+
+
+# ============================================
+# GET /listings/batch?ids=3,1,7&fields=title,price
+# Return many listings in one call [Tim-1]
+# ============================================
+@listings.route("/batch", methods=["GET"])
+def get_listings_batch():
+    """
+    Return the listings for a list of ids, in the order requested
+    Query params:
+    - ids: comma separated listing ids (required)
+    - fields: comma separated subset of fields to return (listingId is always included)
+    """
+    try:
+        try:
+            ids = parse_ids(request.args.get('ids'))
+            columns = select_fields(LISTING_BATCH_COLUMNS, request.args.get('fields'), 'listingId')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        current_app.logger.info(f'Getting {len(ids)} listings by id')
+        
+        cursor = db.get_db().cursor()
+        results, not_found = fetch_by_ids(
+            cursor,
+            columns,
+            """
+            FROM listing l
+            INNER JOIN category c ON l.categoryId = c.categoryId
+            INNER JOIN student provider ON l.providerId = provider.stuId
+            """,
+            'l.listingId',
+            'listingId',
+            ids
+        )
+        cursor.close()
+        
+        return jsonify({'results': results, 'notFound': not_found}), 200
+        
+    except Error as e:
+        current_app.logger.error(f'Error getting listings batch: {str(e)}')
+        return jsonify({'error': str(e)}), 500
+
+
 # ============================================
 # GET /listings/{id}
 # Return detailed listing info [Tim-1, Emma-1, Emma-4, Jessica-2]
@@ -218,6 +458,119 @@ def get_listing_detail(listing_id):
         return jsonify({'error': str(e)}), 500
 
 
+# ============================================
+# GET /listings/{id}/similar
+# Listings similar to this one [Emma-1]
+# ============================================
+@listings.route("/<int:listing_id>/similar", methods=["GET"])
+def get_similar_listings(listing_id):
+    """
+    Active listings most similar to this one by title, category and
+    description, served from the precomputed TF-IDF neighbour table
+    Query params:
+    - k: number of listings (default 5)
+    """
+    k = request.args.get('k', '5')
+    if not k.isdigit() or int(k) < 1:
+        return jsonify({'error': 'k must be a positive integer'}), 400
+
+    try:
+        similar = similar_listings.similar(listing_id, int(k))
+        if similar is None:
+            return jsonify({'error': 'Listing not found'}), 404
+        
+        return jsonify({
+            'listingId': listing_id,
+            'similar': [
+                dict({field: row[field] for field in SUMMARY_FIELDS}, score=round(score, 4))
+                for row, score in similar
+            ]
+        }), 200
+        
+    except Exception as e:
+        current_app.logger.error(f'Error getting similar listings: {str(e)}')
+        return jsonify({'error': str(e)}), 500
+
+
+# ============================================
+# GET /listings/{id}/reviews
+# Paged reviews with rating histogram [Emma-1, Emma-4]
+# ============================================
+@listings.route("/<int:listing_id>/reviews", methods=["GET"])
+def get_listing_reviews(listing_id):
+    """
+    Reviews for one listing, newest first, with its 1-5 star histogram
+    and average rating
+    Query params:
+    - limit: reviews per page (default 10, max 50)
+    - cursor: nextCursor from the previous page
+    """
+    limit = request.args.get('limit', str(REVIEW_PAGE_SIZE))
+    if not limit.isdigit() or not 1 <= int(limit) <= MAX_REVIEW_PAGE_SIZE:
+        return jsonify({'error': f'limit must be between 1 and {MAX_REVIEW_PAGE_SIZE}'}), 400
+    limit = int(limit)
+
+    after = None
+    if request.args.get('cursor'):
+        after = _decode_review_cursor(request.args['cursor'])
+        if after is None:
+            return jsonify({'error': 'Invalid cursor'}), 400
+
+    try:
+        current_app.logger.info(f'Getting reviews for listing {listing_id}')
+        
+        summary = rating_histograms.get(listing_id)
+        if summary is None:
+            return jsonify({'error': 'Listing not found'}), 404
+        
+        # Keyset pagination on (createDate, reviewId), served by
+        # idx_review_listing_date
+        where = "r.listId = %s"
+        params = [listing_id]
+        if after is not None:
+            where += " AND (r.createDate < %s OR (r.createDate = %s AND r.reviewId < %s))"
+            params += [after[0], after[0], after[1]]
+        
+        cursor = db.get_db().cursor()
+        cursor.execute(f"""
+            SELECT
+                r.reviewId,
+                r.rating,
+                r.reviewText,
+                r.createDate,
+                CONCAT(s.firstName, ' ', s.lastName) AS reviewer_name,
+                s.verifiedStatus AS reviewer_verified
+            FROM review r
+            LEFT JOIN student s ON r.reviewerId = s.stuId
+            WHERE {where}
+            ORDER BY r.createDate DESC, r.reviewId DESC
+            LIMIT %s
+        """, params + [limit + 1])
+        results = cursor.fetchall()
+        cursor.close()
+        
+        next_cursor = None
+        if len(results) > limit:
+            results = results[:limit]
+            last = results[-1]
+            next_cursor = f"{last['createDate'].strftime(REVIEW_CURSOR_FORMAT)}_{last['reviewId']}"
+        
+        return jsonify(dict(summary, listingId=listing_id, reviews=results, nextCursor=next_cursor)), 200
+        
+    except Error as e:
+        current_app.logger.error(f'Error getting reviews for listing {listing_id}: {str(e)}')
+        return jsonify({'error': str(e)}), 500
+
+
+def _decode_review_cursor(value):
+    """(createDate, reviewId) from a nextCursor, None if malformed"""
+    created, _, review_id = value.rpartition('_')
+    try:
+        return datetime.strptime(created, REVIEW_CURSOR_FORMAT), int(review_id)
+    except ValueError:
+        return None
+
+
 # ============================================
 # PUT /listings/{id}
 # Update listing [Tim-5, Jessica-3]
@@ -273,6 +626,10 @@ def update_listing(listing_id):
         query = f"UPDATE listing SET {', '.join(update_parts)} WHERE listingId = %s"
         
         cursor.execute(query, values)
+        if cursor.rowcount:
+            changed = {k: data[k] for k in ('price', 'title', 'listingStatus', 'unit') if k in data}
+            changed['fields'] = [k for k in ('price', 'description', 'title', 'listingStatus', 'unit', 'imageUrl') if k in data]
+            record_event(cursor, 'listing.updated', 'listing', listing_id, changed)
         db.get_db().commit()
         
         if cursor.rowcount == 0:
@@ -310,6 +667,8 @@ def delete_listing(listing_id):
         """
         
         cursor.execute(query, (listing_id,))
+        if cursor.rowcount:
+            record_event(cursor, 'listing.removed', 'listing', listing_id)
         db.get_db().commit()
         
         if cursor.rowcount == 0:
@@ -401,6 +760,8 @@ def add_availability(listing_id):
                 slot['endTime']
             ))
         
+        record_event(cursor, 'availability.added', 'listing', listing_id,
+                     {'slots': len(data['slots'])})
         db.get_db().commit()
         cursor.close()
         
@@ -446,6 +807,12 @@ def update_availability(listing_id, availability_id):
             availability_id,
             listing_id
         ))
+        if cursor.rowcount:
+            record_event(cursor, 'availability.updated', 'listing', listing_id, {
+                'availabilityId': availability_id,
+                'startTime': data['startTime'],
+                'endTime': data['endTime']
+            })
         
         db.get_db().commit()
         
@@ -481,6 +848,9 @@ def delete_availability(listing_id, availability_id):
         """
         
         cursor.execute(query, (availability_id, listing_id))
+        if cursor.rowcount:
+            record_event(cursor, 'availability.removed', 'listing', listing_id,
+                         {'availabilityId': availability_id})
         db.get_db().commit()
         
         if cursor.rowcount == 0:
@@ -509,4 +879,104 @@ def get_categories():
         cursor.close()
         return jsonify(categories), 200
     except Error as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+# ============================================
+# GET /listings/categories/groups
+# Canonical category groups for dropdowns and filters
+# ============================================
+@listings.route("/categories/groups", methods=["GET"])
+def get_category_groups():
+    """
+    The canonical taxonomy: one group per distinct category name with the
+    categoryIds it covers. Versioned; send If-None-Match with the ETag to
+    get a 304 when it has not changed.
+    """
+    try:
+        taxonomy = category_taxonomy.current()
+        etag = f'"{taxonomy.version}"'
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if etag in request.headers.get('If-None-Match', ''):
+            return '', 304, headers
+        return jsonify(taxonomy.to_dict()), 200, headers
+
+    except Exception as e:
+        current_app.logger.error(f'Error getting category groups: {str(e)}')
+        return jsonify({'error': str(e)}), 500
+
+
+# ============================================
+# GET /listings/categories/groups/stats
+# Supply and demand per canonical category group [Chris-2]
+# ============================================
+@listings.route("/categories/groups/stats", methods=["GET"])
+def get_category_group_stats():
+    """
+    Per canonical group: active listings, bookings and booking value in the
+    last `days` days (default 30) and booking value in the `days` before that.
+    Aggregated by categoryId in SQL and folded into groups with the
+    taxonomy's categoryId -> group index.
+    """
+    days = request.args.get('days', '30')
+    if not days.isdigit() or int(days) < 1:
+        return jsonify({'error': 'days must be a positive integer'}), 400
+    days = int(days)
+
+    try:
+        taxonomy = category_taxonomy.current()
+        cursor = db.get_db().cursor()
+        try:
+            cursor.execute("""
+                SELECT categoryId, COUNT(*) AS active_listings
+                FROM listing
+                WHERE listingStatus = 'active'
+                GROUP BY categoryId
+            """)
+            supply = cursor.fetchall()
+
+            cursor.execute("""
+                SELECT
+                    l.categoryId,
+                    SUM(t.bookDate >= NOW() - INTERVAL %s DAY) AS recent_bookings,
+                    SUM(CASE WHEN t.bookDate >= NOW() - INTERVAL %s DAY
+                             THEN t.paymentAmt ELSE 0 END) AS recent_value,
+                    SUM(CASE WHEN t.bookDate < NOW() - INTERVAL %s DAY
+                             THEN t.paymentAmt ELSE 0 END) AS previous_value
+                FROM transact_all t
+                INNER JOIN listing l ON t.listId = l.listingId
+                WHERE t.bookDate >= NOW() - INTERVAL %s DAY
+                GROUP BY l.categoryId
+            """, (days, days, days, 2 * days))
+            demand = cursor.fetchall()
+        finally:
+            cursor.close()
+
+        active_listings = taxonomy.count_by_group(
+            [row['categoryId'] for row in supply],
+            weights=[row['active_listings'] for row in supply]
+        )
+        demand_ids = [row['categoryId'] for row in demand]
+        recent_bookings = taxonomy.count_by_group(
+            demand_ids, weights=[float(row['recent_bookings'] or 0) for row in demand])
+        recent_value = taxonomy.count_by_group(
+            demand_ids, weights=[float(row['recent_value'] or 0) for row in demand])
+        previous_value = taxonomy.count_by_group(
+            demand_ids, weights=[float(row['previous_value'] or 0) for row in demand])
+
+        groups = [
+            {
+                'slug': group['slug'],
+                'name': group['name'],
+                'activeListings': int(active_listings[i]),
+                'recentBookings': int(recent_bookings[i]),
+                'recentValue': round(float(recent_value[i]), 2),
+                'previousValue': round(float(previous_value[i]), 2),
+            }
+            for i, group in enumerate(taxonomy.groups)
+        ]
+        groups.sort(key=lambda group: -group['recentValue'])
+        return jsonify({'version': taxonomy.version, 'days': days, 'groups': groups}), 200
+
+    except Exception as e:
+        current_app.logger.error(f'Error getting category group stats: {str(e)}')
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,257 @@
+#------------------------------------------------------------
+# "Similar listings" from TF-IDF nearest neighbours.
+#
+# Offline part (build): every listing's title, category name
+# and description is vectorized with TF-IDF, and the top-K
+# most cosine-similar active listings of every listing are
+# computed with sparse matrix products over batches of rows.
+# The result is a dense n x K table of neighbour positions and
+# scores, so GET /listings/<id>/similar is a dict lookup and a
+# slice of K entries.
+#
+# Online part (refresh): listing outbox events, and provider
+# events for all of a provider's listings (a suspension removes
+# them, a name change alters their rows), re-vectorize only the
+# changed listings with the existing vocabulary, then
+# recompute the rows whose top-K can have changed: the changed
+# listings themselves, listings that had one of them as a
+# neighbour, and listings one of them now beats. Words that
+# were not in the vocabulary are picked up by the next full
+# build, which runs in the background once the index is older
+# than SIMILAR_LISTINGS_REBUILD_SECONDS or enough listings
+# changed since the last one.
+#------------------------------------------------------------
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from backend.events.dispatcher import subscribe
+from backend.events.snapshots import SnapshotManager
+from backend.listings.listing_catalog import PROVIDER_EVENTS, touched_listings
+from backend.metrics.metrics import register_collector
+
+
+DEFAULT_K = 10
+MAX_K = 50
+BATCH_ROWS = 256
+# Cap on one dense similarity block (rows x listings)
+MAX_BLOCK_CELLS = 25_000_000
+MAX_FEATURES = 50000
+DEFAULT_REBUILD_SECONDS = 3600
+# Full rebuild once this share of listings changed incrementally
+REBUILD_CHANGED_RATIO = 0.2
+
+CONSUMER = "similar_listings"
+LISTING_EVENTS = ("listing.created", "listing.updated", "listing.removed")
+
+CORPUS_SELECT = """
+    SELECT
+        l.listingId,
+        l.title,
+        l.description,
+        l.price,
+        l.unit,
+        l.listingStatus,
+        c.name AS category_name,
+        CONCAT(provider.firstName, ' ', provider.lastName) AS provider_name
+    FROM listing l
+    INNER JOIN category c ON l.categoryId = c.categoryId
+    INNER JOIN student provider ON l.providerId = provider.stuId
+"""
+
+# Fields returned for each similar listing
+SUMMARY_FIELDS = ("listingId", "title", "price", "unit", "category_name", "provider_name")
+
+
+def _document(row):
+    # Title twice: it says more about the service than the description
+    return f"{row['title']} {row['title']} {row['category_name']} {row['description']}"
+
+
+class SimilarityIndex:
+    """TF-IDF matrix plus the precomputed top-K table"""
+
+    def __init__(self, vectorizer, matrix, rows, active, k):
+        self.vectorizer = vectorizer
+        self.matrix = matrix
+        self.rows = rows
+        self.active = active
+        self.k = k
+        self.changed_since_build = 0
+        self.position = {row["listingId"]: i for i, row in enumerate(rows)}
+        self.neighbors = np.full((len(rows), k), -1, dtype=np.int64)
+        self.scores = np.zeros((len(rows), k), dtype=np.float32)
+
+    @classmethod
+    def build(cls, rows, k):
+        vectorizer = TfidfVectorizer(
+            stop_words="english", sublinear_tf=True,
+            max_features=MAX_FEATURES, dtype=np.float32
+        )
+        rows = list(rows)
+        matrix = vectorizer.fit_transform([_document(row) for row in rows]).tocsr() if rows \
+            else sparse.csr_matrix((0, 0), dtype=np.float32)
+        active = np.fromiter((row["listingStatus"] == "active" for row in rows),
+                             dtype=np.bool_, count=len(rows))
+        index = cls(vectorizer, matrix, rows, active, k)
+        index.recompute(np.arange(len(rows)))
+        return index
+
+    def recompute(self, positions):
+        """Exact top-K for the given rows, BATCH_ROWS at a time"""
+        n = len(self.rows)
+        k = min(self.k, max(n - 1, 0))
+        if k == 0 or len(positions) == 0:
+            return
+
+        transposed = self.matrix.T.tocsr()
+        inactive = ~self.active
+        batch_rows = max(1, min(BATCH_ROWS, MAX_BLOCK_CELLS // n))
+        for start in range(0, len(positions), batch_rows):
+            batch = positions[start:start + batch_rows]
+            # TF-IDF rows are L2-normalized, so the dot product is the cosine
+            similarity = (self.matrix[batch] @ transposed).toarray()
+            similarity[:, inactive] = -1.0
+            similarity[np.arange(len(batch)), batch] = -1.0
+
+            top = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(similarity, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind="stable")
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+            # No similarity at all (or only inactive listings) is not a neighbour
+            top[top_scores <= 0] = -1
+            self.neighbors[batch, :k] = top
+            self.scores[batch, :k] = np.maximum(top_scores, 0)
+
+    def updated(self, changed_rows):
+        """
+        A copy with changed_rows re-vectorized (with the current vocabulary)
+        and the affected neighbour rows recomputed.
+        """
+        if self.matrix.shape[1] == 0:
+            # Nothing was indexed yet, so there is no vocabulary to reuse
+            by_id = {row["listingId"]: row for row in self.rows}
+            by_id.update((row["listingId"], row) for row in changed_rows)
+            return SimilarityIndex.build(by_id.values(), self.k)
+
+        rows = list(self.rows)
+        active = self.active.copy()
+        appended = []
+        positions = []
+        for row in changed_rows:
+            i = self.position.get(row["listingId"])
+            if i is None:
+                appended.append(row)
+                continue
+            rows[i] = row
+            active[i] = row["listingStatus"] == "active"
+            positions.append(i)
+
+        for row in appended:
+            positions.append(len(rows))
+            rows.append(row)
+        active = np.concatenate([active, np.fromiter(
+            (row["listingStatus"] == "active" for row in appended), dtype=np.bool_, count=len(appended)
+        )])
+
+        # Replace the changed rows of the TF-IDF matrix
+        changed_vectors = self.vectorizer.transform(
+            [_document(rows[i]) for i in positions]
+        ).tocsr().astype(np.float32)
+        n_old = self.matrix.shape[0]
+        keep = np.ones(n_old, dtype=np.bool_)
+        keep[[i for i in positions if i < n_old]] = False
+        # Zero the old rows, add empty rows for new listings, then scatter
+        # the new vectors into place
+        kept = sparse.diags(keep.astype(np.float32)) @ self.matrix
+        padding = sparse.csr_matrix((len(appended), self.matrix.shape[1]), dtype=np.float32)
+        scatter = sparse.csr_matrix(
+            (np.ones(len(positions), dtype=np.float32), (positions, np.arange(len(positions)))),
+            shape=(len(rows), len(positions))
+        )
+        matrix = (sparse.vstack([kept, padding]) + scatter @ changed_vectors).tocsr()
+
+        index = SimilarityIndex(self.vectorizer, matrix, rows, active, self.k)
+        index.changed_since_build = self.changed_since_build + len(positions)
+        index.neighbors[:n_old] = self.neighbors
+        index.scores[:n_old] = self.scores
+
+        # Rows whose top-K can have changed
+        changed = np.array(positions, dtype=np.int64)
+        affected = set(positions)
+        affected.update(np.flatnonzero(np.isin(index.neighbors[:n_old], changed).any(axis=1)).tolist())
+        entering = changed[active[changed]]
+        if len(entering):
+            to_entering = (index.matrix[entering] @ index.matrix.T).toarray()
+            beaten = (to_entering > index.scores[:, -1]).any(axis=0)
+            affected.update(np.flatnonzero(beaten).tolist())
+
+        index.recompute(np.array(sorted(affected), dtype=np.int64))
+        return index
+
+    def similar(self, listing_id, k):
+        """[(row, score)] for the listing's k nearest neighbours, or None if unknown"""
+        i = self.position.get(listing_id)
+        if i is None:
+            return None
+        return [
+            (self.rows[j], float(score))
+            for j, score in zip(self.neighbors[i, :k], self.scores[i, :k])
+            if j >= 0
+        ]
+
+
+class SimilarListings(SnapshotManager):
+    name = "similar_listings"
+    label = "Similar listings"
+    max_age_setting = "SIMILAR_LISTINGS_REBUILD_SECONDS"
+    default_max_age_seconds = DEFAULT_REBUILD_SECONDS
+    consumer = CONSUMER
+    size_metric = ("indexed", "listings", "Listings in the similar-listings index")
+
+    def __init__(self):
+        super().__init__()
+        self.k = DEFAULT_K
+
+    def init_app(self, app):
+        """SIMILAR_LISTINGS_K and SIMILAR_LISTINGS_REBUILD_SECONDS from app.config"""
+        super().init_app(app)
+        self.k = min(int(app.config.get("SIMILAR_LISTINGS_K", DEFAULT_K)), MAX_K)
+
+    def is_stale(self, index):
+        return (super().is_stale(index)
+                or index.changed_since_build > REBUILD_CHANGED_RATIO * max(len(index.rows), 1))
+
+    def similar(self, listing_id, k=None):
+        return self.current().similar(listing_id, min(k or self.k, self.k))
+
+    def load(self, cursor):
+        """Full offline build from SQL"""
+        cursor.execute(CORPUS_SELECT)
+        return SimilarityIndex.build(cursor.fetchall(), self.k)
+
+    def select_changes(self, cursor, events):
+        condition, params = touched_listings(events)
+        cursor.execute(CORPUS_SELECT + f" WHERE {condition}", params)
+        rows = cursor.fetchall()
+        return rows, len(rows)
+
+    def patch(self, index, rows):
+        return index.updated(rows)
+
+    def describe(self, index):
+        return {
+            "listings": len(index.rows) if index is not None else 0,
+            "vocabulary": index.matrix.shape[1] if index is not None else 0,
+            "changedSinceBuild": index.changed_since_build if index is not None else 0,
+        }
+
+
+similar_listings = SimilarListings()
+
+register_collector(similar_listings.collect)
+
+subscribe(CONSUMER, similar_listings.apply_events,
+          event_types=LISTING_EVENTS + PROVIDER_EVENTS, batch=True)
@@ -0,0 +1,207 @@
+#------------------------------------------------------------
+# In-process metrics registry rendered in the Prometheus text
+# exposition format by GET /metrics.
+#
+# The request hooks only do a perf_counter() call, a bisect and
+# a few dict updates under one uncontended lock, so the per
+# request cost stays in the low microseconds.
+#------------------------------------------------------------
+import threading
+import time
+from bisect import bisect_left
+
+from flask import request
+
+from backend.db_connection import db
+
+
+# Upper bounds for the latency (seconds) and response size (bytes) histograms
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+_lock = threading.Lock()
+_request_counts = {}
+_latency = {}
+_response_sizes = {}
+_cache_counts = {}
+_in_flight = [0]
+_collectors = []
+
+
+def _new_histogram(bounds):
+    # one slot per bucket, one for +Inf, then sum and count
+    return [0] * (len(bounds) + 1) + [0.0, 0]
+
+
+def _observe(histograms, key, bounds, value):
+    hist = histograms.get(key)
+    if hist is None:
+        hist = histograms[key] = _new_histogram(bounds)
+    hist[bisect_left(bounds, value)] += 1
+    hist[-2] += value
+    hist[-1] += 1
+
+
+def record_cache(cache_name, hit):
+    """Count a lookup against one of the API's in-memory caches"""
+    with _lock:
+        counts = _cache_counts.get(cache_name)
+        if counts is None:
+            counts = _cache_counts[cache_name] = [0, 0]
+        counts[0 if hit else 1] += 1
+
+
+def register_collector(collector):
+    """
+    Add a callable that returns extra samples at scrape time as a list of
+    (metric_name, metric_type, help_text, [(labels_dict, value), ...]).
+    """
+    _collectors.append(collector)
+
+
+def _before_request():
+    # Timing state lives in the WSGI environ so each hook resolves
+    # the request proxy only once
+    environ = request._get_current_object().environ
+    environ["huskyhub.metrics_started"] = time.perf_counter()
+    environ["huskyhub.metrics_in_flight"] = True
+    with _lock:
+        _in_flight[0] += 1
+
+
+def _after_request(response):
+    req = request._get_current_object()
+    started = req.environ.pop("huskyhub.metrics_started", None)
+    if started is None:
+        return response
+
+    elapsed = time.perf_counter() - started
+    rule = req.url_rule
+    key = (req.blueprint or "", rule.rule if rule is not None else "<unmatched>", req.method)
+    size = response.content_length or 0
+
+    with _lock:
+        count_key = key + (response.status_code,)
+        _request_counts[count_key] = _request_counts.get(count_key, 0) + 1
+        _observe(_latency, key, LATENCY_BUCKETS, elapsed)
+        _observe(_response_sizes, key, SIZE_BUCKETS, size)
+    return response
+
+
+def _teardown_request(exception=None):
+    if not request._get_current_object().environ.pop("huskyhub.metrics_in_flight", False):
+        return
+    with _lock:
+        _in_flight[0] -= 1
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_bound(bound):
+    return repr(float(bound)) if isinstance(bound, float) else str(bound)
+
+
+def _render_histogram(lines, name, help_text, histograms, bounds):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for (blueprint, route, method), hist in sorted(histograms.items()):
+        base = [("blueprint", blueprint), ("route", route), ("method", method)]
+        cumulative = 0
+        for i, bound in enumerate(bounds):
+            cumulative += hist[i]
+            lines.append(f"{name}_bucket{_labels(base + [('le', _format_bound(bound))])} {cumulative}")
+        cumulative += hist[len(bounds)]
+        lines.append(f"{name}_bucket{_labels(base + [('le', '+Inf')])} {cumulative}")
+        lines.append(f"{name}_sum{_labels(base)} {hist[-2]}")
+        lines.append(f"{name}_count{_labels(base)} {hist[-1]}")
+
+
+def render_metrics():
+    """Current registry contents in Prometheus text format (version 0.0.4)"""
+    with _lock:
+        request_counts = dict(_request_counts)
+        latency = {k: list(v) for k, v in _latency.items()}
+        sizes = {k: list(v) for k, v in _response_sizes.items()}
+        cache_counts = {k: list(v) for k, v in _cache_counts.items()}
+        in_flight = _in_flight[0]
+
+    lines = []
+
+    lines.append("# HELP huskyhub_http_requests_total HTTP requests handled by the API")
+    lines.append("# TYPE huskyhub_http_requests_total counter")
+    for (blueprint, route, method, status), count in sorted(request_counts.items()):
+        labels = _labels([("blueprint", blueprint), ("route", route),
+                          ("method", method), ("status", status)])
+        lines.append(f"huskyhub_http_requests_total{labels} {count}")
+
+    _render_histogram(lines, "huskyhub_http_request_duration_seconds",
+                      "Request latency in seconds", latency, LATENCY_BUCKETS)
+    _render_histogram(lines, "huskyhub_http_response_size_bytes",
+                      "Response body size in bytes", sizes, SIZE_BUCKETS)
+
+    lines.append("# HELP huskyhub_http_requests_in_flight Requests currently being served")
+    lines.append("# TYPE huskyhub_http_requests_in_flight gauge")
+    lines.append(f"huskyhub_http_requests_in_flight {in_flight}")
+
+    lines.append("# HELP huskyhub_cache_hits_total Cache lookups that were served from memory")
+    lines.append("# TYPE huskyhub_cache_hits_total counter")
+    for cache_name, (hits, misses) in sorted(cache_counts.items()):
+        lines.append(f"huskyhub_cache_hits_total{_labels([('cache', cache_name)])} {hits}")
+    lines.append("# HELP huskyhub_cache_misses_total Cache lookups that fell through to MySQL")
+    lines.append("# TYPE huskyhub_cache_misses_total counter")
+    for cache_name, (hits, misses) in sorted(cache_counts.items()):
+        lines.append(f"huskyhub_cache_misses_total{_labels([('cache', cache_name)])} {misses}")
+    lines.append("# HELP huskyhub_cache_hit_ratio Share of cache lookups served from memory")
+    lines.append("# TYPE huskyhub_cache_hit_ratio gauge")
+    for cache_name, (hits, misses) in sorted(cache_counts.items()):
+        total = hits + misses
+        ratio = hits / total if total else 0.0
+        lines.append(f"huskyhub_cache_hit_ratio{_labels([('cache', cache_name)])} {ratio}")
+
+    for collector in _collectors:
+        for name, metric_type, help_text, samples in collector():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples:
+                lines.append(f"{name}{_labels(sorted(labels.items()))} {value}")
+
+    return "\n".join(lines) + "\n"
+
+
+def _collect_db_connections():
+    stats = db.connection_stats()
+    routing = db.routing_stats()
+    return [
+        ("huskyhub_db_connections_in_use", "gauge",
+         "MySQL connections currently held by request contexts",
+         [({"role": role}, s["in_use"]) for role, s in sorted(stats.items())]),
+        ("huskyhub_db_connections_peak", "gauge",
+         "Highest number of MySQL connections held at once",
+         [({"role": role}, s["peak"]) for role, s in sorted(stats.items())]),
+        ("huskyhub_db_connections_opened_total", "counter",
+         "MySQL connections opened since startup",
+         [({"role": role}, s["opened"]) for role, s in sorted(stats.items())]),
+        ("huskyhub_db_route_decisions_total", "counter",
+         "Requests routed to each DB target, and fallbacks to the primary by reason",
+         [({"decision": key}, value) for key, value in sorted(routing["decisions"].items())]),
+        ("huskyhub_db_replica_lag_seconds", "gauge",
+         "Last measured replication lag per replica (-1 when unreachable or stopped)",
+         [({"replica": host}, -1 if lag is None else lag)
+          for host, lag in sorted(routing["replicas"].items())]),
+    ]
+
+
+def init_metrics(app):
+    """Install the request hooks that feed the registry"""
+    register_collector(_collect_db_connections)
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
@@ -0,0 +1,18 @@
+from flask import Blueprint, Response, jsonify
+from backend.metrics.metrics import render_metrics
+
+# Create metrics blueprint
+metrics = Blueprint("metrics", __name__)
+
+
+# ============================================
+# GET /metrics
+# Prometheus scrape endpoint
+# ============================================
+@metrics.route("/metrics", methods=["GET"])
+def get_metrics():
+    """Request counts, latency/size histograms, DB connections and cache hit rates"""
+    try:
+        return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
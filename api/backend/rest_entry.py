@@ -4,7 +4,8 @@ import os
 import logging
 from logging.handlers import RotatingFileHandler
 
-from backend.db_connection import db
+from backend.db_connection import db, async_db
+from backend.db_connection.query_profiler import init_query_profiler
 
 
 from backend.students.student_routes import students
@@ -12,6 +13,20 @@ from backend.listings.listing_routes import listings
 from backend.transactions.transaction_routes import transactions
 from backend.admin.admin_routes import admins
 from backend.review.review_routes import reviews
+from backend.bundles.bundle_routes import bundles
+from backend.bundles import bundle_cache
+from backend.listings.listing_catalog import listing_catalog
+from backend.listings.category_taxonomy import category_taxonomy
+from backend.listings.similar_listings import similar_listings
+from backend.search.search_routes import search
+from backend.search.suggest_index import search_suggestions
+from backend.availability.availability_index import availability_index
+from backend.idempotency.idempotency import init_idempotency
+from backend.admin.suspension_expiry import start_expiry_scheduler
+from backend.transactions.transaction_archive import start_archiver
+from backend.events.dispatcher import start_dispatcher
+from backend.metrics.metrics import init_metrics
+from backend.metrics.metrics_routes import metrics
 
 def create_app():
     app = Flask(__name__)
@@ -44,9 +59,60 @@ def create_app():
     app.config["MYSQL_DATABASE_PORT"] = int(os.getenv("DB_PORT").strip())
     app.config["MYSQL_DATABASE_DB"] = os.getenv("DB_NAME").strip()  # Change this to your DB name
 
+    # Optional read replicas: comma separated host[:port] list. Reads go there
+    # unless the replica lags by more than DB_REPLICA_MAX_LAG_SECONDS or the
+    # session wrote within the last DB_READ_YOUR_WRITES_SECONDS.
+    app.config["DB_REPLICA_HOSTS"] = os.getenv("DB_REPLICA_HOSTS", "").strip()
+    app.config["DB_REPLICA_MAX_LAG_SECONDS"] = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5"))
+    app.config["DB_REPLICA_LAG_CHECK_SECONDS"] = float(os.getenv("DB_REPLICA_LAG_CHECK_SECONDS", "5"))
+    app.config["DB_READ_YOUR_WRITES_SECONDS"] = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "10"))
+
+    # Pool used to run a route's independent read queries concurrently
+    app.config["ASYNC_DB_ENABLED"] = os.getenv("ASYNC_DB_ENABLED", "true").lower() == "true"
+    app.config["ASYNC_DB_POOL_SIZE"] = int(os.getenv("ASYNC_DB_POOL_SIZE", "10"))
+    app.config["ASYNC_DB_TIMEOUT_SECONDS"] = float(os.getenv("ASYNC_DB_TIMEOUT_SECONDS", "10"))
+
+    # How long a /bundles page response may be served from memory (0 disables)
+    bundle_cache.configure(float(os.getenv("BUNDLE_CACHE_SECONDS", "15")))
+
+    # In-memory browse catalog; full reload once the snapshot is this old
+    app.config["LISTING_CATALOG_ENABLED"] = os.getenv("LISTING_CATALOG_ENABLED", "true").lower() == "true"
+    app.config["LISTING_CATALOG_MAX_AGE_SECONDS"] = float(os.getenv("LISTING_CATALOG_MAX_AGE_SECONDS", "600"))
+
+    # How often the canonical category taxonomy is re-read from the category table
+    app.config["CATEGORY_TAXONOMY_MAX_AGE_SECONDS"] = float(os.getenv("CATEGORY_TAXONOMY_MAX_AGE_SECONDS", "300"))
+
+    # Neighbours kept per listing for /listings/<id>/similar, and how often
+    # the TF-IDF index is rebuilt from scratch
+    app.config["SIMILAR_LISTINGS_K"] = int(os.getenv("SIMILAR_LISTINGS_K", "10"))
+    app.config["SIMILAR_LISTINGS_REBUILD_SECONDS"] = float(os.getenv("SIMILAR_LISTINGS_REBUILD_SECONDS", "3600"))
+
+    # How often the /search/suggest prefix index is rebuilt from scratch
+    app.config["SEARCH_SUGGEST_REBUILD_SECONDS"] = float(os.getenv("SEARCH_SUGGEST_REBUILD_SECONDS", "3600"))
+
+    # How often the day-bucketed free slot index behind
+    # /listings?availableFrom= is rebuilt from scratch
+    app.config["AVAILABILITY_INDEX_REBUILD_SECONDS"] = float(os.getenv("AVAILABILITY_INDEX_REBUILD_SECONDS", "3600"))
+
+    # How long an Idempotency-Key on a create request is remembered
+    app.config["IDEMPOTENCY_TTL_SECONDS"] = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+
     # Initialize the database connection
     app.logger.info("Initializing database connection")
     db.init_app(app)
+    async_db.init_app(app)
+    init_idempotency(app)
+    listing_catalog.init_app(app)
+    category_taxonomy.init_app(app)
+    similar_listings.init_app(app)
+    search_suggestions.init_app(app)
+    availability_index.init_app(app)
+
+    # Per-route SQL timing and slow query capture (see /admin/debug/queries)
+    init_query_profiler(app)
+
+    # Request counters and histograms served at /metrics
+    init_metrics(app)
 
     # Register HuskyHub blueprints
     app.logger.info("Registering HuskyHub blueprints")
@@ -55,6 +121,18 @@ def create_app():
     app.register_blueprint(transactions,  url_prefix='/transactions')
     app.register_blueprint(admins,        url_prefix='/admin')
     app.register_blueprint(reviews,       url_prefix='/reviews')
+    app.register_blueprint(bundles,       url_prefix='/bundles')
+    app.register_blueprint(search,        url_prefix='/search')
+    app.register_blueprint(metrics)
+
+    # Background job that reactivates students whose temp suspension ended
+    start_expiry_scheduler(app)
+
+    # Background job that moves old completed/cancelled bookings to transact_archive
+    start_archiver(app)
+
+    # Background thread that delivers outbox events to subscribers
+    start_dispatcher(app)
 
 
     # Don't forget to return the app object
@@ -0,0 +1,142 @@
+#------------------------------------------------------------
+# Cached per-listing rating histograms.
+#
+# GET /listings/<id>/reviews returns the 1-5 star histogram and
+# average next to every page of reviews; counting the listing's
+# reviews for each page would cost as much as the old unpaged
+# read. Histograms are cached per listing (LRU) and kept current
+# incrementally: create_review() adds its rating right after
+# the commit, and the review.created outbox events cover reviews
+# written by other API processes.
+#
+# An entry remembers the highest reviewId it was loaded with and
+# the ids applied since, so a review reaching the cache both
+# from create_review() and from its event is counted once.
+#------------------------------------------------------------
+import threading
+from collections import OrderedDict
+
+from backend.db_connection import db
+from backend.events.dispatcher import subscribe
+from backend.metrics.metrics import record_cache, register_collector
+
+
+STARS = (1, 2, 3, 4, 5)
+MAX_CACHED_LISTINGS = 20000
+CONSUMER = "rating_histogram"
+
+
+class _Entry:
+    __slots__ = ("counts", "loaded_max_id", "applied")
+
+    def __init__(self, counts, loaded_max_id):
+        self.counts = counts
+        self.loaded_max_id = loaded_max_id
+        self.applied = set()
+
+    def add(self, review_id, rating):
+        if review_id <= self.loaded_max_id or review_id in self.applied:
+            return
+        self.applied.add(review_id)
+        self.counts[rating - 1] += 1
+
+
+def summarize(counts):
+    """{histogram, count, average} for the response, from [c1..c5]"""
+    total = sum(counts)
+    return {
+        "histogram": {str(star): count for star, count in zip(STARS, counts)},
+        "count": total,
+        "average": round(sum(star * count for star, count in zip(STARS, counts)) / total, 2)
+                   if total else None,
+    }
+
+
+class RatingHistograms:
+    def __init__(self, max_listings=MAX_CACHED_LISTINGS):
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_listings = max_listings
+        self.stats = {"loads": 0, "increments": 0}
+
+    def get(self, listing_id):
+        """Summary for the listing, or None if the listing does not exist"""
+        with self._lock:
+            entry = self._cache.get(listing_id)
+            if entry is not None:
+                self._cache.move_to_end(listing_id)
+                counts = list(entry.counts)
+        record_cache("rating_histogram", entry is not None)
+        if entry is not None:
+            return summarize(counts)
+
+        # Load from the primary: a review.created event for an uncached
+        # listing is dropped, so a load from a lagging replica that misses
+        # that review would keep the wrong count until eviction
+        cursor = db.primary.get_db().cursor()
+        try:
+            # The outer join yields one NULL row for a listing without reviews
+            # and no rows at all for an unknown listing
+            cursor.execute("""
+                SELECT r.rating, COUNT(r.reviewId) AS reviews, MAX(r.reviewId) AS max_id
+                FROM listing l
+                LEFT JOIN review r ON r.listId = l.listingId
+                WHERE l.listingId = %s
+                GROUP BY r.rating
+            """, (listing_id,))
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+        if not rows:
+            return None
+
+        counts = [0] * len(STARS)
+        for row in rows:
+            if row["rating"] is not None:
+                counts[row["rating"] - 1] = row["reviews"]
+        loaded_max_id = max((row["max_id"] or 0 for row in rows), default=0)
+
+        with self._lock:
+            # Another request may have loaded the listing meanwhile. A review
+            # committed after our SELECT is counted when its event arrives.
+            entry = self._cache.setdefault(listing_id, _Entry(counts, loaded_max_id))
+            counts = list(entry.counts)
+            while len(self._cache) > self.max_listings:
+                self._cache.popitem(last=False)
+            self.stats["loads"] += 1
+        return summarize(counts)
+
+    def add(self, listing_id, review_id, rating):
+        """Count a new review if its listing is cached"""
+        with self._lock:
+            entry = self._cache.get(int(listing_id))
+            if entry is not None:
+                entry.add(review_id, int(rating))
+                self.stats["increments"] += 1
+
+    def apply_events(self, events):
+        """Outbox handler for review.created"""
+        for event in events:
+            self.add(event.payload["listId"], event.entity_id, event.payload["rating"])
+
+    def status(self):
+        with self._lock:
+            return dict(self.stats, listings=len(self._cache))
+
+
+rating_histograms = RatingHistograms()
+
+subscribe(CONSUMER, rating_histograms.apply_events, event_types=("review.created",), batch=True)
+
+
+def _collect_histogram_metrics():
+    status = rating_histograms.status()
+    return [
+        ("huskyhub_rating_histograms_cached", "gauge",
+         "Listings with a cached rating histogram", [({}, status["listings"])]),
+        ("huskyhub_rating_histogram_loads_total", "counter",
+         "Rating histograms loaded from the review table", [({}, status["loads"])]),
+    ]
+
+
+register_collector(_collect_histogram_metrics)
@@ -0,0 +1,167 @@
+#------------------------------------------------------------
+# Bayesian rating scores for listings and providers.
+#
+# Sorting by AVG(rating) ranks a listing with one 5-star review
+# above one with hundreds of 4.8s, and needs the average of
+# every row before the first result. Instead listing and student
+# carry maintained columns:
+#
+#   ratingCount, ratingSum   reviews of the listing (for students,
+#                            of all their listings)
+#   ratingScore              (W * M + ratingSum) / (W + ratingCount)
+#
+# where W (rating_prior.priorWeight) is how many reviews' worth
+# of trust the prior gets and M is the global mean rating. The
+# scores are indexed, so sortBy=rating reads the top K rows off
+# the index.
+#
+# create_review() calls record_rating() in its own transaction:
+# it bumps the global counters in rating_prior and rescores the
+# one listing and its provider. Scores are computed with the
+# prior mean stored in rating_prior.scoredMean, so all stored
+# scores agree on one M; once the running mean has drifted from
+# it by RESCORE_DRIFT, the review.created consumer rescores every
+# rated listing and provider with the new mean. Both paths lock
+# the rating_prior row, so a review never lands mid-rescore with
+# the old mean. A rescore records a rating.rescored outbox event
+# so the listing catalog reloads the new scores.
+#------------------------------------------------------------
+import threading
+from datetime import datetime
+
+from backend.db_connection import db
+from backend.events.dispatcher import subscribe
+from backend.events.outbox import record_event
+from backend.metrics.metrics import register_collector
+
+
+PRIOR_ID = 1
+# Prior mean before there are any reviews
+DEFAULT_PRIOR_MEAN = 3.0
+# Rescore everything once the global mean moves this far from scoredMean
+RESCORE_DRIFT = 0.01
+CONSUMER = "rating_score"
+RESCORED_EVENT = "rating.rescored"
+
+_metrics_lock = threading.Lock()
+_metrics = {
+    "rescores": 0,
+    "last_rescore_at": None,
+    "last_rescore_rows": 0,
+    "prior_mean": None,
+}
+
+
+def record_rating(cursor, listing_id, rating):
+    """
+    Count a new review in the prior, its listing and its provider. Runs in
+    the caller's transaction, after the review INSERT.
+    """
+    cursor.execute("""
+        UPDATE rating_prior
+        SET reviewCount = reviewCount + 1,
+            ratingSum = ratingSum + %s
+        WHERE priorId = %s
+    """, (rating, PRIOR_ID))
+    cursor.execute("SELECT priorWeight, scoredMean FROM rating_prior WHERE priorId = %s", (PRIOR_ID,))
+    prior = cursor.fetchone()
+    weight, mean = prior["priorWeight"], prior["scoredMean"]
+
+    # MySQL applies single-table SET assignments left to right, so the
+    # score is computed from the incremented count and sum
+    cursor.execute("""
+        UPDATE listing
+        SET ratingCount = ratingCount + 1,
+            ratingSum = ratingSum + %s,
+            ratingScore = (%s * %s + ratingSum) / (%s + ratingCount)
+        WHERE listingId = %s
+    """, (rating, weight, mean, weight, listing_id))
+    cursor.execute("""
+        UPDATE student
+        SET providerRatingCount = providerRatingCount + 1,
+            providerRatingSum = providerRatingSum + %s,
+            providerRatingScore = (%s * %s + providerRatingSum) / (%s + providerRatingCount)
+        WHERE stuId = (SELECT providerId FROM listing WHERE listingId = %s)
+    """, (rating, weight, mean, weight, listing_id))
+
+
+def rescore(force=False):
+    """
+    Recompute every stored score with the current global mean if it has
+    drifted from scoredMean (always when force). Must be called inside an
+    app context. Returns the number of rows rescored.
+    """
+    conn = db.get_db()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT priorWeight, reviewCount, ratingSum, scoredMean
+            FROM rating_prior
+            WHERE priorId = %s
+            FOR UPDATE
+        """, (PRIOR_ID,))
+        prior = cursor.fetchone()
+        mean = (prior["ratingSum"] / prior["reviewCount"] if prior["reviewCount"]
+                else DEFAULT_PRIOR_MEAN)
+        with _metrics_lock:
+            _metrics["prior_mean"] = float(mean)
+        if not force and abs(float(mean) - float(prior["scoredMean"])) < RESCORE_DRIFT:
+            conn.rollback()
+            return 0
+
+        weight = prior["priorWeight"]
+        cursor.execute("""
+            UPDATE listing
+            SET ratingScore = (%s * %s + ratingSum) / (%s + ratingCount)
+            WHERE ratingCount > 0
+        """, (weight, mean, weight))
+        rows = cursor.rowcount
+        cursor.execute("""
+            UPDATE student
+            SET providerRatingScore = (%s * %s + providerRatingSum) / (%s + providerRatingCount)
+            WHERE providerRatingCount > 0
+        """, (weight, mean, weight))
+        rows += cursor.rowcount
+        cursor.execute("UPDATE rating_prior SET scoredMean = %s WHERE priorId = %s", (mean, PRIOR_ID))
+        record_event(cursor, RESCORED_EVENT, "rating_prior", PRIOR_ID, {"mean": float(mean), "rows": rows})
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    with _metrics_lock:
+        _metrics["rescores"] += 1
+        _metrics["last_rescore_at"] = datetime.now().isoformat()
+        _metrics["last_rescore_rows"] = rows
+    return rows
+
+
+def _rescore_if_drifted(events):
+    """Outbox handler: new reviews move the global mean"""
+    rescore()
+
+
+subscribe(CONSUMER, _rescore_if_drifted, event_types=("review.created",), batch=True)
+
+
+def get_rating_score_metrics():
+    with _metrics_lock:
+        return dict(_metrics)
+
+
+def _collect_rating_score_metrics():
+    snapshot = get_rating_score_metrics()
+    samples = [
+        ("huskyhub_rating_rescores_total", "counter",
+         "Full rescores after the global rating mean drifted", [({}, snapshot["rescores"])]),
+    ]
+    if snapshot["prior_mean"] is not None:
+        samples.append(("huskyhub_rating_prior_mean", "gauge",
+                        "Global mean rating used as the Bayesian prior",
+                        [({}, snapshot["prior_mean"])]))
+    return samples
+
+
+register_collector(_collect_rating_score_metrics)
@@ -1,5 +1,9 @@
 from flask import Blueprint, request, jsonify
 from backend.db_connection import db
+from backend.idempotency.idempotency import idempotent
+from backend.events.outbox import record_event
+from backend.review.rating_histogram import rating_histograms
+from backend.review.rating_score import record_rating
 from mysql.connector import Error
 from flask import current_app
 
@@ -53,6 +57,7 @@ def get_reviews():
 # POST /reviews
 # ============================================
 @reviews.route("/reviews", methods=["POST"])
+@idempotent("reviews")
 def create_review():
     """Emma-4: Create new review after booking"""
     try:
@@ -80,11 +85,20 @@ def create_review():
             data['rating'],
             data.get('reviewText', '')
         ))
+        new_id = cursor.lastrowid
+        record_rating(cursor, data['listId'], data['rating'])
+        record_event(cursor, 'review.created', 'review', new_id, {
+            'listId': data['listId'],
+            'reviewerId': data['reviewerId'],
+            'rating': data['rating']
+        })
         
         db.get_db().commit()
-        new_id = cursor.lastrowid
         cursor.close()
         
+        # Keep the cached histogram for GET /listings/<id>/reviews current
+        rating_histograms.add(data['listId'], new_id, data['rating'])
+        
         current_app.logger.info(f'Review created with ID: {new_id}')
         return jsonify({
             'message': 'Review created successfully',
@@ -0,0 +1,38 @@
+from flask import Blueprint, request, jsonify
+from backend.search.suggest_index import DEFAULT_LIMIT, MAX_LIMIT, search_suggestions
+from flask import current_app
+
+# Create search blueprint
+search = Blueprint("search", __name__)
+
+
+# ============================================
+# GET /search/suggest
+# Typeahead completions for the search boxes
+# ============================================
+@search.route("/suggest", methods=["GET"])
+def suggest():
+    """
+    Heaviest listing titles, category names and provider names with a word
+    starting with the prefix
+    Query params:
+    - prefix: text typed so far (required)
+    - limit: number of suggestions (default 8, max 20)
+    """
+    prefix = request.args.get('prefix', '')
+    if not prefix.strip():
+        return jsonify({'error': 'prefix is required'}), 400
+
+    limit = request.args.get('limit', str(DEFAULT_LIMIT))
+    if not limit.isdigit() or not 1 <= int(limit) <= MAX_LIMIT:
+        return jsonify({'error': f'limit must be between 1 and {MAX_LIMIT}'}), 400
+
+    try:
+        return jsonify({
+            'prefix': prefix,
+            'suggestions': search_suggestions.suggest(prefix, int(limit)),
+        }), 200
+
+    except Exception as e:
+        current_app.logger.error(f'Error getting suggestions for {prefix!r}: {str(e)}')
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,285 @@
+#------------------------------------------------------------
+# Prefix index for GET /search/suggest (typeahead).
+#
+# Suggestions are listing titles, category names and provider
+# names. Each distinct (type, text) is one entry with a weight:
+#   * listing title: 1 + review count of each active listing
+#     with that title;
+#   * category / provider: number of active listings.
+#
+# Every entry is indexed under the suffixes of its text that
+# start at one of its first MAX_KEY_WORDS words, so "calc" and
+# "tutor" both find "Calculus Tutoring". Keys are lowercased
+# UTF-8 truncated to MAX_KEY_BYTES and kept in one sorted
+# fixed-width numpy array (with a parallel entry-id array), so
+# memory is a fixed number of bytes per key however many
+# titles there are. A prefix is a binary search for its key
+# range; small ranges are ranked directly, and the top entries
+# of every range larger than SCAN_LIMIT are precomputed at
+# build time (the nodes of a compressed trie over the keys).
+#
+# Like the listing catalog, the index is a snapshot kept by a
+# SnapshotManager (backend/events/snapshots.py). Listing and
+# review outbox events, and provider events for all of a
+# provider's listings (a suspension removes them, a rename
+# changes their provider entry), produce a patched copy (new
+# keys inserted in order, affected weights and precomputed top
+# lists adjusted) that is swapped in. A full rebuild runs in
+# the background every SEARCH_SUGGEST_REBUILD_SECONDS.
+#------------------------------------------------------------
+import numpy as np
+
+from backend.events.dispatcher import subscribe
+from backend.events.snapshots import SnapshotManager
+from backend.listings.listing_catalog import PROVIDER_EVENTS, touched_listings
+from backend.metrics.metrics import register_collector
+
+
+MAX_KEY_BYTES = 48
+MAX_KEY_WORDS = 4
+# Ranges up to this many keys are ranked on the fly
+SCAN_LIMIT = 2048
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 20
+# Entries kept per precomputed prefix; the slack absorbs weight
+# changes between rebuilds
+TOP_CACHED = 2 * MAX_LIMIT
+DEFAULT_REBUILD_SECONDS = 3600
+
+TYPES = ("listing", "category", "provider")
+
+CONSUMER = "search_suggest"
+LISTING_EVENTS = ("listing.created", "listing.updated", "listing.removed", "review.created")
+
+SUGGEST_SELECT = """
+    SELECT
+        l.listingId,
+        l.title,
+        l.listingStatus,
+        c.name AS category_name,
+        CONCAT(provider.firstName, ' ', provider.lastName) AS provider_name,
+        (SELECT COUNT(*) FROM review r WHERE r.listId = l.listingId) AS review_count
+    FROM listing l
+    INNER JOIN category c ON l.categoryId = c.categoryId
+    INNER JOIN student provider ON l.providerId = provider.stuId
+"""
+
+
+def _normalize(text):
+    return " ".join((text or "").lower().split())
+
+
+def _prefix_key(prefix):
+    return _normalize(prefix).encode()[:MAX_KEY_BYTES]
+
+
+def _keys(text):
+    words = _normalize(text).split()
+    return {" ".join(words[i:]).encode()[:MAX_KEY_BYTES] for i in range(min(len(words), MAX_KEY_WORDS))}
+
+
+class SuggestIndex:
+    """Sorted key array, entry weights and precomputed top lists"""
+
+    def __init__(self, keys, key_entry, texts, types, entry_ids, weights, listings):
+        self.keys = keys
+        self.key_entry = key_entry
+        self.texts = texts
+        self.types = types
+        self.entry_ids = entry_ids
+        self.weights = weights
+        # listingId -> (title entry, category entry, provider entry, title weight, active)
+        self.listings = listings
+        self.top = {}
+
+    @classmethod
+    def build(cls, rows):
+        index = cls(np.array([], dtype=f"S{MAX_KEY_BYTES}"), np.array([], dtype=np.int64),
+                    [], [], {}, np.zeros(0), {})
+        new_entries, _ = index._apply_rows(rows)
+
+        keys = []
+        key_entry = []
+        for entry in new_entries:
+            for key in _keys(index.texts[entry]):
+                keys.append(key)
+                key_entry.append(entry)
+        keys = np.array(keys, dtype=f"S{MAX_KEY_BYTES}")
+        order = np.argsort(keys, kind="stable")
+        index.keys = keys[order]
+        index.key_entry = np.array(key_entry, dtype=np.int64)[order]
+
+        index._build_top(0, len(index.keys), b"")
+        return index
+
+    def _entry(self, text, type_code, new_entries):
+        key = (type_code, _normalize(text))
+        entry = self.entry_ids.get(key)
+        if entry is None:
+            entry = self.entry_ids[key] = len(self.texts)
+            self.texts.append(" ".join((text or "").split()))
+            self.types.append(type_code)
+            new_entries.append(entry)
+        return entry
+
+    def _apply_rows(self, rows):
+        """
+        Replace the contributions of the given listings. Mutates this object's
+        containers, so it is only called on a fresh copy. Returns the new
+        entries and the entries whose weight changed.
+        """
+        new_entries = []
+        deltas = {}
+        for row in rows:
+            old = self.listings.get(row["listingId"])
+            if old is not None:
+                title, category, provider, title_weight, active = old
+                deltas[title] = deltas.get(title, 0) - title_weight
+                deltas[category] = deltas.get(category, 0) - active
+                deltas[provider] = deltas.get(provider, 0) - active
+
+            active = 1 if row["listingStatus"] == "active" else 0
+            title = self._entry(row["title"], 0, new_entries)
+            category = self._entry(row["category_name"], 1, new_entries)
+            provider = self._entry(row["provider_name"], 2, new_entries)
+            title_weight = active * (1 + row["review_count"])
+            self.listings[row["listingId"]] = (title, category, provider, title_weight, active)
+            deltas[title] = deltas.get(title, 0) + title_weight
+            deltas[category] = deltas.get(category, 0) + active
+            deltas[provider] = deltas.get(provider, 0) + active
+
+        self.weights = np.concatenate([self.weights, np.zeros(len(new_entries))])
+        if deltas:
+            entries = np.fromiter(deltas.keys(), dtype=np.int64, count=len(deltas))
+            self.weights[entries] += np.fromiter(deltas.values(), dtype=np.float64, count=len(deltas))
+        return new_entries, set(deltas)
+
+    def _rank(self, entries, limit):
+        """Distinct entries with a positive weight, heaviest first, at most limit"""
+        entries = np.unique(entries)
+        weights = self.weights[entries]
+        entries = entries[weights > 0]
+        weights = weights[weights > 0]
+        if len(entries) > limit:
+            keep = np.argpartition(-weights, limit - 1)[:limit]
+            entries = entries[keep]
+            weights = weights[keep]
+        return entries[np.lexsort((entries, -weights))]
+
+    def _range(self, prefix):
+        lo = int(np.searchsorted(self.keys, prefix, side="left"))
+        # 0xff never occurs in UTF-8, so this sorts after every key with the prefix
+        hi = int(np.searchsorted(self.keys, prefix + b"\xff", side="left"))
+        return lo, hi
+
+    def _build_top(self, lo, hi, prefix):
+        """Top entries of keys[lo:hi] (all starting with prefix), storing them for large ranges"""
+        if hi - lo <= SCAN_LIMIT or len(prefix) >= MAX_KEY_BYTES:
+            return self._rank(self.key_entry[lo:hi], TOP_CACHED)
+
+        # Children by next byte; keys equal to the prefix itself come first
+        keys = self.keys[lo:hi]
+        starts = lo + np.searchsorted(keys, [prefix + bytes([b]) for b in range(1, 256)])
+        bounds = [lo + int(np.searchsorted(keys, prefix, side="right"))] + starts.tolist() + [hi]
+        candidates = [self.key_entry[lo:bounds[0]]]
+        for b in range(255):
+            if bounds[b + 2] > bounds[b + 1]:
+                candidates.append(self._build_top(bounds[b + 1], bounds[b + 2], prefix + bytes([b + 1])))
+
+        top = self.top[prefix] = self._rank(np.concatenate(candidates), TOP_CACHED)
+        return top
+
+    def patched(self, changed_rows):
+        """A copy with changed_rows' listings re-counted and any new texts indexed"""
+        index = SuggestIndex(self.keys, self.key_entry, list(self.texts), list(self.types),
+                             dict(self.entry_ids), self.weights.copy(), dict(self.listings))
+        index.top = dict(self.top)
+        new_entries, changed = index._apply_rows(changed_rows)
+
+        if new_entries:
+            new_keys = []
+            new_key_entry = []
+            for entry in new_entries:
+                for key in _keys(index.texts[entry]):
+                    new_keys.append(key)
+                    new_key_entry.append(entry)
+            new_keys = np.array(new_keys, dtype=f"S{MAX_KEY_BYTES}")
+            order = np.argsort(new_keys, kind="stable")
+            at = np.searchsorted(self.keys, new_keys[order], side="right")
+            index.keys = np.insert(self.keys, at, new_keys[order])
+            index.key_entry = np.insert(self.key_entry, at, np.array(new_key_entry, dtype=np.int64)[order])
+
+        # Precomputed prefixes containing a changed entry
+        affected = {}
+        for entry in changed:
+            for key in _keys(index.texts[entry]):
+                for depth in range(len(key) + 1):
+                    if key[:depth] in index.top:
+                        affected.setdefault(key[:depth], set()).add(entry)
+
+        for prefix, entries in affected.items():
+            old = self.top[prefix]
+            # Everything outside a full list weighed at most its last entry,
+            # so any entry still at or above that is exactly ranked
+            floor = self.weights[old[-1]] if len(old) == TOP_CACHED else 0
+            candidates = np.array(sorted(set(old.tolist()) | entries), dtype=np.int64)
+            candidates = candidates[index.weights[candidates] >= max(floor, 1e-9)]
+            if len(candidates) >= MAX_LIMIT or len(old) < TOP_CACHED:
+                index.top[prefix] = index._rank(candidates, TOP_CACHED)
+            else:
+                lo, hi = index._range(prefix)
+                index.top[prefix] = index._rank(index.key_entry[lo:hi], TOP_CACHED)
+        return index
+
+    def suggest(self, prefix, limit):
+        """[{text, type, weight}] for the heaviest entries with a key starting with prefix"""
+        key = _prefix_key(prefix)
+        lo, hi = self._range(key)
+        top = self.top.get(key) if hi - lo > SCAN_LIMIT else None
+        if top is None:
+            top = self._rank(self.key_entry[lo:hi], limit)
+        return [
+            {"text": self.texts[entry], "type": TYPES[self.types[entry]],
+             "weight": int(self.weights[entry])}
+            for entry in top[:limit].tolist()
+        ]
+
+
+class SearchSuggestions(SnapshotManager):
+    name = "search_suggest"
+    label = "Search suggest"
+    max_age_setting = "SEARCH_SUGGEST_REBUILD_SECONDS"
+    default_max_age_seconds = DEFAULT_REBUILD_SECONDS
+    consumer = CONSUMER
+    size_metric = ("keys", "keys", "Keys in the typeahead prefix index")
+
+    def suggest(self, prefix, limit=DEFAULT_LIMIT):
+        return self.current().suggest(prefix, min(limit, MAX_LIMIT))
+
+    def load(self, cursor):
+        cursor.execute(SUGGEST_SELECT)
+        return SuggestIndex.build(cursor.fetchall())
+
+    def select_changes(self, cursor, events):
+        condition, params = touched_listings(events)
+        cursor.execute(SUGGEST_SELECT + f" WHERE {condition}", params)
+        rows = cursor.fetchall()
+        return rows, len(rows)
+
+    def patch(self, index, rows):
+        return index.patched(rows)
+
+    def describe(self, index):
+        return {
+            "entries": len(index.texts) if index is not None else 0,
+            "keys": len(index.keys) if index is not None else 0,
+            "precomputedPrefixes": len(index.top) if index is not None else 0,
+        }
+
+
+search_suggestions = SearchSuggestions()
+
+register_collector(search_suggestions.collect)
+
+subscribe(CONSUMER, search_suggestions.apply_events,
+          event_types=LISTING_EVENTS + PROVIDER_EVENTS, batch=True)
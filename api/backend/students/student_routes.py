@@ -1,11 +1,21 @@
+from datetime import datetime, timedelta
+
+import numpy as np
 from flask import Blueprint, jsonify, request
+from backend.availability import intervals
 from backend.db_connection import db
+from backend.db_connection.batch import parse_ids, select_fields, fetch_by_ids
+from backend.events.outbox import record_event
+from backend.transactions.transaction_archive import transactions_source
 from mysql.connector import Error
 from flask import current_app
 
 # Create Blueprint for student routes
 students = Blueprint("students", __name__)
 
+CALENDAR_DEFAULT_DAYS = 14
+CALENDAR_MAX_DAYS = 92
+
 
 # ============================================
 # GET /students
@@ -102,6 +112,63 @@ def get_all_students():
         return jsonify({"error": str(e)}), 500
 
 
+# Fields available to GET /students/batch, same names as GET /students/{id}
+STUDENT_BATCH_COLUMNS = {
+    'stuId': 's.stuId',
+    'firstName': 's.firstName',
+    'lastName': 's.lastName',
+    'email': 's.email',
+    'phone': 's.phone',
+    'major': 's.major',
+    'bio': 's.bio',
+    'verifiedStatus': 's.verifiedStatus',
+    'accountStatus': 's.accountStatus',
+    'campus': 's.campus',
+    'profilePhotoUrl': 's.profilePhotoUrl',
+    'joinDate': 's.joinDate',
+    'total_services': '(SELECT COUNT(*) FROM listing l WHERE l.providerId = s.stuId)',
+    'avg_rating': """(SELECT AVG(r.rating) FROM review r
+                     INNER JOIN listing l ON r.listId = l.listingId
+                     WHERE l.providerId = s.stuId)""",
+    'total_reviews': """(SELECT COUNT(*) FROM review r
+                        INNER JOIN listing l ON r.listId = l.listingId
+                        WHERE l.providerId = s.stuId)""",
+}
+
+
+# ============================================
+# GET /students/batch?ids=3,1,7&fields=firstName,email
+# Return many student profiles in one call
+# Used by: [Tim-6]
+# ============================================
+@students.route("/batch", methods=["GET"])
+def get_students_batch():
+    """
+    Return the student profiles for a list of ids, in the order requested
+    Query params:
+    - ids: comma separated student ids (required)
+    - fields: comma separated subset of fields to return (stuId is always included)
+    """
+    try:
+        try:
+            ids = parse_ids(request.args.get("ids"))
+            columns = select_fields(STUDENT_BATCH_COLUMNS, request.args.get("fields"), "stuId")
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        current_app.logger.info(f'GET /students/batch - Getting {len(ids)} students')
+        
+        cursor = db.get_db().cursor()
+        results, not_found = fetch_by_ids(cursor, columns, "FROM student s", "s.stuId", "stuId", ids)
+        cursor.close()
+        
+        return jsonify({"results": results, "notFound": not_found}), 200
+        
+    except Error as e:
+        current_app.logger.error(f'Database error: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+
+
 # ============================================
 # GET /students/{id}
 # Return detailed student profile
@@ -187,6 +254,11 @@ def update_student(student_id):
         query = f"UPDATE student SET {', '.join(update_fields)} WHERE stuId = %s"
         
         cursor.execute(query, params)
+        if cursor.rowcount:
+            record_event(cursor, 'student.updated', 'student', student_id, {
+                field: data[field] for field in ('verifiedStatus', 'accountStatus', 'major')
+                if field in data
+            })
         db.get_db().commit()
         cursor.close()
         
@@ -251,6 +323,8 @@ def suspend_student(student_id):
         """
         
         cursor.execute(query, (student_id,))
+        if cursor.rowcount:
+            record_event(cursor, 'student.suspended', 'student', student_id)
         db.get_db().commit()
         cursor.close()
         
@@ -277,6 +351,8 @@ def unsuspend_student(student_id):
         """
         
         cursor.execute(query, (student_id,))
+        if cursor.rowcount:
+            record_event(cursor, 'student.unsuspended', 'student', student_id)
         db.get_db().commit()
         cursor.close()
         
@@ -317,7 +393,7 @@ def get_student_metrics(student_id):
                 COUNT(r.reviewId) AS total_reviews
             FROM student s
             LEFT JOIN listing l ON s.stuId = l.providerId
-            LEFT JOIN transact t ON l.listingId = t.listId
+            LEFT JOIN transact_all t ON l.listingId = t.listId
             LEFT JOIN review r ON l.listingId = r.listId
             WHERE s.stuId = %s
             GROUP BY s.stuId, s.firstName, s.lastName
@@ -337,6 +413,90 @@ def get_student_metrics(student_id):
         return jsonify({"error": str(e)}), 500
 
 
+# ============================================
+# GET /students/{id}/calendar
+# Free/busy blocks across all of a provider's listings [Jessica-4]
+# ============================================
+@students.route("/<int:student_id>/calendar", methods=["GET"])
+def get_provider_calendar(student_id):
+    """
+    Jessica-4: See real free and busy time across all my services
+    Availability slots of every listing, minus confirmed/completed bookings,
+    merged into non-overlapping blocks
+    Query params:
+    - from: ISO date or datetime (default today)
+    - to: ISO date or datetime (default from + 14 days, at most 92 days)
+    """
+    try:
+        start, end = intervals.parse_window(request.args, CALENDAR_DEFAULT_DAYS,
+                                            CALENDAR_MAX_DAYS, datetime.now())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        current_app.logger.info(f'Getting calendar for provider {student_id} from {start} to {end}')
+        cursor = db.get_db().cursor()
+        
+        cursor.execute("SELECT stuId FROM student WHERE stuId = %s", (student_id,))
+        if not cursor.fetchone():
+            cursor.close()
+            return jsonify({"error": "Student not found"}), 404
+        
+        # Served per listing by the (listId, startTime, endTime) unique index
+        cursor.execute("""
+            SELECT a.listId, a.startTime, a.endTime
+            FROM availability a
+            INNER JOIN listing l ON a.listId = l.listingId
+            WHERE l.providerId = %s
+              AND a.startTime < %s
+              AND a.endTime > %s
+        """, (student_id, end, start))
+        slots = cursor.fetchall()
+        
+        # A booking made before the window still counts if the slot it holds
+        # reaches into it
+        earliest = min([start - timedelta(minutes=intervals.DEFAULT_BOOKING_MINUTES)]
+                       + [slot["startTime"] for slot in slots])
+        source = transactions_source(include_archive=start < datetime.now())
+        cursor.execute(f"""
+            SELECT t.listId, t.bookDate
+            FROM {source} t
+            INNER JOIN listing l ON t.listId = l.listingId
+            WHERE l.providerId = %s
+              AND t.transactStatus IN ({', '.join(['%s'] * len(intervals.BUSY_STATUSES))})
+              AND t.bookDate >= %s
+              AND t.bookDate < %s
+        """, [student_id, *intervals.BUSY_STATUSES, earliest, end])
+        bookings = cursor.fetchall()
+        cursor.close()
+        
+        slot_listing = np.array([slot["listId"] for slot in slots], dtype=np.int64)
+        slot_start = intervals.to_seconds([slot["startTime"] for slot in slots])
+        slot_end = intervals.to_seconds([slot["endTime"] for slot in slots])
+        busy_start, busy_end = intervals.booked_intervals(
+            slot_listing, slot_start, slot_end,
+            np.array([booking["listId"] for booking in bookings], dtype=np.int64),
+            intervals.to_seconds([booking["bookDate"] for booking in bookings]),
+        )
+        
+        window_start, window_end = intervals.to_seconds([start, end])
+        starts, ends, statuses = intervals.sweep(slot_start, slot_end, busy_start, busy_end,
+                                                 window_start, window_end)
+        
+        return jsonify({
+            "providerId": student_id,
+            "from": start,
+            "to": end,
+            "blocks": intervals.blocks(starts, ends, statuses),
+            "freeMinutes": intervals.total_minutes(starts, ends, statuses, intervals.FREE),
+            "busyMinutes": intervals.total_minutes(starts, ends, statuses, intervals.BUSY),
+        }), 200
+        
+    except Error as e:
+        current_app.logger.error(f'Error getting calendar: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+
+
 # ============================================
 # GET /students/provider/metrics
 # Return all providers with metrics
@@ -347,7 +507,8 @@ def get_all_provider_metrics():
     """
     Get all providers with their performance metrics
     Query params: 
-    - sortBy: 'rating' or 'transactions' (default)
+    - sortBy: 'rating' or 'transactions' (default); rating orders by the
+      Bayesian provider score, read in index order
     - limit: number of results (default 100)
     """
     try:
@@ -356,30 +517,52 @@ def get_all_provider_metrics():
         
         cursor = db.get_db().cursor()
         
-        query = """
-            SELECT 
-                s.stuId,
-                s.firstName,
-                s.lastName,
-                s.email,
-                s.campus,
-                AVG(r.rating) AS avg_rating,
-                COUNT(DISTINCT CASE WHEN t.transactStatus = 'completed' 
-                      THEN t.transactId END) AS completed_transactions
-            FROM student s
-            LEFT JOIN listing l ON s.stuId = l.providerId
-            LEFT JOIN transact t ON l.listingId = t.listId
-            LEFT JOIN review r ON l.listingId = r.listId
-            GROUP BY s.stuId, s.firstName, s.lastName, s.email, s.campus
-            HAVING completed_transactions > 0
-        """
-        
         if sort_by == "rating":
-            query += " ORDER BY avg_rating DESC"
+            # Walks idx_student_provider_rating from the top and stops after
+            # limit providers; completed bookings are counted only for those
+            query = f"""
+                SELECT 
+                    s.stuId,
+                    s.firstName,
+                    s.lastName,
+                    s.email,
+                    s.campus,
+                    ROUND(s.providerRatingSum / NULLIF(s.providerRatingCount, 0), 2) AS avg_rating,
+                    s.providerRatingCount AS review_count,
+                    s.providerRatingScore AS rating_score,
+                    (SELECT COUNT(*)
+                     FROM listing l
+                     INNER JOIN transact_all t ON l.listingId = t.listId
+                     WHERE l.providerId = s.stuId
+                       AND t.transactStatus = 'completed') AS completed_transactions
+                FROM student s
+                WHERE s.providerRatingScore IS NOT NULL
+                HAVING completed_transactions > 0
+                ORDER BY s.providerRatingScore DESC
+                LIMIT {limit}
+            """
         else:
-            query += " ORDER BY completed_transactions DESC"
-        
-        query += f" LIMIT {limit}"
+            query = f"""
+                SELECT 
+                    s.stuId,
+                    s.firstName,
+                    s.lastName,
+                    s.email,
+                    s.campus,
+                    ROUND(s.providerRatingSum / NULLIF(s.providerRatingCount, 0), 2) AS avg_rating,
+                    s.providerRatingCount AS review_count,
+                    s.providerRatingScore AS rating_score,
+                    COUNT(DISTINCT CASE WHEN t.transactStatus = 'completed' 
+                          THEN t.transactId END) AS completed_transactions
+                FROM student s
+                LEFT JOIN listing l ON s.stuId = l.providerId
+                LEFT JOIN transact_all t ON l.listingId = t.listId
+                GROUP BY s.stuId, s.firstName, s.lastName, s.email, s.campus,
+                         s.providerRatingSum, s.providerRatingCount, s.providerRatingScore
+                HAVING completed_transactions > 0
+                ORDER BY completed_transactions DESC
+                LIMIT {limit}
+            """
         
         cursor.execute(query)
         metrics = cursor.fetchall()
@@ -411,7 +594,7 @@ def get_consumer_metrics():
                 s.campus,
                 COUNT(t.transactId) AS transaction_count
             FROM student s
-            LEFT JOIN transact t ON s.stuId = t.buyerId
+            LEFT JOIN transact_all t ON s.stuId = t.buyerId
             GROUP BY s.stuId, s.firstName, s.lastName, s.email, s.campus
             HAVING transaction_count > 0
             ORDER BY transaction_count DESC
@@ -495,6 +678,8 @@ def verify_student(student_id):
         """
         
         cursor.execute(query, (student_id,))
+        if cursor.rowcount:
+            record_event(cursor, 'student.verified', 'student', student_id)
         db.get_db().commit()
         cursor.close()
         
@@ -0,0 +1,226 @@
+#------------------------------------------------------------
+# Background job that archives historical transactions.
+#
+# Completed and cancelled bookings from past semesters make up
+# most of transact, yet every current view (pending requests,
+# My Bookings, the provider dashboard) only needs open and
+# recent bookings. This job moves terminal bookings whose
+# bookDate is older than TRANSACT_ARCHIVE_RETENTION_DAYS into
+# transact_archive, TRANSACT_ARCHIVE_BATCH_SIZE rows per DB
+# transaction (found through idx_transact_status_date and
+# locked with SKIP LOCKED, so bookings being worked on are left
+# alone), pausing between batches to stay out of the way of
+# request traffic.
+#
+# Reads pick a source:
+#   * CURRENT_TRANSACTIONS (transact) for current views; the
+#     archive only holds completed/cancelled rows, so a query
+#     for requested/confirmed bookings never needs it;
+#   * ALL_TRANSACTIONS (the transact_all UNION ALL view) for
+#     history, detail pages and analytics.
+#------------------------------------------------------------
+import os
+import threading
+import time
+from datetime import datetime
+
+from backend.db_connection import db
+from backend.metrics.metrics import register_collector
+
+
+CURRENT_TRANSACTIONS = "transact"
+ALL_TRANSACTIONS = "transact_all"
+
+# Only bookings in these states are ever archived
+ARCHIVED_STATUSES = ("completed", "cancelled")
+
+# Archiver settings, overridable from the .env file
+DEFAULT_INTERVAL_SECONDS = 3600
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_RETENTION_DAYS = 180
+DEFAULT_BATCH_PAUSE_SECONDS = 0.05
+
+TRANSACT_COLUMNS = ("transactId, buyerId, listId, bookDate, transactStatus, fulfillmentDate, "
+                    "paymentAmt, platformFee, agreementDetails, version")
+
+_state_lock = threading.Lock()
+_run_lock = threading.Lock()
+_stop_event = threading.Event()
+_worker = None
+_metrics = {
+    "runs": 0,
+    "last_run_at": None,
+    "last_run_seconds": 0.0,
+    "last_error": None,
+    "rows_archived": 0,
+    "last_batch_rows_per_second": 0.0,
+}
+
+
+def transactions_source(status=None, include_archive=True):
+    """
+    Table or view a read should use. Requests for open bookings
+    (requested/confirmed) always stay on the hot table.
+    """
+    if not include_archive or (status and status not in ARCHIVED_STATUSES):
+        return CURRENT_TRANSACTIONS
+    return ALL_TRANSACTIONS
+
+
+def _archive_batch(conn, retention_days, batch_size):
+    """Move one batch of old terminal bookings; returns the number moved"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"""
+            SELECT transactId
+            FROM transact
+            WHERE transactStatus IN ({', '.join(['%s'] * len(ARCHIVED_STATUSES))})
+              AND bookDate < NOW() - INTERVAL %s DAY
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        """, list(ARCHIVED_STATUSES) + [retention_days, batch_size])
+        ids = [row["transactId"] for row in cursor.fetchall()]
+        if not ids:
+            conn.rollback()
+            return 0
+
+        placeholders = ", ".join(["%s"] * len(ids))
+        cursor.execute(f"""
+            INSERT INTO transact_archive ({TRANSACT_COLUMNS})
+            SELECT {TRANSACT_COLUMNS}
+            FROM transact
+            WHERE transactId IN ({placeholders})
+        """, ids)
+        cursor.execute(f"DELETE FROM transact WHERE transactId IN ({placeholders})", ids)
+
+        conn.commit()
+        return len(ids)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def run_archive(batch_size=None, retention_days=None, max_batches=None):
+    """
+    Archive every booking past the retention window (or up to max_batches
+    batches). Must be called inside an app context. Returns the run summary,
+    or None if another run is already in progress.
+    """
+    if batch_size is None:
+        batch_size = int(os.getenv("TRANSACT_ARCHIVE_BATCH_SIZE", DEFAULT_BATCH_SIZE))
+    if retention_days is None:
+        retention_days = int(os.getenv("TRANSACT_ARCHIVE_RETENTION_DAYS", DEFAULT_RETENTION_DAYS))
+    pause = float(os.getenv("TRANSACT_ARCHIVE_BATCH_PAUSE_SECONDS", DEFAULT_BATCH_PAUSE_SECONDS))
+
+    # One run at a time; _state_lock only guards _metrics, so /metrics and
+    # the status route never wait on a run
+    if not _run_lock.acquire(blocking=False):
+        return None
+    try:
+        started = time.monotonic()
+        summary = {"archived": 0, "batches": 0, "retention_days": retention_days}
+
+        conn = db.get_db()
+        while max_batches is None or summary["batches"] < max_batches:
+            batch_started = time.monotonic()
+            moved = _archive_batch(conn, retention_days, batch_size)
+            batch_seconds = time.monotonic() - batch_started
+            if not moved:
+                break
+
+            summary["batches"] += 1
+            summary["archived"] += moved
+            with _state_lock:
+                _metrics["last_batch_rows_per_second"] = (
+                    moved / batch_seconds if batch_seconds > 0 else float(moved)
+                )
+
+            if moved < batch_size or _stop_event.is_set():
+                break
+            time.sleep(pause)
+
+        with _state_lock:
+            _metrics["runs"] += 1
+            _metrics["last_run_at"] = datetime.now().isoformat()
+            _metrics["last_run_seconds"] = round(time.monotonic() - started, 4)
+            _metrics["last_error"] = None
+            _metrics["rows_archived"] += summary["archived"]
+    finally:
+        _run_lock.release()
+
+    return summary
+
+
+def get_archive_metrics():
+    with _state_lock:
+        snapshot = dict(_metrics)
+        snapshot["running"] = _worker is not None and _worker.is_alive()
+    snapshot["in_progress"] = _run_lock.locked()
+    return snapshot
+
+
+def _collect_archive_metrics():
+    snapshot = get_archive_metrics()
+    return [
+        ("huskyhub_transact_archive_runs_total", "counter",
+         "Transaction archive runs completed", [({}, snapshot["runs"])]),
+        ("huskyhub_transact_archived_total", "counter",
+         "Bookings moved to transact_archive", [({}, snapshot["rows_archived"])]),
+        ("huskyhub_transact_archive_rows_per_second", "gauge",
+         "Throughput of the last archived batch",
+         [({}, snapshot["last_batch_rows_per_second"])]),
+    ]
+
+
+register_collector(_collect_archive_metrics)
+
+
+def _run_forever(app, interval):
+    while not _stop_event.is_set():
+        try:
+            with app.app_context():
+                try:
+                    summary = run_archive()
+                finally:
+                    db.teardown_request(None)
+            if summary and summary["archived"]:
+                app.logger.info(
+                    f'Transaction archive: {summary["archived"]} bookings older than '
+                    f'{summary["retention_days"]} days archived in {summary["batches"]} batches'
+                )
+        except Exception as e:
+            with _state_lock:
+                _metrics["last_error"] = str(e)
+            app.logger.error(f'Transaction archive run failed: {str(e)}')
+        _stop_event.wait(interval)
+
+
+def start_archiver(app):
+    """
+    Start the in-process archive thread.
+    TRANSACT_ARCHIVE_INTERVAL (seconds) controls how often it runs; 0 disables it.
+    """
+    global _worker
+
+    interval = int(os.getenv("TRANSACT_ARCHIVE_INTERVAL", DEFAULT_INTERVAL_SECONDS))
+    if interval <= 0:
+        app.logger.info("Transaction archiver disabled")
+        return None
+
+    if _worker is not None and _worker.is_alive():
+        return _worker
+
+    _stop_event.clear()
+    _worker = threading.Thread(
+        target=_run_forever, args=(app, interval),
+        name="transact-archive", daemon=True
+    )
+    _worker.start()
+    app.logger.info(f"Transaction archiver started (every {interval}s)")
+    return _worker
+
+
+def stop_archiver():
+    _stop_event.set()
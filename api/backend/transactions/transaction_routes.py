@@ -1,5 +1,11 @@
 from flask import Blueprint, request, jsonify
-from backend.db_connection import db
+from backend.db_connection import db, async_db
+from backend.idempotency.idempotency import idempotent
+from backend.events.outbox import record_event, record_events
+from backend.transactions.transaction_archive import transactions_source
+from backend.transactions.transaction_states import (
+    STATUSES, TransactionNotFound, TransitionConflict, can_transition, transition, transition_error
+)
 from mysql.connector import Error
 from flask import current_app
 
@@ -20,6 +26,9 @@ def get_transactions():
     - Listing info
     - Associated availability
     - Reports and admin notes
+    scope=current reads only the live table (no archived bookings); the
+    default, scope=all, includes the archive unless the status filter is an
+    open status that is never archived.
     """
     try:
         provider_id = request.args.get('providerId')
@@ -27,13 +36,17 @@ def get_transactions():
         status = request.args.get('status')
         start_date = request.args.get('startDate')
         end_date = request.args.get('endDate')
+        scope = request.args.get('scope', 'all')
+        if scope not in ('current', 'all'):
+            return jsonify({'error': 'scope must be current or all'}), 400
+        source = transactions_source(status, include_archive=(scope == 'all'))
         
-        current_app.logger.info(f'Getting transactions with filters: providerId={provider_id}, buyerId={buyer_id}, status={status}')
+        current_app.logger.info(f'Getting transactions with filters: providerId={provider_id}, buyerId={buyer_id}, status={status}, source={source}')
         
         cursor = db.get_db().cursor()
         
         # Main transaction query with all linked data
-        query = """
+        query = f"""
             SELECT 
                 -- Transaction attributes
                 t.transactId,
@@ -43,6 +56,7 @@ def get_transactions():
                 t.platformFee,
                 t.fulfillmentDate,
                 t.agreementDetails,
+                t.version,
                 
                 -- Listing info
                 l.listingId,
@@ -107,7 +121,7 @@ def get_transactions():
                  INNER JOIN report r ON an.reportId = r.reportId
                  WHERE r.reportedListingId = l.listingId) AS admin_notes_count
                 
-            FROM transact t
+            FROM {source} t
             INNER JOIN listing l ON t.listId = l.listingId
             INNER JOIN category c ON l.categoryId = c.categoryId
             INNER JOIN student buyer ON t.buyerId = buyer.stuId
@@ -159,6 +173,7 @@ def get_transactions():
 # Create new booking/transaction [Emma-3]
 # ============================================
 @transactions.route("/", methods=["POST"])  # ← CHANGED: removed /transactions
+@idempotent("transactions")
 def create_transaction():
     """
     Emma-3: Create new booking/transaction
@@ -194,6 +209,12 @@ def create_transaction():
             platform_fee,
             data.get('agreementDetails', '')
         ))
+        record_event(cursor, 'transaction.created', 'transaction', cursor.lastrowid, {
+            'buyerId': data['buyerId'],
+            'listId': data['listId'],
+            'bookDate': data['bookDate'],
+            'paymentAmt': data['paymentAmt']
+        })
         
         db.get_db().commit()
         new_id = cursor.lastrowid
@@ -211,6 +232,126 @@ def create_transaction():
         return jsonify({'error': str(e)}), 500
 
 
+# Most updates accepted by one POST /transactions/bulk-status call
+MAX_BULK_STATUS_UPDATES = 500
+
+
+# ============================================
+# POST /transactions/bulk-status
+# Accept, decline or complete many bookings at once [Jessica-5, Jessica-6]
+# ============================================
+@transactions.route("/bulk-status", methods=["POST"])
+def bulk_update_status():
+    """
+    Jessica-5, Jessica-6: Apply many status changes in one DB transaction
+    Body:
+    - updates: [{"transactId": 1, "transactStatus": "confirmed"}, ...]
+    - providerId (optional): only change bookings for this provider's listings
+    - allOrNothing (optional, default false): apply nothing if any item fails
+    Each item is checked against the allowed transitions (see
+    transaction_states.py); valid ones are written with one multi-row UPDATE.
+    """
+    try:
+        data = request.get_json() or {}
+        updates = data.get('updates')
+        provider_id = data.get('providerId')
+        all_or_nothing = bool(data.get('allOrNothing', False))
+        
+        if not isinstance(updates, list) or not updates:
+            return jsonify({'error': 'updates must be a non-empty list'}), 400
+        if len(updates) > MAX_BULK_STATUS_UPDATES:
+            return jsonify({'error': f'At most {MAX_BULK_STATUS_UPDATES} updates per request'}), 400
+        if provider_id is not None and (not isinstance(provider_id, int) or isinstance(provider_id, bool)):
+            return jsonify({'error': 'providerId must be an integer'}), 400
+        
+        targets = {}
+        for item in updates:
+            if not isinstance(item, dict) or not isinstance(item.get('transactId'), int):
+                return jsonify({'error': 'Each update needs an integer transactId'}), 400
+            if item.get('transactStatus') not in STATUSES:
+                return jsonify({'error': f'Invalid status. Must be one of: {list(STATUSES)}'}), 400
+            if item['transactId'] in targets:
+                return jsonify({'error': f'Duplicate transactId: {item["transactId"]}'}), 400
+            targets[item['transactId']] = item['transactStatus']
+        
+        current_app.logger.info(f'Bulk status update for {len(targets)} transactions')
+        
+        ids = list(targets)
+        placeholders = ", ".join(["%s"] * len(ids))
+        conn = db.get_db()
+        cursor = conn.cursor()
+        
+        # Lock the rows only for the length of this statement's transaction
+        cursor.execute(f"""
+            SELECT t.transactId, t.transactStatus, t.version, t.buyerId, t.listId, l.providerId
+            FROM transact t
+            INNER JOIN listing l ON t.listId = l.listingId
+            WHERE t.transactId IN ({placeholders})
+            FOR UPDATE OF t
+        """, ids)
+        current = {row['transactId']: row for row in cursor.fetchall()}
+        
+        results = []
+        to_apply = []
+        for transact_id, target in targets.items():
+            result = {'transactId': transact_id, 'to': target}
+            row = current.get(transact_id)
+            if row is None:
+                result.update(result='not_found', error='Transaction not found')
+            elif provider_id is not None and row['providerId'] != provider_id:
+                result.update(result='forbidden', error='Transaction is not for this provider')
+            elif not can_transition(row['transactStatus'], target):
+                result.update(result='invalid_transition', **{'from': row['transactStatus']},
+                              error=transition_error(row['transactStatus'], target))
+            else:
+                result.update(result='updated', **{'from': row['transactStatus']})
+                to_apply.append((transact_id, target))
+            results.append(result)
+        
+        failed = len(results) - len(to_apply)
+        if all_or_nothing and failed:
+            conn.rollback()
+            cursor.close()
+            for result in results:
+                if result['result'] == 'updated':
+                    result['result'] = 'not_applied'
+            return jsonify({'updated': 0, 'failed': failed, 'results': results}), 409
+        
+        if to_apply:
+            # transactStatus is assigned first, so fulfillmentDate sees the new value
+            cases = " ".join(["WHEN %s THEN %s"] * len(to_apply))
+            params = [value for pair in to_apply for value in pair]
+            params.extend(transact_id for transact_id, _ in to_apply)
+            cursor.execute(f"""
+                UPDATE transact
+                SET transactStatus = CASE transactId {cases} END,
+                    fulfillmentDate = IF(transactStatus = 'completed', NOW(), fulfillmentDate),
+                    version = version + 1
+                WHERE transactId IN ({", ".join(["%s"] * len(to_apply))})
+            """, params)
+            record_events(cursor, [
+                ('transaction.status_changed', 'transaction', transact_id, {
+                    'from': current[transact_id]['transactStatus'],
+                    'to': target,
+                    'version': current[transact_id]['version'] + 1,
+                    'buyerId': current[transact_id]['buyerId'],
+                    'listId': current[transact_id]['listId']
+                })
+                for transact_id, target in to_apply
+            ])
+        
+        conn.commit()
+        cursor.close()
+        
+        current_app.logger.info(f'Bulk status update: {len(to_apply)} updated, {failed} failed')
+        return jsonify({'updated': len(to_apply), 'failed': failed, 'results': results}), 200
+        
+    except Exception as e:
+        current_app.logger.error(f'Error in bulk status update: {str(e)}')
+        db.get_db().rollback()
+        return jsonify({'error': str(e)}), 500
+
+
 # ============================================
 # GET /transactions/completion
 # Returns completion rate [Chris-3]
@@ -257,11 +398,11 @@ def get_completion_rate():
 def get_transaction_detail(transaction_id):
     """
     Tim-3, Jessica-5: Return detailed transaction with full dispute log
+    The transaction and its reports are fetched concurrently.
     """
     try:
         current_app.logger.info(f'Getting transaction details for {transaction_id}')
         
-        cursor = db.get_db().cursor()
         query = """
             SELECT 
                 t.transactId,
@@ -271,6 +412,7 @@ def get_transaction_detail(transaction_id):
                 t.platformFee,
                 t.fulfillmentDate,
                 t.agreementDetails,
+                t.version,
                 l.title AS service_name,
                 l.price,
                 l.listingId,
@@ -280,20 +422,15 @@ def get_transaction_detail(transaction_id):
                 CONCAT(seller.firstName, ' ', seller.lastName) AS seller_name,
                 seller.email AS seller_email,
                 seller.stuId AS seller_id
-            FROM transact t
+            FROM transact_all t
             INNER JOIN listing l ON t.listId = l.listingId
             INNER JOIN student buyer ON t.buyerId = buyer.stuId
             LEFT JOIN student seller ON l.providerId = seller.stuId
             WHERE t.transactId = %s
         """
         
-        cursor.execute(query, (transaction_id,))
-        result = cursor.fetchone()
-        
-        if not result:
-            return jsonify({'error': 'Transaction not found'}), 404
-        
-        # Get associated reports
+        # Reports against either party or the listing. The parties are looked
+        # up from the transaction id so this query doesn't wait for the first.
         report_query = """
             SELECT 
                 r.reportId,
@@ -302,17 +439,23 @@ def get_transaction_detail(transaction_id):
                 r.reportDetails,
                 r.resolutionDate,
                 CONCAT(reporter.firstName, ' ', reporter.lastName) AS reporter_name
-            FROM report r
+            FROM transact_all t
+            INNER JOIN listing l ON t.listId = l.listingId
+            INNER JOIN report r
+                ON r.reportedStuId IN (t.buyerId, l.providerId)
+                OR r.reportedListingId = l.listingId
             INNER JOIN student reporter ON r.reportingStuId = reporter.stuId
-            WHERE r.reportedStuId IN (%s, %s)
-               OR r.reportedListingId = %s
+            WHERE t.transactId = %s
             ORDER BY r.reportDate DESC
         """
         
-        cursor.execute(report_query, (result[12], result[15], result[9]))
-        reports = cursor.fetchall()
+        result, reports = async_db.gather(
+            async_db.fetch_one(query, (transaction_id,)),
+            async_db.fetch_all(report_query, (transaction_id,)),
+        )
         
-        cursor.close()
+        if not result:
+            return jsonify({'error': 'Transaction not found'}), 404
         
         return jsonify({
             'transaction': result,
@@ -324,6 +467,56 @@ def get_transaction_detail(transaction_id):
         return jsonify({'error': str(e)}), 500
 
 
+def _expected_version(data=None):
+    """
+    Version the client last saw: body 'version' or an If-Match header
+    ('*' or no header means any). Raises ValueError if it is not an integer.
+    """
+    if data and data.get('version') is not None:
+        version = data['version']
+    else:
+        version = request.headers.get('If-Match', '').strip().strip('"')
+        if version in ('', '*'):
+            return None
+    if isinstance(version, bool) or not isinstance(version, (int, str)):
+        raise ValueError('version must be an integer')
+    try:
+        return int(version)
+    except ValueError:
+        raise ValueError('version must be an integer')
+
+
+def _apply_transition(transaction_id, target, message, data=None):
+    """Run one compare-and-set transition and build the response"""
+    try:
+        expected_version = _expected_version(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        cursor = db.get_db().cursor()
+        version = transition(
+            cursor, transaction_id, target,
+            expected_version=expected_version,
+            book_date=(data or {}).get('bookDate')
+        )
+        db.get_db().commit()
+        cursor.close()
+        
+        current_app.logger.info(f'Transaction {transaction_id} -> {target} (version {version})')
+        response = jsonify({'message': message, 'transactStatus': target, 'version': version})
+        response.headers['ETag'] = f'"{version}"'
+        return response, 200
+        
+    except TransactionNotFound:
+        db.get_db().rollback()
+        return jsonify({'error': 'Transaction not found'}), 404
+    except TransitionConflict as e:
+        db.get_db().rollback()
+        current_app.logger.info(f'Transaction {transaction_id} -> {target} rejected: {str(e)}')
+        return jsonify(e.to_dict()), 409
+
+
 # ============================================
 # PUT /transactions/{id}
 # Update transaction status [Tim-5, Emma-3, Jessica-5]
@@ -335,6 +528,9 @@ def update_transaction(transaction_id):
     - 'confirmed' or 'cancelled' for Jessica-5 (accept/decline)
     - 'cancelled' for Tim-5 (when suspending user)
     - Various statuses for Emma-3 (reschedule booking)
+    Only legal transitions are applied (see transaction_states.py); a
+    'version' in the body or an If-Match header makes the update fail
+    with 409 if the booking changed since the client read it.
     """
     try:
         data = request.get_json()
@@ -344,39 +540,15 @@ def update_transaction(transaction_id):
             return jsonify({'error': 'transactStatus required in request body'}), 400
         
         # Validate status values
-        valid_statuses = ['requested', 'confirmed', 'completed', 'cancelled']
-        if data['transactStatus'] not in valid_statuses:
-            return jsonify({'error': f'Invalid status. Must be one of: {valid_statuses}'}), 400
-        
-        cursor = db.get_db().cursor()
-        
-        # Check if we're also updating the booking date (reschedule)
-        if 'bookDate' in data:
-            query = """
-                UPDATE transact
-                SET transactStatus = %s,
-                    bookDate = %s
-                WHERE transactId = %s
-            """
-            cursor.execute(query, (data['transactStatus'], data['bookDate'], transaction_id))
-        else:
-            query = """
-                UPDATE transact
-                SET transactStatus = %s
-                WHERE transactId = %s
-            """
-            cursor.execute(query, (data['transactStatus'], transaction_id))
-        
-        db.get_db().commit()
-        
-        if cursor.rowcount == 0:
-            return jsonify({'error': 'Transaction not found'}), 404
+        if data['transactStatus'] not in STATUSES:
+            return jsonify({'error': f'Invalid status. Must be one of: {list(STATUSES)}'}), 400
         
-        cursor.close()
-        current_app.logger.info(f'Transaction {transaction_id} status updated to {data["transactStatus"]}')
-        return jsonify({'message': f'Transaction {data["transactStatus"]} successfully'}), 200
+        return _apply_transition(
+            transaction_id, data['transactStatus'],
+            f'Transaction {data["transactStatus"]} successfully', data
+        )
         
-    except Error as e:
+    except Exception as e:
         current_app.logger.error(f'Error updating transaction: {str(e)}')
         db.get_db().rollback()
         return jsonify({'error': str(e)}), 500
@@ -391,30 +563,15 @@ def cancel_transaction(transaction_id):
     """
     Emma-3: Cancel booking
     As a student, I want to cancel bookings
+    Completed or already cancelled bookings return 409.
     """
     try:
         current_app.logger.info(f'Cancelling transaction {transaction_id}')
         
-        cursor = db.get_db().cursor()
-        
         # Soft delete - just update status to cancelled
-        query = """
-            UPDATE transact
-            SET transactStatus = 'cancelled'
-            WHERE transactId = %s
-        """
-        
-        cursor.execute(query, (transaction_id,))
-        db.get_db().commit()
-        
-        if cursor.rowcount == 0:
-            return jsonify({'error': 'Transaction not found'}), 404
-        
-        cursor.close()
-        current_app.logger.info(f'Transaction {transaction_id} cancelled')
-        return jsonify({'message': 'Booking cancelled successfully'}), 200
+        return _apply_transition(transaction_id, 'cancelled', 'Booking cancelled successfully')
         
-    except Error as e:
+    except Exception as e:
         current_app.logger.error(f'Error cancelling transaction: {str(e)}')
         db.get_db().rollback()
         return jsonify({'error': str(e)}), 500
@@ -429,29 +586,16 @@ def complete_transaction(transaction_id):
     """
     Jessica-6: Update transaction status to 'completed' and set fulfillmentDate
     As a service provider, I want to mark completed services
+    Only confirmed bookings can be completed; anything else returns 409.
     """
     try:
         current_app.logger.info(f'Completing transaction {transaction_id}')
         
-        cursor = db.get_db().cursor()
-        query = """
-            UPDATE transact
-            SET transactStatus = 'completed',
-                fulfillmentDate = NOW()
-            WHERE transactId = %s
-        """
-        
-        cursor.execute(query, (transaction_id,))
-        db.get_db().commit()
-        
-        if cursor.rowcount == 0:
-            return jsonify({'error': 'Transaction not found'}), 404
-        
-        cursor.close()
-        current_app.logger.info(f'Transaction {transaction_id} marked as completed')
-        return jsonify({'message': 'Transaction marked as completed successfully'}), 200
+        return _apply_transition(
+            transaction_id, 'completed', 'Transaction marked as completed successfully'
+        )
         
-    except Error as e:
+    except Exception as e:
         current_app.logger.error(f'Error completing transaction: {str(e)}')
         db.get_db().rollback()
         return jsonify({'error': str(e)}), 500
@@ -480,7 +624,7 @@ def get_transactions_by_category(category_id):
                 l.title AS service_name,
                 c.name AS category_name,
                 CONCAT(buyer.firstName, ' ', buyer.lastName) AS buyer_name
-            FROM transact t
+            FROM transact_all t
             INNER JOIN listing l ON t.listId = l.listingId
             INNER JOIN category c ON l.categoryId = c.categoryId
             INNER JOIN student buyer ON t.buyerId = buyer.stuId
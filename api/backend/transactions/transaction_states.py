@@ -0,0 +1,128 @@
+#------------------------------------------------------------
+# Booking (transact) status transitions.
+#
+#   requested -> confirmed   provider accepts
+#   requested -> cancelled   provider declines / buyer cancels
+#   confirmed -> completed   provider marks the service done
+#   confirmed -> cancelled   buyer cancels a confirmed booking
+#
+# A reschedule (new bookDate) keeps the status and is allowed
+# while the booking is requested or confirmed.
+#
+# Every change goes through transition(), which never locks the
+# row: it reads the current status and version, checks the move
+# is legal, and writes with a compare-and-set on the version
+# (UPDATE ... WHERE version = <read version>). If another client
+# changed the booking in between, no row matches and the caller
+# gets TransitionConflict, which the routes turn into a 409.
+# A successful change also appends a transaction.status_changed
+# event to the outbox in the same DB transaction.
+#------------------------------------------------------------
+from backend.events.outbox import record_event
+
+STATUSES = ("requested", "confirmed", "completed", "cancelled")
+
+TRANSITIONS = {
+    "requested": ("confirmed", "cancelled"),
+    "confirmed": ("completed", "cancelled"),
+    "completed": (),
+    "cancelled": (),
+}
+
+RESCHEDULABLE = ("requested", "confirmed")
+
+
+class TransactionNotFound(Exception):
+    pass
+
+
+class TransitionConflict(Exception):
+    """The move is illegal from the current status, or the booking changed meanwhile"""
+
+    def __init__(self, message, current_status=None, version=None):
+        super().__init__(message)
+        self.current_status = current_status
+        self.version = version
+
+    def to_dict(self):
+        return {"error": str(self), "currentStatus": self.current_status, "version": self.version}
+
+
+def can_transition(current, target):
+    return target in TRANSITIONS.get(current, ())
+
+
+def transition_error(current, target):
+    """Message explaining why current -> target is not allowed"""
+    allowed = TRANSITIONS.get(current, ())
+    if not allowed:
+        return f"Transaction is already {current}"
+    return f"Cannot change status from {current} to {target}; allowed: {list(allowed)}"
+
+
+def transition(cursor, transact_id, target, expected_version=None, book_date=None):
+    """
+    Move one booking to target (optionally rescheduling it) with a
+    compare-and-set on its version. expected_version, when given, is the
+    version the client last saw. Returns the new version; the caller commits.
+    Raises TransactionNotFound or TransitionConflict.
+    """
+    cursor.execute("""
+        SELECT transactStatus, version, buyerId, listId
+        FROM transact
+        WHERE transactId = %s
+    """, (transact_id,))
+    row = cursor.fetchone()
+    if row is None:
+        raise TransactionNotFound(f"Transaction {transact_id} not found")
+
+    current, version = row["transactStatus"], row["version"]
+
+    if expected_version is not None and int(expected_version) != version:
+        raise TransitionConflict(
+            f"Transaction was modified (version {version}, expected {expected_version})",
+            current, version
+        )
+
+    reschedule = book_date is not None and target == current and current in RESCHEDULABLE
+    if not reschedule and not can_transition(current, target):
+        raise TransitionConflict(transition_error(current, target), current, version)
+
+    sets = ["transactStatus = %s", "version = version + 1"]
+    params = [target]
+    if target == "completed":
+        sets.append("fulfillmentDate = NOW()")
+    if book_date is not None:
+        sets.append("bookDate = %s")
+        params.append(book_date)
+    params.extend([transact_id, version])
+
+    cursor.execute(f"""
+        UPDATE transact
+        SET {", ".join(sets)}
+        WHERE transactId = %s AND version = %s
+    """, params)
+
+    if cursor.rowcount == 0:
+        # Lost the race: report what the winner left behind. A locking read
+        # sees the latest commit rather than this transaction's snapshot;
+        # the caller rolls back straight away, releasing it.
+        cursor.execute("""
+            SELECT transactStatus, version
+            FROM transact
+            WHERE transactId = %s
+            FOR SHARE
+        """, (transact_id,))
+        latest = cursor.fetchone() or {}
+        raise TransitionConflict(
+            "Transaction was modified by another request",
+            latest.get("transactStatus"), latest.get("version")
+        )
+
+    payload = {"from": current, "to": target, "version": version + 1,
+               "buyerId": row["buyerId"], "listId": row["listId"]}
+    if book_date is not None:
+        payload["bookDate"] = book_date
+    record_event(cursor, "transaction.status_changed", "transaction", transact_id, payload)
+
+    return version + 1
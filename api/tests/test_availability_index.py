@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from backend.availability.availability_index import SlotIndex, _by_day, _EMPTY
+
+
+SLOT = {"listId": 7, "startTime": datetime(2030, 1, 1, 9), "endTime": datetime(2030, 1, 1, 10)}
+BOOKING = {"listId": 7, "bookDate": datetime(2030, 1, 1, 9, 30)}
+
+
+def _window():
+    start = int((datetime(2030, 1, 1) - datetime(1970, 1, 1)).total_seconds())
+    return start, start + 86400
+
+
+def test_by_day_empty():
+    assert _by_day(_EMPTY, _EMPTY, _EMPTY) == {}
+
+
+def test_build_all_slots_booked():
+    index = SlotIndex.build([SLOT], [BOOKING])
+    assert index.slots == 0
+    assert index.available(*_window()).tolist() == []
+
+
+def test_patch_books_last_free_slot():
+    index = SlotIndex.build([SLOT], [])
+    assert index.available(*_window()).tolist() == [7]
+
+    index = index.patched([7], [SLOT], [BOOKING])
+    assert index.slots == 0
+    assert index.listing_days == {}
+    assert index.available(*_window()).tolist() == []
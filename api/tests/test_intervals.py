@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from backend.availability import intervals
+from backend.availability.intervals import BUSY, FREE
+
+
+NOW = datetime(2030, 1, 1, 15, 30)
+
+
+def _array(*values):
+    return np.array(values, dtype=np.int64)
+
+
+def _sweep(free, busy, window=(0, 100)):
+    free_start, free_end = (_array(*column) for column in zip(*free)) if free else (_array(), _array())
+    busy_start, busy_end = (_array(*column) for column in zip(*busy)) if busy else (_array(), _array())
+    starts, ends, statuses = intervals.sweep(free_start, free_end, busy_start, busy_end, *window)
+    return list(zip(starts.tolist(), ends.tolist(), statuses.tolist()))
+
+
+def test_adjacent_free_intervals_merge():
+    assert _sweep([(0, 10), (10, 20)], []) == [(0, 20, FREE)]
+
+
+def test_adjacent_free_and_busy_stay_apart():
+    assert _sweep([(0, 10)], [(10, 20)]) == [(0, 10, FREE), (10, 20, BUSY)]
+
+
+def test_gap_is_left_out():
+    assert _sweep([(0, 10), (30, 40)], []) == [(0, 10, FREE), (30, 40, FREE)]
+
+
+def test_busy_inside_free_splits_it():
+    assert _sweep([(0, 100)], [(20, 40)]) == [(0, 20, FREE), (20, 40, BUSY), (40, 100, FREE)]
+
+
+def test_busy_covering_free_wins():
+    assert _sweep([(10, 20)], [(0, 30)]) == [(0, 30, BUSY)]
+
+
+def test_overlapping_busy_intervals_merge():
+    assert _sweep([(0, 50)], [(10, 30), (20, 40), (40, 45)]) == [
+        (0, 10, FREE), (10, 45, BUSY), (45, 50, FREE),
+    ]
+
+
+def test_empty_busy_set():
+    assert _sweep([(0, 10), (5, 30)], []) == [(0, 30, FREE)]
+
+
+def test_nothing_in_window():
+    assert _sweep([], []) == []
+    assert _sweep([(200, 300)], [(150, 160)]) == []
+
+
+def test_clipped_to_window():
+    assert _sweep([(-50, 30)], [(90, 500)]) == [(0, 30, FREE), (90, 100, BUSY)]
+
+
+def test_total_minutes():
+    starts, ends, statuses = _array(0, 600, 1800), _array(600, 1800, 5400), _array(FREE, BUSY, FREE)
+    assert intervals.total_minutes(starts, ends, statuses, FREE) == 70
+    assert intervals.total_minutes(starts, ends, statuses, BUSY) == 20
+
+
+def test_booked_intervals():
+    # Listing 1 has a slot [100, 200); a booking at 150 holds it to 200, one at 300 gets the default
+    start, end = intervals.booked_intervals(
+        _array(1), _array(100), _array(200), _array(1, 1, 2), _array(150, 300, 150), default_seconds=60,
+    )
+    assert start.tolist() == [150, 300, 150]
+    assert end.tolist() == [200, 360, 210]
+
+
+def test_parse_window_defaults():
+    start, end = intervals.parse_window({}, 7, 30, NOW)
+    assert (start, end) == (datetime(2030, 1, 1), datetime(2030, 1, 8))
+
+
+def test_parse_window_naive():
+    start, end = intervals.parse_window({"from": "2030-01-02", "to": "2030-01-02T12:00:00"}, 7, 30, NOW)
+    assert (start, end) == (datetime(2030, 1, 2), datetime(2030, 1, 2, 12))
+
+
+@pytest.mark.parametrize("value", ["2030-01-02T09:00:00Z", "2030-01-02T11:00:00+02:00", "2030-01-02T04:00:00-05:00"])
+def test_parse_window_offset_aware(value):
+    start, end = intervals.parse_window({"from": value}, 7, 30, NOW)
+
+    expected = datetime(2030, 1, 2, 9, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    assert start.tzinfo is None and end.tzinfo is None
+    assert start == expected
+    assert end == expected + timedelta(days=7)
+    # Naive results convert to epoch seconds like stored datetimes
+    assert intervals.to_seconds([start, end]).tolist()[1] - intervals.to_seconds([start]).tolist()[0] == 7 * 86400
+
+
+def test_parse_window_mixed_naive_and_aware():
+    start, end = intervals.parse_window({"from": "2030-01-02", "to": "2030-01-03T00:00:00+00:00"}, 7, 30, NOW)
+    assert end - start == datetime(2030, 1, 3, tzinfo=timezone.utc).astimezone().replace(tzinfo=None) - start
+
+
+@pytest.mark.parametrize("args,message", [
+    ({"from": "tomorrow"}, "from and to must be ISO dates or datetimes"),
+    ({"from": "2030-01-05", "to": "2030-01-05"}, "to must be after from"),
+    ({"from": "2030-01-05", "to": "2030-03-05"}, "window must be at most 30 days"),
+])
+def test_parse_window_rejects(args, message):
+    with pytest.raises(ValueError, match=message):
+        intervals.parse_window(args, 7, 30, NOW)
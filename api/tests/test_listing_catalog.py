@@ -0,0 +1,213 @@
+from collections import Counter
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import backend.events.snapshots as snapshots
+from backend.events.outbox import Event
+from backend.listings.listing_catalog import (
+    PRICE_BUCKETS, CatalogSnapshot, ListingCatalog, touched_listings,
+)
+
+
+def _row(listing_id, category_id, provider_id, price, status="active", rating=None, reviews=0,
+         score=None, verified=True, updated=1, created=1, title="Listing"):
+    return {
+        "listingId": listing_id,
+        "title": title,
+        "description": f"{title} description",
+        "price": price,
+        "unit": "hour",
+        "imageUrl": None,
+        "createDate": datetime(2030, 1, created),
+        "lastUpdate": datetime(2030, 1, updated),
+        "listingStatus": status,
+        "categoryId": category_id,
+        "category_name": f"category {category_id}",
+        "category_type": "service",
+        "provider_id": provider_id,
+        "provider_name": f"Provider {provider_id}",
+        "provider_verified": verified,
+        "listing_avg_rating": rating,
+        "review_count": reviews,
+        "rating_score": score,
+    }
+
+
+ROWS = [
+    _row(1, 2, 10, 15.0, rating=4.5, reviews=2, score=4.1, updated=5, created=1, title="Calculus tutoring"),
+    _row(2, 2, 11, 8.0, verified=False, updated=3, created=2, title="Essay editing"),
+    _row(3, 4, 10, 120.0, rating=3.0, reviews=1, score=3.6, updated=9, created=3, title="Moving help"),
+    _row(4, 4, 12, 30.0, status="removed", updated=7, created=4, title="Old desk"),
+    _row(5, 7, 11, 250.0, rating=5.0, reviews=4, score=4.4, updated=1, created=5, title="Physics tutoring"),
+    _row(6, 2, 12, 50.0, status="draft", rating=2.0, reviews=1, score=3.4, updated=2, created=6, title="Chem notes"),
+]
+
+# Plain-Python versions of each filter, keyed like CatalogSnapshot.mask()
+REFERENCE_FILTERS = {
+    "status": lambda row, v: row["listingStatus"] == v,
+    "category_id": lambda row, v: row["categoryId"] == v,
+    "provider_id": lambda row, v: row["provider_id"] == v,
+    "verified": lambda row, v: bool(row["provider_verified"]) == v,
+    "min_price": lambda row, v: row["price"] >= v,
+    "max_price": lambda row, v: row["price"] <= v,
+    "search": lambda row, v: v.lower() in f"{row['title']}\n{row['description']}".lower(),
+}
+
+REFERENCE_SORTS = {
+    "recent": lambda row: -row["lastUpdate"].timestamp(),
+    "newest": lambda row: -row["createDate"].timestamp(),
+    "price": lambda row: row["price"],
+    "-price": lambda row: -row["price"],
+    "rating": lambda row: -row["rating_score"] if row["rating_score"] is not None else float("inf"),
+}
+
+
+def _reference(rows, sort="recent", **filters):
+    kept = [row for row in rows
+            if all(REFERENCE_FILTERS[name](row, value) for name, value in filters.items())]
+    return [row["listingId"] for row in sorted(kept, key=REFERENCE_SORTS[sort])]
+
+
+def _ids(rows):
+    return [row["listingId"] for row in rows]
+
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"status": "active"},
+    {"category_id": 2},
+    {"provider_id": 10},
+    {"verified": False},
+    {"min_price": 15, "max_price": 120},
+    {"search": "TUTORING"},
+    {"status": "active", "category_id": 2, "verified": True},
+    {"status": "inactive"},
+])
+@pytest.mark.parametrize("sort", sorted(REFERENCE_SORTS))
+def test_query_matches_reference(filters, sort):
+    snapshot = CatalogSnapshot.build(ROWS)
+    assert _ids(snapshot.query(sort=sort, **filters)) == _reference(ROWS, sort, **filters)
+
+
+def test_query_limit():
+    snapshot = CatalogSnapshot.build(ROWS)
+    assert _ids(snapshot.query(sort="price", limit=2)) == _reference(ROWS, "price")[:2]
+
+
+def test_category_and_listing_sets():
+    snapshot = CatalogSnapshot.build(ROWS)
+    category_in = np.zeros(5, dtype=np.bool_)
+    category_in[4] = True
+
+    # categoryId 7 is past the end of category_in, so it is not a member
+    assert snapshot.match(category_in=category_in).tolist() == [2, 3]
+    assert snapshot.match(listing_in=np.array([2, 5, 99])).tolist() == [1, 4]
+
+
+def test_facets_match_reference():
+    snapshot = CatalogSnapshot.build(ROWS)
+    positions = snapshot.match(status="active")
+    active = [row for row in ROWS if row["listingStatus"] == "active"]
+
+    facets = snapshot.facets(positions)
+
+    assert facets["total"] == len(active)
+    assert {f["categoryId"]: f["count"] for f in facets["categories"]} == \
+        Counter(row["categoryId"] for row in active)
+    assert [f["count"] for f in facets["categories"]] == \
+        sorted((f["count"] for f in facets["categories"]), reverse=True)
+
+    bounds = (0,) + PRICE_BUCKETS
+    expected = [sum(1 for row in active
+                    if row["price"] >= bounds[i] and (i == len(PRICE_BUCKETS) or row["price"] < bounds[i + 1]))
+                for i in range(len(bounds))]
+    assert [f["count"] for f in facets["priceBuckets"]] == expected
+    assert facets["verifiedProvider"] == {
+        "true": sum(1 for row in active if row["provider_verified"]),
+        "false": sum(1 for row in active if not row["provider_verified"]),
+    }
+
+
+def test_provider_rating():
+    snapshot = CatalogSnapshot.build(ROWS)
+    # Provider 10: (4.5 * 2 + 3.0 * 1) / 3 reviews; provider 12 has one 2.0 review
+    assert snapshot.provider_rating()[snapshot.position[1]] == pytest.approx(4.0)
+    assert snapshot.provider_rating()[snapshot.position[4]] == pytest.approx(2.0)
+
+
+def test_patched_matches_rebuild():
+    changed = [
+        _row(2, 4, 11, 300.0, verified=True, updated=10, created=2, title="Essay editing"),
+        _row(1, 2, 10, 15.0, status="removed", rating=4.5, reviews=2, score=4.1, updated=11, created=1),
+        _row(7, 7, 13, 20.0, rating=4.0, reviews=1, score=3.9, updated=12, created=7, title="New tutoring"),
+    ]
+    original = CatalogSnapshot.build(ROWS)
+    patched = original.patched(changed)
+
+    by_id = {row["listingId"]: row for row in ROWS}
+    by_id.update((row["listingId"], row) for row in changed)
+    expected = list(by_id.values())
+
+    for sort in REFERENCE_SORTS:
+        for filters in ({}, {"status": "active"}, {"category_id": 4}, {"search": "tutoring"}):
+            assert _ids(patched.query(sort=sort, **filters)) == _reference(expected, sort, **filters)
+    assert patched.facets(patched.match())["total"] == len(expected)
+
+    # The original snapshot is left as it was
+    assert _ids(original.query()) == _reference(ROWS)
+
+
+def test_touched_listings():
+    condition, params = touched_listings([
+        Event(1, "listing.updated", "listing", 3, {}, None),
+        Event(2, "review.created", "review", 40, {"listId": 5}, None),
+        Event(3, "student.suspended", "student", 11, {}, None),
+    ])
+    assert condition == "(l.listingId IN (%s, %s) OR l.providerId IN (%s))"
+    assert sorted(params[:2]) == [3, 5] and params[2:] == [11]
+
+
+class StubCursor:
+    """Returns the fixture rows the catalog's queries ask for"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+        self._result = []
+
+    def execute(self, query, params=None):
+        self.queries.append((query, params))
+        if "l.providerId IN" in query:
+            self._result = [row for row in self.rows if row["provider_id"] in params]
+        else:
+            self._result = list(self.rows)
+
+    def fetchall(self):
+        return self._result
+
+    def close(self):
+        pass
+
+
+def test_apply_events_patches_snapshot(monkeypatch):
+    rows = list(ROWS)
+    cursor = StubCursor(rows)
+    monkeypatch.setattr(snapshots, "db", SimpleNamespace(get_db=lambda: SimpleNamespace(cursor=lambda: cursor)))
+    monkeypatch.setattr(snapshots, "latest_event_id", lambda cursor: 0)
+    monkeypatch.setattr(snapshots, "set_offset", lambda name, event_id: None)
+
+    catalog = ListingCatalog()
+    catalog.build()
+    assert _ids(catalog.peek().query(status="active", provider_id=11)) == [2, 5]
+
+    # Provider 11 is suspended: both their listings come back removed
+    rows[1] = dict(rows[1], listingStatus="removed")
+    rows[4] = dict(rows[4], listingStatus="removed")
+    catalog.apply_events([Event(1, "student.suspended", "student", 11, {}, None)])
+
+    assert _ids(catalog.peek().query(status="active", provider_id=11)) == []
+    assert catalog.stats["patches"] == 1 and catalog.stats["rows_patched"] == 2
+    assert _ids(catalog.peek().query(status="active")) == _reference(rows, status="active")
@@ -0,0 +1,171 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+
+from backend.transactions import transaction_routes
+from backend.transactions.transaction_states import (
+    STATUSES, TRANSITIONS, TransactionNotFound, TransitionConflict, can_transition, transition,
+)
+
+
+LEGAL = [(current, target) for current, targets in TRANSITIONS.items() for target in targets]
+ILLEGAL = [(current, target) for current in STATUSES for target in STATUSES
+           if target not in TRANSITIONS[current]]
+
+
+class StubCursor:
+    """Answers transition()'s queries; the CAS UPDATE matches update_rows rows"""
+
+    def __init__(self, status="requested", version=3, update_rows=1, latest=None):
+        self.row = {"transactStatus": status, "version": version, "buyerId": 11, "listId": 5}
+        self.update_rows = update_rows
+        self.latest = latest
+        self.updates = []
+        self.events = []
+        self.rowcount = 0
+        self._result = None
+        # record_events() opens its own cursor on the connection
+        self.connection = SimpleNamespace(cursor=lambda: self)
+
+    def execute(self, query, params=None):
+        query = " ".join(query.split())
+        if query.startswith("UPDATE transact"):
+            self.updates.append((query, params))
+            self.rowcount = self.update_rows
+        elif query.startswith("INSERT INTO outbox_event"):
+            self.events.append((params[0], params[2], json.loads(params[3])))
+        elif "FOR SHARE" in query:
+            self._result = self.latest
+        else:
+            self._result = self.row
+
+    def fetchone(self):
+        return self._result
+
+    def close(self):
+        pass
+
+
+def test_transitions_table():
+    assert set(TRANSITIONS) == set(STATUSES)
+    assert all(set(targets) <= set(STATUSES) for targets in TRANSITIONS.values())
+    assert TRANSITIONS["completed"] == () and TRANSITIONS["cancelled"] == ()
+
+
+@pytest.mark.parametrize("current,target", LEGAL)
+def test_legal_transition(current, target):
+    cursor = StubCursor(status=current, version=3)
+
+    assert can_transition(current, target)
+    assert transition(cursor, 42, target) == 4
+
+    (query, params), = cursor.updates
+    assert "WHERE transactId = %s AND version = %s" in query
+    assert params == [target, 42, 3]
+    assert ("fulfillmentDate = NOW()" in query) == (target == "completed")
+    assert cursor.events == [("transaction.status_changed", 42, {
+        "from": current, "to": target, "version": 4, "buyerId": 11, "listId": 5,
+    })]
+
+
+@pytest.mark.parametrize("current,target", ILLEGAL)
+def test_illegal_transition(current, target):
+    cursor = StubCursor(status=current, version=3)
+
+    assert not can_transition(current, target)
+    with pytest.raises(TransitionConflict) as raised:
+        transition(cursor, 42, target)
+
+    assert (raised.value.current_status, raised.value.version) == (current, 3)
+    assert cursor.updates == [] and cursor.events == []
+
+
+def test_reschedule_keeps_status():
+    cursor = StubCursor(status="confirmed", version=3)
+
+    assert transition(cursor, 42, "confirmed", book_date="2030-01-01 09:00:00") == 4
+    assert cursor.updates[0][1] == ["confirmed", "2030-01-01 09:00:00", 42, 3]
+    assert cursor.events[0][2]["bookDate"] == "2030-01-01 09:00:00"
+
+
+def test_reschedule_of_finished_booking_rejected():
+    with pytest.raises(TransitionConflict):
+        transition(StubCursor(status="completed"), 42, "completed", book_date="2030-01-01 09:00:00")
+
+
+def test_expected_version_mismatch():
+    cursor = StubCursor(status="requested", version=3)
+
+    with pytest.raises(TransitionConflict) as raised:
+        transition(cursor, 42, "confirmed", expected_version=2)
+
+    assert (raised.value.current_status, raised.value.version) == ("requested", 3)
+    assert cursor.updates == [] and cursor.events == []
+
+
+def test_expected_version_match():
+    assert transition(StubCursor(version=3), 42, "confirmed", expected_version=3) == 4
+
+
+def test_compare_and_set_miss():
+    # Another request confirmed the booking between the read and the write
+    cursor = StubCursor(status="requested", version=3, update_rows=0,
+                        latest={"transactStatus": "confirmed", "version": 4})
+
+    with pytest.raises(TransitionConflict) as raised:
+        transition(cursor, 42, "cancelled")
+
+    assert raised.value.to_dict() == {
+        "error": "Transaction was modified by another request",
+        "currentStatus": "confirmed",
+        "version": 4,
+    }
+    assert cursor.events == []
+
+
+def test_missing_transaction():
+    cursor = StubCursor()
+    cursor.row = None
+
+    with pytest.raises(TransactionNotFound):
+        transition(cursor, 42, "confirmed")
+
+
+@pytest.mark.parametrize("cursor,status", [
+    (StubCursor(status="requested", version=3), 200),
+    (StubCursor(status="completed", version=3), 409),
+    (StubCursor(status="requested", version=3, update_rows=0,
+                latest={"transactStatus": "cancelled", "version": 4}), 409),
+])
+def test_route_status(monkeypatch, cursor, status):
+    conn = SimpleNamespace(cursor=lambda: cursor, commit=lambda: None, rollback=lambda: None)
+    monkeypatch.setattr(transaction_routes, "db", SimpleNamespace(get_db=lambda: conn))
+
+    with Flask(__name__).test_request_context():
+        response, code = transaction_routes._apply_transition(42, "confirmed", "Transaction confirmed")
+
+    assert code == status
+    if status == 409:
+        assert set(response.get_json()) == {"error", "currentStatus", "version"}
+
+
+def test_route_stale_version(monkeypatch):
+    cursor = StubCursor(status="requested", version=3)
+    conn = SimpleNamespace(cursor=lambda: cursor, commit=lambda: None, rollback=lambda: None)
+    monkeypatch.setattr(transaction_routes, "db", SimpleNamespace(get_db=lambda: conn))
+
+    with Flask(__name__).test_request_context(headers={"If-Match": '"2"'}):
+        response, code = transaction_routes._apply_transition(42, "confirmed", "Transaction confirmed")
+
+    assert code == 409
+    assert response.get_json()["version"] == 3
+
+
+def test_route_bad_version():
+    with Flask(__name__).test_request_context(headers={"If-Match": '"abc"'}):
+        response, code = transaction_routes._apply_transition(42, "confirmed", "Transaction confirmed")
+
+    assert code == 400
+    assert response.get_json() == {"error": "version must be an integer"}
@@ -0,0 +1,18 @@
+# HTTP session for the pages' calls to the web-api
+
+# The API sends reads to replicas but keeps a client on the primary
+# for a few seconds after it writes, so the next page shows its own
+# change. It tracks that in the Flask session cookie, which plain
+# requests.get/post calls never send back. Pages call the API through
+# api_session() instead: one requests.Session per browser session,
+# kept in st.session_state, carries the cookie between calls.
+
+import requests
+import streamlit as st
+
+
+def api_session():
+    """The requests.Session for this browser session's API calls"""
+    if "api_session" not in st.session_state:
+        st.session_state["api_session"] = requests.Session()
+    return st.session_state["api_session"]
@@ -3,9 +3,11 @@ logger = logging.getLogger(__name__)
 
 import streamlit as st
 from modules.nav import SideBarLinks
+from modules.api import api_session
 
 st.set_page_config(layout='wide')
 SideBarLinks()
+api = api_session()
 
 st.title(f"Welcome Student, {st.session_state['first_name']}! 🎓")
 st.write('')
@@ -36,22 +38,19 @@ st.write('---')
 st.write('### Quick Stats')
 
 try:
-    import requests
-    # Get Emma's booking count
-    response = requests.get(f'http://web-api:4000/transactions/?buyerId={st.session_state["user_id"]}')
+    # Get Emma's booking stats in one call
+    response = api.get(f'http://web-api:4000/bundles/client-home/{st.session_state["user_id"]}')
     if response.status_code == 200:
-        bookings = response.json()
+        stats = response.json()['stats']
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            st.metric("Total Bookings", len(bookings))
+            st.metric("Total Bookings", stats['total_bookings'])
         
         with col2:
-            pending = len([b for b in bookings if b.get('transactStatus') == 'requested'])
-            st.metric("Pending Requests", pending)
+            st.metric("Pending Requests", stats['pending_requests'])
         
         with col3:
-            completed = len([b for b in bookings if b.get('transactStatus') == 'completed'])
-            st.metric("Completed Services", completed)
+            st.metric("Completed Services", stats['completed_services'])
 except Exception as e:
     st.info("Unable to load stats at this time")
\ No newline at end of file
@@ -3,10 +3,13 @@ logger = logging.getLogger(__name__)
 
 import streamlit as st
 import requests
+from datetime import date, timedelta
 from modules.nav import SideBarLinks
+from modules.api import api_session
 
 st.set_page_config(layout='wide')
 SideBarLinks()
+api = api_session()
 
 st.title('🔍 Browse Services')
 st.write('Find trusted student services on campus')
@@ -17,43 +20,81 @@ st.write('### Search & Filter')
 
 col1, col2, col3 = st.columns(3)
 
+# Canonical category groups for the filter (User Story 1.1)
+try:
+    groups_response = api.get(f'{API_URL}/listings/categories/groups')
+    category_groups = groups_response.json()['groups'] if groups_response.status_code == 200 else []
+except Exception as e:
+    logger.error(f'Error fetching category groups: {e}')
+    category_groups = []
+group_names = {group['slug']: group['name'] for group in category_groups}
+
 with col1:
     # Category filter (User Story 1.1)
     category = st.selectbox(
         'Category',
-        ['All', 'Tutoring', 'Moving Help', 'Marketplace', 'Tech Help']
+        ['All'] + list(group_names),
+        format_func=lambda slug: group_names.get(slug, slug)
     )
 
 with col2:
     search_term = st.text_input('Search by keyword')
+    if search_term:
+        # Typeahead suggestions for what has been typed so far
+        try:
+            suggest_response = api.get(f'{API_URL}/search/suggest',
+                                            params={'prefix': search_term, 'limit': 5})
+            if suggest_response.status_code == 200:
+                suggestions = suggest_response.json()['suggestions']
+                if suggestions:
+                    st.caption('Suggestions: ' + ', '.join(s['text'] for s in suggestions))
+        except Exception as e:
+            logger.error(f'Error fetching suggestions: {e}')
 
 with col3:
     # Sort by (User Story 1.5 - compare prices)
     sort_by = st.selectbox(
         'Sort by',
-        ['Price (Low to High)', 'Price (High to Low)', 'Rating (High to Low)']
+        ['Recommended for you', 'Price (Low to High)', 'Price (High to Low)', 'Rating (High to Low)']
     )
 
-params = {}
+# Only providers with a free slot in the chosen dates (User Story 1.3)
+available_only = st.checkbox('Only show services available between')
+if available_only:
+    col1, col2 = st.columns(2)
+    with col1:
+        available_from = st.date_input('From', value=date.today(), min_value=date.today())
+    with col2:
+        available_to = st.date_input('To', value=available_from + timedelta(days=7), min_value=available_from,
+                                     max_value=available_from + timedelta(days=91))
+
+# Sorting is done by the API (User Story 1.5)
+SORT_PARAMS = {
+    'Recommended for you': 'relevance',
+    'Price (Low to High)': 'price',
+    'Price (High to Low)': '-price',
+    'Rating (High to Low)': 'rating',
+}
+
+params = {'sort': SORT_PARAMS[sort_by]}
+if params['sort'] == 'relevance':
+    # Ranked by the buyer's booking history
+    params['buyerId'] = st.session_state.get('user_id', 1)
 if category != 'All':
-    params['category'] = category
+    params['categoryGroup'] = category
 if search_term:
     params['q'] = search_term
+if available_only:
+    params['availableFrom'] = str(available_from)
+    params['availableTo'] = str(available_to + timedelta(days=1))
 
 # Call listings API (User Story 1.1, 1.5)
 try:
-    response = requests.get(f'{API_URL}/listings/', params=params)
+    response = api.get(f'{API_URL}/listings/', params=params)
     
     if response.status_code == 200:
         listings = response.json()
         
-        if 'Price (Low' in sort_by:
-            listings.sort(key=lambda x: x.get('price', 999))
-        elif 'Price (High' in sort_by:
-            listings.sort(key=lambda x: x.get('price', 0), reverse=True)
-        elif 'Rating' in sort_by:
-            listings.sort(key=lambda x: x.get('avg_rating', 0) or 0, reverse=True)
-        
         st.write(f'### Found {len(listings)} services')
         st.write('---')
         
@@ -4,9 +4,11 @@ logger = logging.getLogger(__name__)
 import streamlit as st
 import requests
 from modules.nav import SideBarLinks
+from modules.api import api_session
 
 st.set_page_config(layout='wide')
 SideBarLinks()
+api = api_session()
 
 if 'selected_listing_id' not in st.session_state:
     st.session_state['selected_listing_id'] = 1 
@@ -18,11 +20,12 @@ st.title('Provider Profile & Service Details')
 API_URL = "http://web-api:4000"
 
 try:
-    # Get listing details (includes provider info)
-    listing_response = requests.get(f'{API_URL}/listings/{listing_id}')
+    # Listing, provider info, reviews and availability in one call
+    bundle_response = api.get(f'{API_URL}/bundles/listing-page/{listing_id}')
     
-    if listing_response.status_code == 200:
-        listing = listing_response.json()
+    if bundle_response.status_code == 200:
+        bundle = bundle_response.json()
+        listing = bundle['listing']
         
         col1, col2 = st.columns([2, 1])
         
@@ -54,61 +57,102 @@ try:
             
             st.metric("Total Reviews", listing.get('review_count', 0))
         
-        # Reviews section
+        # Reviews section, one page at a time
         st.write('---')
         st.subheader('Reviews')
         
-        reviews_response = requests.get(f'{API_URL}/listings/{listing_id}/reviews')
+        if st.session_state.get('reviews_listing_id') != listing_id:
+            st.session_state['reviews_listing_id'] = listing_id
+            st.session_state['reviews_cursors'] = [None]
+        cursors = st.session_state['reviews_cursors']
         
-        if reviews_response.status_code == 200:
-            reviews = reviews_response.json()
+        reviews_response = api.get(
+            f'{API_URL}/listings/{listing_id}/reviews',
+            params={'cursor': cursors[-1]} if cursors[-1] else {}
+        )
+        page = reviews_response.json() if reviews_response.status_code == 200 else {}
+        reviews = page.get('reviews', [])
+        
+        if page.get('count'):
+            histogram = page['histogram']
+            for star in ['5', '4', '3', '2', '1']:
+                col1, col2 = st.columns([1, 4])
+                with col1:
+                    st.caption(f"{star} ⭐ ({histogram.get(star, 0)})")
+                with col2:
+                    st.progress(histogram.get(star, 0) / page['count'])
+        
+        if reviews:
+            for review in reviews:
+                with st.container():
+                    col1, col2 = st.columns([3, 1])
+                    
+                    with col1:
+                        st.write(f"**{review.get('reviewer_name', 'Anonymous')}**")
+                        if review.get('reviewer_verified'):
+                            st.caption("✅ Verified Student")
+                        st.write(review.get('reviewText', ''))
+                    
+                    with col2:
+                        st.write(f"⭐ {review.get('rating')}/5")
+                        st.caption(review.get('createDate', ''))
+                    
+                    st.divider()
             
-            if reviews:
-                for review in reviews:
-                    with st.container():
-                        col1, col2 = st.columns([3, 1])
-                        
-                        with col1:
-                            st.write(f"**{review.get('reviewer_name', 'Anonymous')}**")
-                            if review.get('reviewer_verified'):
-                                st.caption("✅ Verified Student")
-                            st.write(review.get('reviewText', ''))
-                        
-                        with col2:
-                            st.write(f"⭐ {review.get('rating')}/5")
-                            st.caption(review.get('createDate', ''))
-                        
-                        st.divider()
-            else:
-                st.info('No reviews yet for this service')
+            col1, col2 = st.columns(2)
+            with col1:
+                if len(cursors) > 1 and st.button('Newer reviews'):
+                    cursors.pop()
+                    st.rerun()
+            with col2:
+                if page.get('nextCursor') and st.button('Older reviews'):
+                    cursors.append(page['nextCursor'])
+                    st.rerun()
+        else:
+            st.info('No reviews yet for this service')
         
         # Availability section
         st.write('---')
         st.subheader('📅 Available Time Slots')
         
-        availability_response = requests.get(f'{API_URL}/listings/{listing_id}/availability')
+        slots = bundle['availability']
         
-        if availability_response.status_code == 200:
-            slots = availability_response.json()
-            
-            if slots:
-                for slot in slots[:5]:  # Show first 5 slots
-                    col1, col2 = st.columns([2, 1])
-                    
-                    with col1:
-                        st.write(f"📅 {slot.get('startTime')} - {slot.get('endTime')}")
-                    
-                    with col2:
-                        if st.button(f"Book This Slot", key=f"book_{slot.get('availabilityId')}"):
-                            st.session_state['selected_slot'] = slot
-                            st.session_state['selected_listing'] = listing
-                            st.success("Booking functionality coming soon!")
-            else:
-                st.info('No availability posted yet')
+        if slots:
+            for slot in slots[:5]:  # Show first 5 slots
+                col1, col2 = st.columns([2, 1])
+                
+                with col1:
+                    st.write(f"📅 {slot.get('startTime')} - {slot.get('endTime')}")
+                
+                with col2:
+                    if st.button(f"Book This Slot", key=f"book_{slot.get('availabilityId')}"):
+                        st.session_state['selected_slot'] = slot
+                        st.session_state['selected_listing'] = listing
+                        st.success("Booking functionality coming soon!")
+        else:
+            st.info('No availability posted yet')
+        
+        # Similar services section
+        st.write('---')
+        st.subheader('Similar Services')
+        
+        similar_response = api.get(f'{API_URL}/listings/{listing_id}/similar', params={'k': 4})
+        similar = similar_response.json().get('similar', []) if similar_response.status_code == 200 else []
+        
+        if similar:
+            cols = st.columns(len(similar))
+            for col, item in zip(cols, similar):
+                with col:
+                    st.write(f"**{item.get('title')}**")
+                    st.caption(f"{item.get('category_name')} · {item.get('provider_name')}")
+                    st.write(f"${item.get('price')}/{item.get('unit') or 'session'}")
+                    if st.button('View', key=f"similar_{item.get('listingId')}"):
+                        st.session_state['selected_listing_id'] = item.get('listingId')
+                        st.rerun()
         else:
-            st.info('No availability information available')
+            st.info('No similar services found')
     else:
-        st.error(f'Failed to load listing details: {listing_response.status_code}')
+        st.error(f'Failed to load listing details: {bundle_response.status_code}')
         
 except requests.exceptions.RequestException as e:
     st.error(f'Error connecting to API: {str(e)}')
\ No newline at end of file
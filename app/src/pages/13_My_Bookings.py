@@ -4,9 +4,11 @@ logger = logging.getLogger(__name__)
 import streamlit as st
 import requests
 from modules.nav import SideBarLinks
+from modules.api import api_session
 
 st.set_page_config(layout='wide')
 SideBarLinks()
+api = api_session()
 
 st.title('📅 My Bookings')
 st.write(f"Manage your service appointments, {st.session_state['first_name']}")
@@ -18,7 +20,8 @@ tab1, tab2, tab3 = st.tabs(["Pending", "Confirmed", "Completed"])
 
 try:
     # Get Emma's transactions (User Story 1.3)
-    response = requests.get(f'{API_URL}/transactions/?buyerId={user_id}')
+    # Current bookings only; bookings archived after the retention window are left out
+    response = api.get(f'{API_URL}/transactions/', params={'buyerId': user_id, 'scope': 'current'})
     
     if response.status_code == 200:
         all_bookings = response.json()
@@ -44,7 +47,7 @@ try:
                         with col3:
                             if st.button("Cancel", key=f"cancel_{booking['transactId']}"):
                                 # Call DELETE endpoint
-                                cancel_response = requests.delete(
+                                cancel_response = api.delete(
                                     f"{API_URL}/transactions/{booking['transactId']}"
                                 )
                                 if cancel_response.status_code == 200:
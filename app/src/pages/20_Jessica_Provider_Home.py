@@ -1,6 +1,7 @@
 import streamlit as st
 import requests
 from modules.nav import SideBarLinks
+from modules.api import api_session
 
 # Page configuration
 st.set_page_config(
@@ -11,6 +12,7 @@ st.set_page_config(
 
 # Sidebar navigation
 SideBarLinks()
+api = api_session()
 
 # Page title
 st.title("📊 Provider Dashboard")
@@ -21,17 +23,26 @@ provider_id = 3
 
 st.divider()
 
+# Metrics and pending requests come back together from one bundle call
+bundle = None
+bundle_error = None
+try:
+    response = api.get(f'http://web-api:4000/bundles/provider-home/{provider_id}')
+    if response.status_code == 200:
+        bundle = response.json()
+    else:
+        bundle_error = f"{response.status_code}: {response.text}"
+except requests.exceptions.RequestException as e:
+    bundle_error = f"Error connecting to API: {str(e)}"
+
 # ==========================================
 # SECTION 1: Performance Metrics
 # ==========================================
 st.subheader("💼 Your Performance")
 
 try:
-    # Call the metrics API
-    response = requests.get(f'http://web-api:4000/students/{provider_id}/metrics')
-    
-    if response.status_code == 200:
-        data = response.json()
+    if bundle is not None:
+        data = bundle['metrics']
         
         # Create 4 columns for metrics
         col1, col2, col3, col4 = st.columns(4)
@@ -61,11 +72,8 @@ try:
                 value=data['total_services_offered']
             )
     else:
-        st.error(f"Failed to load metrics: {response.status_code}")
-        st.write(f"Response: {response.text}")
+        st.error(f"Failed to load metrics: {bundle_error}")
         
-except requests.exceptions.RequestException as e:
-    st.error(f"Error connecting to API: {str(e)}")
 except Exception as e:
     st.error(f"Unexpected error: {str(e)}")
 
@@ -77,14 +85,8 @@ st.divider()
 st.subheader("📋 Pending Service Requests")
 
 try:
-    # Call the pending requests API
-    response = requests.get(
-        f'http://web-api:4000/transactions',
-        params={'providerId': provider_id, 'status': 'requested'}
-    )
-    
-    if response.status_code == 200:
-        requests_data = response.json()
+    if bundle is not None:
+        requests_data = bundle['pendingRequests']
         
         if len(requests_data) == 0:
             st.info("🎉 No pending requests at the moment!")
@@ -112,7 +114,7 @@ try:
                     with col2:
                         if st.button("✅ Accept", key=f"accept_{req['transactId']}", use_container_width=True):
                             try:
-                                update_response = requests.put(
+                                update_response = api.put(
                                     f'http://web-api:4000/transactions/{req["transactId"]}',
                                     json={'transactStatus': 'confirmed'}
                                 )
@@ -128,7 +130,7 @@ try:
                     with col3:
                         if st.button("❌ Decline", key=f"decline_{req['transactId']}", use_container_width=True):
                             try:
-                                update_response = requests.put(
+                                update_response = api.put(
                                     f'http://web-api:4000/transactions/{req["transactId"]}',
                                     json={'transactStatus': 'cancelled'}
                                 )
@@ -147,11 +149,8 @@ try:
                 if st.button("📋 View All Pending Requests"):
                     st.switch_page("pages/22_Pending_Requests.py")
     else:
-        st.error(f"Failed to load requests: {response.status_code}")
-        st.write(f"Response: {response.text}")
+        st.error(f"Failed to load requests: {bundle_error}")
         
-except requests.exceptions.RequestException as e:
-    st.error(f"Error connecting to API: {str(e)}")
 except Exception as e:
     st.error(f"Unexpected error: {str(e)}")
 
@@ -1,9 +1,11 @@
 import streamlit as st
-import requests
+import uuid
 from modules.nav import SideBarLinks
+from modules.api import api_session
 
 st.set_page_config(page_title="My Services", page_icon="📝", layout="wide")
 SideBarLinks()
+api = api_session()
 
 st.title("📝 My Services")
 st.write("Manage your service offerings")
@@ -40,9 +42,13 @@ with st.expander("➕ Add New Service"):
             if not title or not description:
                 st.error("Please fill in all required fields")
             else:
+                # One key per new service: resubmitting after a timeout
+                # returns the first result instead of a duplicate listing
+                idem_key = st.session_state.setdefault('create_service_key', str(uuid.uuid4()))
                 try:
-                    response = requests.post(
+                    response = api.post(
                         'http://web-api:4000/listings',
+                        headers={'Idempotency-Key': idem_key},
                         json={
                             'categoryId': category_id,
                             'providerId': provider_id,
@@ -55,6 +61,7 @@ with st.expander("➕ Add New Service"):
                     )
                     
                     if response.status_code == 201:
+                        st.session_state.pop('create_service_key', None)
                         st.success("✅ Service created successfully!")
                         st.rerun()
                     else:
@@ -78,7 +85,7 @@ with col1:
 
 try:
     # Get listings for this provider
-    response = requests.get(
+    response = api.get(
         f'http://web-api:4000/listings',
         params={'providerId': provider_id}
     )
@@ -115,7 +122,7 @@ try:
                     with col3:
                         if st.button("🗑️ Remove", key=f"delete_{listing['listingId']}", use_container_width=True):
                             try:
-                                delete_response = requests.delete(
+                                delete_response = api.delete(
                                     f'http://web-api:4000/listings/{listing["listingId"]}'
                                 )
                                 if delete_response.status_code == 200:
@@ -136,7 +143,7 @@ try:
                             with col_save:
                                 if st.form_submit_button("💾 Save Changes", use_container_width=True):
                                     try:
-                                        update_response = requests.put(
+                                        update_response = api.put(
                                             f'http://web-api:4000/listings/{listing["listingId"]}',
                                             json={
                                                 'price': new_price,
@@ -1,9 +1,10 @@
 import streamlit as st
-import requests
 from modules.nav import SideBarLinks
+from modules.api import api_session
 
 st.set_page_config(page_title="Pending Requests", page_icon="📋", layout="wide")
 SideBarLinks()
+api = api_session()
 
 st.title("📋 Pending Service Requests")
 st.write("Review and respond to booking requests")
@@ -29,7 +30,7 @@ st.divider()
 # ==========================================
 try:
     # FIXED: Use /transactions (not /t/transactions)
-    response = requests.get(
+    response = api.get(
         f'http://web-api:4000/transactions',
         params={'providerId': provider_id, 'status': 'requested'}
     )
@@ -41,6 +42,41 @@ try:
             st.info("🎉 No pending requests! All caught up.")
         else:
             st.write(f"You have **{len(requests_data)}** pending request(s)")
+            
+            # Accept or decline every pending request in one call
+            col_all_accept, col_all_decline, col_all_space = st.columns([1, 1, 2])
+            bulk_status = None
+            with col_all_accept:
+                if st.button("✅ Accept All", use_container_width=True):
+                    bulk_status = 'confirmed'
+            with col_all_decline:
+                if st.button("❌ Decline All", use_container_width=True):
+                    bulk_status = 'cancelled'
+            
+            if bulk_status:
+                try:
+                    bulk_response = api.post(
+                        'http://web-api:4000/transactions/bulk-status',
+                        json={
+                            'providerId': provider_id,
+                            'updates': [
+                                {'transactId': req['transactId'], 'transactStatus': bulk_status}
+                                for req in requests_data
+                            ]
+                        }
+                    )
+                    if bulk_response.status_code == 200:
+                        result = bulk_response.json()
+                        if result['failed']:
+                            st.warning(f"{result['updated']} updated, {result['failed']} could not be changed")
+                        else:
+                            st.success(f"{result['updated']} request(s) updated")
+                        st.rerun()
+                    else:
+                        st.error(f"Failed: {bulk_response.text}")
+                except Exception as e:
+                    st.error(f"Error: {str(e)}")
+            
             st.write("")
             
             # Display each request
@@ -75,7 +111,7 @@ try:
                             type="primary"
                         ):
                             try:
-                                update_response = requests.put(
+                                update_response = api.put(
                                     f'http://web-api:4000/transactions/{req["transactId"]}',
                                     json={'transactStatus': 'confirmed'}
                                 )
@@ -95,7 +131,7 @@ try:
                             use_container_width=True
                         ):
                             try:
-                                update_response = requests.put(
+                                update_response = api.put(
                                     f'http://web-api:4000/transactions/{req["transactId"]}',
                                     json={'transactStatus': 'cancelled'}
                                 )
@@ -1,10 +1,11 @@
 import streamlit as st
-import requests
 from datetime import datetime, timedelta
 from modules.nav import SideBarLinks
+from modules.api import api_session
 
 st.set_page_config(page_title="My Availability", page_icon="📅", layout="wide")
 SideBarLinks()
+api = api_session()
 
 st.title("📅 My Availability")
 st.write("Set when you're available to provide services")
@@ -22,7 +23,7 @@ selected_listing_id = None  # Initialize outside try block
 selected_service = None
 
 try:
-    listings_response = requests.get(
+    listings_response = api.get(
         f'http://web-api:4000/listings',
         params={'providerId': provider_id}
     )
@@ -80,7 +81,7 @@ with col1:
             start_datetime = f"{date} {start_time}"
             end_datetime = f"{date} {end_time}"
             
-            response = requests.post(
+            response = api.post(
                 f'http://web-api:4000/listings/{selected_listing_id}/availability',
                 json={
                     'slots': [
@@ -133,7 +134,7 @@ with col2:
                     'endTime': f"{slot_date} {recurring_end}"
                 })
             
-            response = requests.post(
+            response = api.post(
                 f'http://web-api:4000/listings/{selected_listing_id}/availability',
                 json={'slots': slots}
             )
@@ -154,7 +155,7 @@ st.divider()
 st.subheader("3️⃣ Current Availability")
 
 try:
-    availability_response = requests.get(
+    availability_response = api.get(
         f'http://web-api:4000/listings/{selected_listing_id}/availability'
     )
     
@@ -178,7 +179,7 @@ try:
                 with col4:
                     if st.button("🗑️", key=f"delete_avail_{slot[0]}", help="Delete"):
                         try:
-                            delete_response = requests.delete(
+                            delete_response = api.delete(
                                 f'http://web-api:4000/listings/{selected_listing_id}/availability/{slot[0]}'
                             )
                             if delete_response.status_code == 200:
@@ -196,6 +197,42 @@ try:
 except Exception as e:
     st.error(f"Error: {str(e)}")
 
+st.divider()
+
+# ==========================================
+# FREE / BUSY ACROSS ALL SERVICES
+# ==========================================
+st.subheader("4️⃣ My Calendar (all services)")
+
+try:
+    calendar_days = st.slider("Days ahead", min_value=1, max_value=92, value=14)
+    calendar_from = datetime.now().date()
+    calendar_response = api.get(
+        f'http://web-api:4000/students/{provider_id}/calendar',
+        params={'from': str(calendar_from), 'to': str(calendar_from + timedelta(days=calendar_days))}
+    )
+    
+    if calendar_response.status_code == 200:
+        calendar = calendar_response.json()
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Free Hours", round(calendar['freeMinutes'] / 60, 1))
+        with col2:
+            st.metric("Booked Hours", round(calendar['busyMinutes'] / 60, 1))
+        
+        if calendar['blocks']:
+            for block in calendar['blocks']:
+                icon = "🟢" if block['status'] == 'free' else "🔴"
+                st.write(f"{icon} {block['start']} → {block['end']} ({block['status']})")
+        else:
+            st.info("No availability or bookings in this period")
+    else:
+        st.warning(f"Could not load calendar: {calendar_response.text}")
+        
+except Exception as e:
+    st.error(f"Error: {str(e)}")
+
 st.divider()
 if st.button("🏠 Back to Dashboard", use_container_width=True):
     st.switch_page("pages/20_Jessica_Provider_Home.py")
\ No newline at end of file
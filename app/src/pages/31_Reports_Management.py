@@ -1,8 +1,10 @@
 import streamlit as st
 import requests
 from modules.nav import SideBarLinks
+from modules.api import api_session
 
 SideBarLinks(show_home=True)
+api = api_session()
 
 st.title("Reports Dashboard")
 
@@ -34,7 +36,7 @@ with tab2:
     
     if search_clicked:
         try:
-            response = requests.get(f"{API_URL}/admin/reports/{report_id}")
+            response = api.get(f"{API_URL}/admin/reports/{report_id}")
             
             if response.status_code == 200:
                 st.session_state.search_result = response.json()
@@ -168,7 +170,7 @@ with tab2:
                             st.error("Please enter resolution notes")
                         else:
                             try:
-                                response = requests.put(
+                                response = api.put(
                                     f"{API_URL}/admin/reports/{report.get('reportId')}",
                                     json={"resolution_notes": resolution_notes}
                                 )
@@ -196,7 +198,7 @@ with tab1:
     st.subheader("Report Summary")
 
     try:
-        response = requests.get(f"{API_URL}/admin/reports")
+        response = api.get(f"{API_URL}/admin/reports")
         
         if response.status_code == 200:
             reports = response.json()
@@ -245,7 +247,7 @@ with tab1:
                         
                         with col3:
                             if st.button("View", key=f"view_{report_id}", use_container_width=True):
-                                detail_response = requests.get(f"{API_URL}/admin/reports/{report_id}")
+                                detail_response = api.get(f"{API_URL}/admin/reports/{report_id}")
                                 if detail_response.status_code == 200:
                                     st.session_state.search_result = detail_response.json()
                                     st.session_state.active_tab = "Search Reports"
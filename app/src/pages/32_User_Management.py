@@ -2,8 +2,10 @@ import streamlit as st
 import requests
 from datetime import datetime, timedelta
 from modules.nav import SideBarLinks
+from modules.api import api_session
 
 SideBarLinks(show_home=True)
+api = api_session()
 
 st.title("User Management")
 
@@ -30,7 +32,7 @@ if "search_user_id" in st.session_state and st.session_state.search_user_id is n
     
     # Fetch user details
     try:
-        response = requests.get(f"{API_URL}/students/{user_id}")
+        response = api.get(f"{API_URL}/students/{user_id}")
         if response.status_code == 200:
             st.session_state.selected_user = response.json()
     except Exception as e:
@@ -65,7 +67,7 @@ with tab2:
     
     if search_clicked:
         try:
-            response = requests.get(f"{API_URL}/students/{search_id}")
+            response = api.get(f"{API_URL}/students/{search_id}")
             if response.status_code == 200:
                 st.session_state.selected_user = response.json()
                 st.session_state.search_user_id_value = search_id
@@ -142,7 +144,7 @@ with tab2:
             else:
                 if st.button("Unsuspend User", use_container_width=True, key="unsuspend_user_btn"):
                     try:
-                        resp = requests.put(f"{API_URL}/students/{user.get('stuId')}/unsuspend")
+                        resp = api.put(f"{API_URL}/students/{user.get('stuId')}/unsuspend")
                         if resp.status_code == 200:
                             st.success("User unsuspended!")
                             st.session_state.selected_user = None
@@ -157,7 +159,7 @@ with tab2:
             if not user.get('verifiedStatus'):
                 if st.button("Verify User", use_container_width=True, key="verify_user_btn"):
                     try:
-                        resp = requests.put(f"{API_URL}/students/{user.get('stuId')}/verify")
+                        resp = api.put(f"{API_URL}/students/{user.get('stuId')}/verify")
                         if resp.status_code == 200:
                             st.success("User verified!")
                             st.session_state.selected_user = None
@@ -206,7 +208,7 @@ with tab2:
                             "endDate": end_date.strftime("%Y-%m-%d") if end_date else None
                         }
                         
-                        resp = requests.post(f"{API_URL}/admin/suspensions", json=payload)
+                        resp = api.post(f"{API_URL}/admin/suspensions", json=payload)
                         
                         if resp.status_code == 201:
                             st.success("User suspended successfully!")
@@ -247,7 +249,7 @@ with tab1:
         if search_term:
             params["q"] = search_term
         
-        response = requests.get(f"{API_URL}/students", params=params)
+        response = api.get(f"{API_URL}/students", params=params)
         
         if response.status_code == 200:
             students = response.json()
@@ -303,7 +305,7 @@ with tab1:
                                 # Fetch user details
                                 fetch_success = False
                                 try:
-                                    resp = requests.get(f"{API_URL}/students/{stu_id}")
+                                    resp = api.get(f"{API_URL}/students/{stu_id}")
                                     if resp.status_code == 200:
                                         st.session_state.selected_user = resp.json()
                                         fetch_success = True
@@ -327,7 +329,7 @@ with tab3:
     st.subheader("Suspensions")
     
     try:
-        response = requests.get(f"{API_URL}/admin/suspensions")
+        response = api.get(f"{API_URL}/admin/suspensions")
         
         if response.status_code == 200:
             suspensions = response.json()
@@ -404,7 +406,7 @@ with tab3:
                             if suspension_status in ["ACTIVE", "PERMANENT"]:
                                 if st.button("Lift", key=f"lift_{suspension.get('suspensionId')}", use_container_width=True):
                                     try:
-                                        resp = requests.delete(f"{API_URL}/admin/suspensions/{suspension.get('suspensionId')}")
+                                        resp = api.delete(f"{API_URL}/admin/suspensions/{suspension.get('suspensionId')}")
                                         if resp.status_code == 200:
                                             st.success("Suspension lifted!")
                                             st.rerun()
@@ -2,8 +2,10 @@ import streamlit as st
 import requests
 from datetime import datetime, timedelta
 from modules.nav import SideBarLinks
+from modules.api import api_session
 
 SideBarLinks(show_home=True)
+api = api_session()
 
 st.title("Listing Management")
 
@@ -29,7 +31,7 @@ if "search_listing_id" in st.session_state and st.session_state.search_listing_i
     st.session_state.show_listing_edit_form = False
     
     try:
-        response = requests.get(f"{API_URL}/listings/{listing_id}")
+        response = api.get(f"{API_URL}/listings/{listing_id}")
         if response.status_code == 200:
             st.session_state.selected_listing = response.json()
     except Exception as e:
@@ -64,7 +66,7 @@ with tab2:
     
     if search_clicked:
         try:
-            response = requests.get(f"{API_URL}/listings/{search_id}")
+            response = api.get(f"{API_URL}/listings/{search_id}")
             if response.status_code == 200:
                 st.session_state.selected_listing = response.json()
                 st.session_state.search_listing_id_value = search_id
@@ -144,7 +146,7 @@ with tab2:
             if status == 'active':
                 if st.button("Remove Listing", use_container_width=True, key="listing_remove_btn"):
                     try:
-                        resp = requests.delete(f"{API_URL}/listings/{listing.get('listingId')}")
+                        resp = api.delete(f"{API_URL}/listings/{listing.get('listingId')}")
                         if resp.status_code == 200:
                             st.success("Listing removed!")
                             st.session_state.selected_listing = None
@@ -156,7 +158,7 @@ with tab2:
             else:
                 if st.button("Reactivate Listing", use_container_width=True, key="listing_reactivate_btn"):
                     try:
-                        resp = requests.put(
+                        resp = api.put(
                             f"{API_URL}/listings/{listing.get('listingId')}",
                             json={"listingStatus": "active"}
                         )
@@ -212,7 +214,7 @@ with tab2:
                             "description": new_description
                         }
                         
-                        resp = requests.put(
+                        resp = api.put(
                             f"{API_URL}/listings/{listing.get('listingId')}",
                             json=payload
                         )
@@ -252,11 +254,11 @@ with tab1:
     with col2:
         # Fetch categories for dropdown
         try:
-            cat_response = requests.get(f"{API_URL}/listings/categories")
+            cat_response = api.get(f"{API_URL}/listings/categories/groups")
             if cat_response.status_code == 200:
-                categories = cat_response.json()
-                category_options = [""] + [str(c.get('categoryId')) for c in categories]
-                category_names = {str(c.get('categoryId')): c.get('name') for c in categories}
+                groups = cat_response.json()["groups"]
+                category_options = [""] + [g["slug"] for g in groups]
+                category_names = {g["slug"]: g["name"] for g in groups}
                 category_names[""] = "All Categories"
                 
                 category_filter = st.selectbox(
@@ -280,11 +282,11 @@ with tab1:
         if status_filter:
             params["status"] = status_filter
         if category_filter:
-            params["categoryId"] = category_filter
+            params["categoryGroup"] = category_filter
         if search_term:
             params["search"] = search_term
         
-        response = requests.get(f"{API_URL}/listings", params=params)
+        response = api.get(f"{API_URL}/listings", params=params)
         
         if response.status_code == 200:
             listings = response.json()
@@ -344,7 +346,7 @@ with tab1:
                                 
                                 fetch_success = False
                                 try:
-                                    resp = requests.get(f"{API_URL}/listings/{listing_id}")
+                                    resp = api.get(f"{API_URL}/listings/{listing_id}")
                                     if resp.status_code == 200:
                                         st.session_state.selected_listing = resp.json()
                                         fetch_success = True
@@ -10,11 +10,12 @@
 from datetime import datetime, timedelta, timezone
 from email.utils import parsedate_to_datetime
 import streamlit as st
-from modules.nav import SideBarLinks 
-import requests
+from modules.nav import SideBarLinks
+from modules.api import api_session
 
 # Show sidebar navigation
 SideBarLinks(show_home=True)
+api = api_session()
 
 
 # Set page layout
@@ -60,7 +61,7 @@ st.subheader("At a Glance Stats")
 
 # get total users
 try:
-        response = requests.get("http://web-api:4000/students")
+        response = api.get("http://web-api:4000/students")
    
         if response.status_code == 200:
                 data = response.json()
@@ -75,7 +76,7 @@ except Exception as e:
 
 # get total listings
 try:
-        response = requests.get("http://web-api:4000/listings")
+        response = api.get("http://web-api:4000/listings")
     
         if response.status_code == 200:
                 data = response.json()
@@ -95,7 +96,7 @@ except Exception as e:
         
 # get total transactions
 try:
-        response = requests.get("http://web-api:4000/transactions")
+        response = api.get("http://web-api:4000/transactions")
     
         if response.status_code == 200:
                 data = response.json()
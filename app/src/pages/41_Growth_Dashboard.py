@@ -1,14 +1,15 @@
 import streamlit as st
-import requests
 import pandas as pd
 import numpy as np
 import altair as alt
 from datetime import datetime, timedelta, timezone
 from email.utils import parsedate_to_datetime
 from modules.nav import SideBarLinks
+from modules.api import api_session
 
 st.set_page_config(page_title="Growth Dashboard", page_icon="📈", layout="wide")
 SideBarLinks(show_home=True)
+api = api_session()
 
 st.title("📈 Growth Dashboard")
 st.write("Analyze growth metrics and trends")
@@ -34,7 +35,7 @@ def get_campus(rec):
 
 # Fetch data from APIs
 try:
-	response = requests.get(f"{API_URL}/students")
+	response = api.get(f"{API_URL}/students")
 	if response.status_code == 200:
 		students = response.json()
 	else:
@@ -44,7 +45,7 @@ except Exception as e:
 	st.error(f"Error fetching students: {e}")
 
 try:
-	response = requests.get(f"{API_URL}/listings")
+	response = api.get(f"{API_URL}/listings")
 	if response.status_code == 200:
 		listings = response.json()
 	else:
@@ -54,7 +55,7 @@ except Exception as e:
 	st.error(f"Error fetching listings: {e}")
 
 try:
-	response = requests.get(f"{API_URL}/transactions")
+	response = api.get(f"{API_URL}/transactions")
 	if response.status_code == 200:
 		transactions = response.json()
 	else:
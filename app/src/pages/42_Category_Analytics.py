@@ -1,14 +1,12 @@
 import streamlit as st
-import requests
 import pandas as pd
-import numpy as np
 import altair as alt
-from datetime import datetime, timedelta, timezone
-from email.utils import parsedate_to_datetime
 from modules.nav import SideBarLinks
+from modules.api import api_session
 
 st.set_page_config(page_title="Category Analytics", page_icon="📊", layout="wide")
 SideBarLinks(show_home=True)
+api = api_session()
 
 st.title("📊 Category Analytics")
 st.write("Analyze category performance and trends")
@@ -17,116 +15,42 @@ st.write("Analyze category performance and trends")
 API_URL = "http://web-api:4000"
 
 
-def parse_date(val):
-	if not val:
-		return None
-	try:
-		dt = parsedate_to_datetime(val)
-		if dt.tzinfo is None:
-			return dt.replace(tzinfo=timezone.utc)
-		return dt
-	except Exception:
-		return None
-
-
-def get_category_from_rec(rec):
-	return rec.get('category_name', 'Unknown')
-
-
-# --- Fetch data (direct try/except) ---
-try:
-	response = requests.get(f"{API_URL}/listings")
-	if response.status_code == 200:
-		listings = response.json()
-	else:
-		listings = []
-except Exception as e:
-	listings = []
-	st.error(f"Error fetching listings: {e}")
-
+# --- Fetch per-group stats (aggregated by canonical category group in the API) ---
 try:
-	response = requests.get(f"{API_URL}/transactions")
+	response = api.get(f"{API_URL}/listings/categories/groups/stats", params={'days': 30})
 	if response.status_code == 200:
-		transactions = response.json()
+		group_stats = response.json()['groups']
 	else:
-		transactions = []
+		group_stats = []
 except Exception as e:
-	transactions = []
-	st.error(f"Error fetching transactions: {e}")
-
-# Build listing id -> category map
-listing_cat_map = {}
-for l in listings:
-	if 'listingId' in l and 'category_name' in l:
-		listing_cat_map[str(l['listingId'])] = l['category_name']
-
-
-# Prepare transactions DataFrame with parsed dates, amount, and category
-rows = []
-for t in transactions:
-	if 'bookDate' not in t or not t['bookDate']:
-		continue
-	
-	dt = parse_date(t['bookDate'])
-	if not dt:
-		continue
-	
-	amt = t.get('paymentAmt')
-	cat = t.get('category_name', 'Unknown')
-	
-	# Fallback to map if no category in transaction
-	if not cat or cat == 'Unknown':
-		listing_id = t.get('listingId')
-		if listing_id:
-			cat = listing_cat_map.get(str(listing_id), 'Unknown')
-	
-	rows.append({'_parsed_date': dt, '_amt': float(amt) if amt is not None else np.nan, '_cat': cat})
-
-if rows:
-	df_txn = pd.DataFrame(rows)
-	df_txn['_parsed_date'] = pd.to_datetime(df_txn['_parsed_date'], utc=True)
+	group_stats = []
+	st.error(f"Error fetching category stats: {e}")
+
+if group_stats:
+	agg = pd.DataFrame([{
+		'_cat': g['name'],
+		'recent_value': g['recentValue'],
+		'prev_value': g['previousValue'],
+		'supply': g['activeListings'],
+		'demand': g['recentBookings'],
+	} for g in group_stats])
 else:
-	df_txn = pd.DataFrame(columns=['_parsed_date', '_amt', '_cat'])
+	agg = pd.DataFrame(columns=['_cat', 'recent_value', 'prev_value', 'supply', 'demand'])
 
-# Prepare listings DataFrame for supply counts
-rows_l = []
-for l in listings:
-	cat = l.get('category_name', 'Unknown')
-	is_active = l.get('listingStatus') == 'active'
-	rows_l.append({'_cat': cat, 'is_active': is_active})
-
-if rows_l:
-	df_listings = pd.DataFrame(rows_l)
-else:
-	df_listings = pd.DataFrame(columns=['_cat', 'is_active'])
 
+def pct_change(recent, prev):
+	if prev > 0:
+		return round((recent - prev) / prev * 100, 1)
+	return 100.0 if recent > 0 else 0.0
 
-# Time windows
-now = datetime.now(timezone.utc)
-recent_start = now - timedelta(days=30)
-prev_start = now - timedelta(days=60)
-prev_end = recent_start
 
-# Aggregate transaction value by category for recent and previous windows
-df_txn_recent = df_txn[df_txn['_parsed_date'] >= recent_start]
-df_txn_prev = df_txn[(df_txn['_parsed_date'] >= prev_start) & (df_txn['_parsed_date'] < prev_end)]
-
-agg_recent = df_txn_recent.groupby('_cat')['_amt'].sum().reset_index().rename(columns={'_amt': 'recent_value'})
-agg_prev = df_txn_prev.groupby('_cat')['_amt'].sum().reset_index().rename(columns={'_amt': 'prev_value'})
-
-agg = pd.merge(agg_recent, agg_prev, on='_cat', how='outer').fillna(0)
-agg['pct_change'] = agg.apply(lambda r: (round((r['recent_value'] - r['prev_value']) / r['prev_value'] * 100, 1)
-										  if r['prev_value'] > 0 else (100.0 if r['recent_value'] > 0 else 0.0)), axis=1)
+agg['pct_change'] = [pct_change(r, p) for r, p in zip(agg['recent_value'], agg['prev_value'])]
 
 # Top categories by recent transaction value
-top_cats = agg.sort_values('recent_value', ascending=False)
-
-# Supply (active listings) per category
-supply = df_listings[df_listings['is_active']].groupby('_cat').size().reset_index(name='supply')
-# Demand (transactions count) per category in recent month
-demand = df_txn_recent.groupby('_cat').size().reset_index(name='demand')
+top_cats = agg[agg['recent_value'] > 0].sort_values('recent_value', ascending=False)
 
-supply_demand = pd.merge(supply, demand, on='_cat', how='outer').fillna(0)
+# Supply (active listings) vs demand (bookings in the recent month) per category
+supply_demand = agg[(agg['supply'] > 0) | (agg['demand'] > 0)][['_cat', 'supply', 'demand']].copy()
 if not supply_demand.empty:
 	supply_demand['_cat'] = supply_demand['_cat'].astype(str)
 
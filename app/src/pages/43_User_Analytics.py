@@ -1,14 +1,15 @@
 import streamlit as st
-import requests
 import pandas as pd
 import numpy as np
 import altair as alt
 from datetime import datetime, timedelta, timezone
 from email.utils import parsedate_to_datetime
 from modules.nav import SideBarLinks
+from modules.api import api_session
 
 st.set_page_config(page_title="User Analytics", page_icon="👥", layout="wide")
 SideBarLinks(show_home=True)
+api = api_session()
 
 st.title("👥 User Analytics")
 st.write("Analyze user behavior and trends")
@@ -35,21 +36,21 @@ def get_campus(rec):
 
 # --- Fetch data --- (direct try/except style)
 try:
-	r = requests.get(f"{API_URL}/students")
+	r = api.get(f"{API_URL}/students")
 	students = r.json() if r.status_code == 200 else []
 except Exception as e:
 	students = []
 	st.error(f"Error fetching students: {e}")
 
 try:
-	r = requests.get(f"{API_URL}/transactions")
+	r = api.get(f"{API_URL}/transactions")
 	transactions = r.json() if r.status_code == 200 else []
 except Exception as e:
 	transactions = []
 	st.error(f"Error fetching transactions: {e}")
 
 try:
-	r = requests.get(f"{API_URL}/listings")
+	r = api.get(f"{API_URL}/listings")
 	listings = r.json() if r.status_code == 200 else []
 except Exception as e:
 	listings = []
@@ -1,13 +1,14 @@
 import streamlit as st
-import requests
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta, timezone
 from email.utils import parsedate_to_datetime
 from modules.nav import SideBarLinks
+from modules.api import api_session
 
 st.set_page_config(page_title="All Categories Stats", page_icon="📋", layout="wide")
 SideBarLinks(show_home=True)
+api = api_session()
 
 st.title("All Categories — Full Stats")
 st.write("Comprehensive category-level statistics and export")
@@ -49,14 +50,14 @@ def find_amount(rec):
 
 # Fetch data
 try:
-	r = requests.get(f"{API_URL}/listings")
+	r = api.get(f"{API_URL}/listings")
 	listings = r.json() if r.status_code == 200 else []
 except Exception as e:
 	listings = []
 	st.error(f"Error fetching listings: {e}")
 
 try:
-	r = requests.get(f"{API_URL}/transactions")
+	r = api.get(f"{API_URL}/transactions")
 	transactions = r.json() if r.status_code == 200 else []
 except Exception as e:
 	transactions = []
@@ -0,0 +1,485 @@
+"""
+Synthetic HuskyHub data generator.
+
+Produces statistically realistic rows for every table in
+mysql-init/01_create_tables_and_data.sql at a configurable scale
+(10k to 10M transactions) and writes them as tab-separated files
+plus a load.sql that bulk-loads them with LOAD DATA LOCAL INFILE.
+
+All ids are assigned explicitly starting at 1, so every foreign key
+points at a row generated in the same run. Shapes that matter for
+performance work are skewed the way a marketplace is: a few
+providers own many listings, popular listings take most bookings,
+ratings lean towards 4-5 stars and past bookings are mostly
+completed while future ones are requested or confirmed.
+
+Examples:
+    python benchmarks/datagen.py --transactions 100000 --out /tmp/huskyhub-100k
+    python benchmarks/datagen.py --transactions 10000000 --out /data/huskyhub-10m --seed 7
+
+    mysql --local-infile=1 -uroot -p HuskyHub < /tmp/huskyhub-100k/load.sql
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+
+# Column order of each generated file, matching the CREATE TABLE statements
+COLUMNS = {
+    "admin": ["adminId", "firstName", "lastName", "email", "accountStatus"],
+    "category": ["categoryId", "name", "type", "description"],
+    "student": ["stuId", "firstName", "lastName", "email", "phone", "bio", "campus", "major",
+                "joinDate", "accountStatus", "verifiedStatus", "profilePhotoUrl"],
+    "listing": ["listingId", "categoryId", "providerId", "title", "description", "price", "unit",
+                "imageUrl", "createDate", "lastUpdate", "listingStatus"],
+    "availability": ["availabilityId", "listId", "startTime", "endTime"],
+    "transact": ["transactId", "buyerId", "listId", "bookDate", "transactStatus", "fulfillmentDate",
+                 "paymentAmt", "platformFee", "agreementDetails"],
+    "review": ["reviewId", "listId", "reviewerId", "rating", "createDate", "reviewText"],
+    "report": ["reportId", "reportingStuId", "reportedStuId", "reportedListingId", "adminId",
+               "reportDate", "resolutionDate", "reason", "reportDetails"],
+    "suspension": ["suspensionId", "stuId", "reportId", "type", "startDate", "endDate"],
+    "admin_notes": ["noteId", "adminId", "reportId", "createDate", "content"],
+}
+
+# Parent tables first so the file order is also a valid FK order
+LOAD_ORDER = ["admin", "category", "student", "listing", "availability",
+              "transact", "review", "report", "suspension", "admin_notes"]
+
+# Seed scripts that compute columns from the loaded rows (rating counters,
+# rating_prior and scores); load.sql runs them after the bulk load
+SEED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "mysql-init")
+BACKFILL_SCRIPTS = ["12_Rating_Scores.sql"]
+
+FIRST_NAMES = ["Emma", "Jessica", "Timothy", "Chris", "Olivia", "Liam", "Ava", "Noah", "Mia", "Ethan",
+               "Sophia", "Lucas", "Isabella", "Mason", "Amelia", "Logan", "Harper", "Elijah", "Evelyn",
+               "Aiden", "Abigail", "James", "Emily", "Benjamin", "Ella", "Jacob", "Scarlett", "Henry",
+               "Grace", "Daniel", "Chloe", "Samuel", "Zoe", "Owen", "Nora", "Wyatt", "Lily", "Caleb",
+               "Hannah", "Ryan", "Priya", "Arjun", "Wei", "Mei", "Hiro", "Yuki", "Omar", "Layla",
+               "Diego", "Sofia"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez",
+              "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor",
+              "Moore", "Jackson", "Martin", "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez",
+              "Clark", "Ramirez", "Lewis", "Robinson", "Walker", "Young", "Allen", "King", "Wright",
+              "Scott", "Torres", "Nguyen", "Hill", "Flores", "Patel", "Kim", "Chen", "Wang", "Singh",
+              "Kumar", "Tanaka", "Khan", "Ali", "Silva"]
+CAMPUSES = ["bostn", "oakla", "londn", "seatl", "toron", "portl", "charl", "arlin"]
+CAMPUS_WEIGHTS = [0.55, 0.08, 0.08, 0.08, 0.07, 0.05, 0.05, 0.04]
+MAJORS = ["Computer Science", "Data Science", "Mechanical Engineering", "Biology", "Business",
+          "Economics", "Psychology", "Design", "Nursing", "Mathematics", "Physics", "Chemistry",
+          "Political Science", "Journalism", "Architecture", "Finance", "Marketing", "Music"]
+CATEGORY_NAMES = ["tutoring", "test prep", "moving", "photography", "graphic design", "resume review",
+                  "coding help", "music lessons", "language exchange", "cleaning", "furniture",
+                  "textbooks", "electronics", "bike repair", "hair styling", "fitness training",
+                  "pet sitting", "event planning", "videography", "printing"]
+CATEGORY_WEIGHTS = np.array([20, 16, 12, 6, 5, 5, 8, 4, 4, 3, 3, 6, 3, 2, 2, 3, 2, 1, 1, 1], dtype=float)
+ADJECTIVES = ["Affordable", "Quick", "Friendly", "Expert", "Weekend", "Last-minute", "Patient",
+              "Professional", "Same-day", "One-on-one", "Group", "Online", "In-person", "Budget"]
+UNITS = ["hour", "session", "item", "job", "day"]
+REPORT_REASONS = ["No-show for booked session", "Inappropriate messages", "Item not as described",
+                  "Payment dispute", "Spam listing", "Harassment", "Late cancellation",
+                  "Misleading qualifications"]
+LOREM = ("Lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore "
+         "et dolore magna aliqua ut enim ad minim veniam quis nostrud exercitation ullamco laboris").split()
+
+NULL = "\\N"
+SECONDS_PER_DAY = 86400
+
+
+def escape(value):
+    """Escape a text value for LOAD DATA's default FIELDS ESCAPED BY '\\'"""
+    if value is None:
+        return NULL
+    return (str(value).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+
+def format_datetimes(epoch_seconds):
+    """Vectorized epoch seconds -> 'YYYY-MM-DD HH:MM:SS' strings"""
+    text = np.datetime_as_string(epoch_seconds.astype("datetime64[s]"), unit="s")
+    return np.char.replace(text, "T", " ")
+
+
+def sentence(rng, words):
+    picked = rng.choice(LOREM, size=words)
+    text = " ".join(picked)
+    return text[0].upper() + text[1:] + "."
+
+
+class TableWriter:
+    """Buffered TSV writer, one file per table"""
+
+    def __init__(self, out_dir, table):
+        self.path = os.path.join(out_dir, f"{table}.tsv")
+        self.file = open(self.path, "w", encoding="utf-8", newline="\n")
+        self.rows = 0
+
+    def write_lines(self, lines):
+        if lines:
+            self.file.write("\n".join(lines))
+            self.file.write("\n")
+            self.rows += len(lines)
+
+    def close(self):
+        self.file.close()
+
+
+# ============================================
+# Generators
+# ============================================
+def generate_admins(rng, writer, count):
+    lines = []
+    for admin_id in range(1, count + 1):
+        first = FIRST_NAMES[rng.integers(len(FIRST_NAMES))]
+        last = LAST_NAMES[rng.integers(len(LAST_NAMES))]
+        status = "deleted" if rng.random() < 0.1 else "active"
+        lines.append(f"{admin_id}\t{first}\t{last}\t{first.lower()}.{last.lower()}{admin_id}@huskyhub.admin\t{status}")
+    writer.write_lines(lines)
+
+
+def generate_categories(rng, writer, count):
+    probabilities = CATEGORY_WEIGHTS / CATEGORY_WEIGHTS.sum()
+    names = rng.choice(len(CATEGORY_NAMES), size=count, p=probabilities)
+    lines = []
+    for category_id, name_index in enumerate(names, start=1):
+        kind = "product" if CATEGORY_NAMES[name_index] in ("furniture", "textbooks", "electronics", "printing") \
+            else ("product" if rng.random() < 0.15 else "service")
+        description = escape(sentence(rng, int(rng.integers(6, 30))))
+        lines.append(f"{category_id}\t{CATEGORY_NAMES[name_index]}\t{kind}\t{description}")
+    writer.write_lines(lines)
+    return names
+
+
+def plan_students(rng, count, now):
+    """Numeric student attributes; the file is written last once suspensions are known"""
+    join_offsets = rng.integers(0, 4 * 365 * SECONDS_PER_DAY, size=count)
+    return {
+        "join": now - join_offsets,
+        "verified": (rng.random(count) < 0.45).astype(np.int8),
+        "deleted": rng.random(count) < 0.01,
+    }
+
+
+def write_students(rng, writer, students, suspended_ids, chunk):
+    count = len(students["join"])
+    join_text = format_datetimes(students["join"])
+    suspended = np.zeros(count + 1, dtype=bool)
+    if len(suspended_ids):
+        suspended[suspended_ids] = True
+
+    campus_idx = rng.choice(len(CAMPUSES), size=count, p=CAMPUS_WEIGHTS)
+    first_idx = rng.integers(len(FIRST_NAMES), size=count)
+    last_idx = rng.integers(len(LAST_NAMES), size=count)
+    major_idx = rng.integers(len(MAJORS), size=count)
+    has_bio = rng.random(count) < 0.6
+    has_photo = rng.random(count) < 0.3
+    phones = rng.integers(2000000000, 9999999999, size=count)
+
+    for start in range(0, count, chunk):
+        lines = []
+        for i in range(start, min(count, start + chunk)):
+            stu_id = i + 1
+            first = FIRST_NAMES[first_idx[i]]
+            last = LAST_NAMES[last_idx[i]]
+            phone = str(phones[i])
+            if students["deleted"][i]:
+                status = "deleted"
+            elif suspended[stu_id]:
+                status = "suspended"
+            else:
+                status = "active"
+            bio = escape(f"{MAJORS[major_idx[i]]} student who likes helping out") if has_bio[i] else NULL
+            photo = f"https://img.huskyhub.dev/students/{stu_id}.jpg" if has_photo[i] else NULL
+            lines.append(
+                f"{stu_id}\t{first}\t{last}\t{first.lower()}.{last.lower()}{stu_id}@northeastern.edu\t"
+                f"{phone[:3]}-{phone[3:6]}-{phone[6:]}\t{bio}\t{CAMPUSES[campus_idx[i]]}\t{MAJORS[major_idx[i]]}\t"
+                f"{join_text[i]}\t{status}\t{students['verified'][i]}\t{photo}"
+            )
+        writer.write_lines(lines)
+
+
+def generate_listings(rng, writer, students, category_names, provider_share, now, chunk):
+    student_count = len(students["join"])
+    category_count = len(category_names)
+
+    # Zipf-distributed listing counts: most providers have one or two listings
+    providers = np.flatnonzero(rng.random(student_count) < provider_share) + 1
+    per_provider = np.minimum(rng.zipf(2.2, size=len(providers)), 25)
+    provider_ids = np.repeat(providers, per_provider)
+    rng.shuffle(provider_ids)
+    count = len(provider_ids)
+
+    category_popularity = rng.pareto(1.2, size=category_count) + 1
+    category_ids = rng.choice(category_count, size=count, p=category_popularity / category_popularity.sum()) + 1
+
+    price = np.clip(np.round(rng.lognormal(3.3, 0.7, size=count), 2), 5, 999)
+    joins = students["join"][provider_ids - 1]
+    create = joins + (rng.random(count) * np.maximum(now - joins, 1)).astype(np.int64)
+    update = create + (rng.random(count) * np.maximum(now - create, 1)).astype(np.int64)
+    status_idx = rng.choice(4, size=count, p=[0.70, 0.15, 0.10, 0.05])
+    statuses = np.array(["active", "inactive", "removed", "draft"])[status_idx]
+    unit_idx = rng.integers(len(UNITS), size=count)
+    adjective_idx = rng.integers(len(ADJECTIVES), size=count)
+    has_image = rng.random(count) < 0.4
+
+    create_text = format_datetimes(create)
+    update_text = format_datetimes(update)
+
+    for start in range(0, count, chunk):
+        lines = []
+        for i in range(start, min(count, start + chunk)):
+            listing_id = i + 1
+            category_name = CATEGORY_NAMES[category_names[category_ids[i] - 1]]
+            title = f"{ADJECTIVES[adjective_idx[i]]} {category_name}"
+            description = escape(sentence(rng, int(rng.integers(8, 40))))
+            image = f"https://img.huskyhub.dev/listings/{listing_id}.jpg" if has_image[i] else NULL
+            lines.append(
+                f"{listing_id}\t{category_ids[i]}\t{provider_ids[i]}\t{title}\t{description}\t{price[i]:.2f}\t"
+                f"{UNITS[unit_idx[i]]}\t{image}\t{create_text[i]}\t{update_text[i]}\t{statuses[i]}"
+            )
+        writer.write_lines(lines)
+
+    return {
+        "provider": provider_ids,
+        "price": price,
+        "create": create,
+        "active": statuses == "active",
+    }
+
+
+def generate_availability(rng, writer, listings, slots_per_listing, now, chunk):
+    active_ids = np.flatnonzero(listings["active"]) + 1
+    slot_counts = rng.poisson(slots_per_listing, size=len(active_ids))
+    list_ids = np.repeat(active_ids, slot_counts)
+    count = len(list_ids)
+
+    # Slots for one listing are consecutive, non-overlapping blocks so the
+    # (listId, startTime, endTime) unique key always holds
+    position = np.arange(count) - np.repeat(np.cumsum(slot_counts) - slot_counts, slot_counts)
+    base = now - 14 * SECONDS_PER_DAY + rng.integers(0, 7 * SECONDS_PER_DAY, size=len(active_ids))
+    base = (base // 1800) * 1800
+    start = np.repeat(base, slot_counts) + position * (SECONDS_PER_DAY // 2)
+    end = start + rng.choice([3600, 5400, 7200, 10800], size=count)
+
+    start_text = format_datetimes(start)
+    end_text = format_datetimes(end)
+    for offset in range(0, count, chunk):
+        stop = min(count, offset + chunk)
+        writer.write_lines([
+            f"{i + 1}\t{list_ids[i]}\t{start_text[i]}\t{end_text[i]}" for i in range(offset, stop)
+        ])
+
+
+def generate_transactions(rng, writers, listings, student_count, admin_count, total, now, chunk):
+    """Stream transactions and derive reviews, reports, suspensions and admin notes"""
+    listing_count = len(listings["provider"])
+    popularity = rng.pareto(1.1, size=listing_count) + 0.05
+    popularity /= popularity.sum()
+
+    review_id = 0
+    report_id = 0
+    suspension_id = 0
+    note_id = 0
+    suspended_ids = []
+    history_start = now - 2 * 365 * SECONDS_PER_DAY
+    horizon = now + 60 * SECONDS_PER_DAY
+
+    for offset in range(0, total, chunk):
+        size = min(chunk, total - offset)
+        ids = np.arange(offset + 1, offset + size + 1)
+
+        list_idx = rng.choice(listing_count, size=size, p=popularity)
+        list_ids = list_idx + 1
+        providers = listings["provider"][list_idx]
+        buyers = rng.integers(1, student_count + 1, size=size)
+        # Nobody books their own listing
+        same = buyers == providers
+        buyers[same] = buyers[same] % student_count + 1
+
+        earliest = np.maximum(listings["create"][list_idx], history_start)
+        book = earliest + (rng.random(size) * np.maximum(horizon - earliest, 1)).astype(np.int64)
+        book = (book // 900) * 900
+
+        future = book > now
+        status = np.where(
+            future,
+            np.array(["requested", "confirmed", "cancelled"])[rng.choice(3, size=size, p=[0.40, 0.52, 0.08])],
+            np.array(["completed", "cancelled", "confirmed"])[rng.choice(3, size=size, p=[0.82, 0.14, 0.04])],
+        )
+        completed = status == "completed"
+        fulfillment = book + rng.integers(3600, 3 * SECONDS_PER_DAY, size=size)
+        hours = rng.choice([1, 1, 1, 2, 2, 3], size=size)
+        payment = np.minimum(np.round(listings["price"][list_idx] * hours, 2), 99999.99)
+        fee = np.round(payment * 0.10, 2)
+        has_notes = rng.random(size) < 0.25
+
+        book_text = format_datetimes(book)
+        fulfillment_text = format_datetimes(fulfillment)
+
+        lines = []
+        for i in range(size):
+            details = escape(f"Meet at {CAMPUSES[i % len(CAMPUSES)]} campus, bring materials") if has_notes[i] else NULL
+            lines.append(
+                f"{ids[i]}\t{buyers[i]}\t{list_ids[i]}\t{book_text[i]}\t{status[i]}\t"
+                f"{fulfillment_text[i] if completed[i] else NULL}\t{payment[i]:.2f}\t{fee[i]:.2f}\t{details}"
+            )
+        writers["transact"].write_lines(lines)
+
+        # About a third of completed bookings get a review from the buyer
+        reviewed = np.flatnonzero(completed & (rng.random(size) < 0.35))
+        ratings = rng.choice([1, 2, 3, 4, 5], size=len(reviewed), p=[0.04, 0.06, 0.12, 0.33, 0.45])
+        review_at = fulfillment[reviewed] + rng.integers(0, 14 * SECONDS_PER_DAY, size=len(reviewed))
+        review_at = np.minimum(review_at, now)
+        review_text = format_datetimes(review_at)
+        has_text = rng.random(len(reviewed)) < 0.7
+        lines = []
+        for j, i in enumerate(reviewed):
+            review_id += 1
+            text = escape(sentence(rng, int(rng.integers(5, 25)))) if has_text[j] else NULL
+            lines.append(f"{review_id}\t{list_ids[i]}\t{buyers[i]}\t{ratings[j]}\t{review_text[j]}\t{text}")
+        writers["review"].write_lines(lines)
+
+        # A small share of past bookings end in a report against the provider
+        reported = np.flatnonzero(~future & (rng.random(size) < 0.004))
+        lines = []
+        suspension_lines = []
+        note_lines = []
+        for i in reported:
+            report_id += 1
+            report_at = int(min(book[i] + rng.integers(3600, 10 * SECONDS_PER_DAY), now))
+            resolution_at = report_at + int(rng.integers(3600, 20 * SECONDS_PER_DAY))
+            resolved = resolution_at < now and rng.random() < 0.6
+            resolution = format_datetimes(np.array([resolution_at]))[0] if resolved else NULL
+            admin_id = int(rng.integers(1, admin_count + 1))
+            reason = REPORT_REASONS[rng.integers(len(REPORT_REASONS))]
+            lines.append(
+                f"{report_id}\t{buyers[i]}\t{providers[i]}\t{list_ids[i]}\t{admin_id}\t"
+                f"{format_datetimes(np.array([report_at]))[0]}\t{resolution}\t{reason}\t"
+                f"{escape(sentence(rng, int(rng.integers(10, 30))))}"
+            )
+
+            for _ in range(int(rng.integers(0, 4))):
+                note_id += 1
+                note_at = min(report_at + int(rng.integers(600, 5 * SECONDS_PER_DAY)), now)
+                note_at = format_datetimes(np.array([note_at]))[0]
+                note_lines.append(
+                    f"{note_id}\t{admin_id}\t{report_id}\t{note_at}\t{escape(sentence(rng, int(rng.integers(6, 20))))}"
+                )
+
+            if resolved and rng.random() < 0.25:
+                suspension_id += 1
+                start_at = min(resolution_at, now)
+                if rng.random() < 0.85:
+                    end_at = start_at + int(rng.integers(7, 90)) * SECONDS_PER_DAY
+                    end_text = format_datetimes(np.array([end_at]))[0]
+                    kind = "temp"
+                    if end_at > now:
+                        suspended_ids.append(int(providers[i]))
+                else:
+                    end_text = NULL
+                    kind = "perm"
+                    suspended_ids.append(int(providers[i]))
+                suspension_lines.append(
+                    f"{suspension_id}\t{providers[i]}\t{report_id}\t{kind}\t"
+                    f"{format_datetimes(np.array([start_at]))[0]}\t{end_text}"
+                )
+
+        writers["report"].write_lines(lines)
+        writers["suspension"].write_lines(suspension_lines)
+        writers["admin_notes"].write_lines(note_lines)
+
+        print(f"  transactions {offset + size:,}/{total:,}", file=sys.stderr)
+
+    return np.array(sorted(set(suspended_ids)), dtype=np.int64)
+
+
+def write_load_script(out_dir, counts):
+    """load.sql: replace the database contents with the generated files"""
+    lines = [
+        "-- Generated by benchmarks/datagen.py",
+        "-- Run with: mysql --local-infile=1 -uroot -p HuskyHub < load.sql (from this directory)",
+        "USE HuskyHub;",
+        "SET FOREIGN_KEY_CHECKS = 0;",
+        "SET UNIQUE_CHECKS = 0;",
+        "SET autocommit = 0;",
+    ]
+    for table in reversed(LOAD_ORDER):
+        lines.append(f"TRUNCATE TABLE {table};")
+    for table in LOAD_ORDER:
+        lines.append(
+            f"LOAD DATA LOCAL INFILE '{table}.tsv' INTO TABLE {table} "
+            f"CHARACTER SET utf8mb4 FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' "
+            f"({', '.join(COLUMNS[table])});"
+        )
+        lines.append("COMMIT;")
+    for script in BACKFILL_SCRIPTS:
+        with open(os.path.join(SEED_DIR, script), encoding="utf-8") as f:
+            sql = f.read()
+        lines.append(f"-- {script}")
+        lines += [line for line in sql.splitlines() if not line.strip().upper().startswith("USE ")]
+        lines.append("COMMIT;")
+    lines += [
+        "SET UNIQUE_CHECKS = 1;",
+        "SET FOREIGN_KEY_CHECKS = 1;",
+        "SET autocommit = 1;",
+    ]
+    for table in LOAD_ORDER:
+        lines.append(f"ANALYZE TABLE {table};")
+
+    with open(os.path.join(out_dir, "load.sql"), "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump({"tables": LOAD_ORDER, "columns": COLUMNS, "rows": counts}, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a scaled HuskyHub dataset")
+    parser.add_argument("--transactions", type=int, default=100000, help="transact rows (10k - 10M)")
+    parser.add_argument("--students", type=int, help="default: transactions / 20, at least 500")
+    parser.add_argument("--categories", type=int, default=1000)
+    parser.add_argument("--admins", type=int, default=25)
+    parser.add_argument("--provider-share", type=float, default=0.3, help="share of students with listings")
+    parser.add_argument("--slots-per-listing", type=float, default=8, help="mean availability slots per active listing")
+    parser.add_argument("--chunk", type=int, default=200000, help="rows generated per batch")
+    parser.add_argument("--seed", type=int, default=3200)
+    parser.add_argument("--out", required=True, help="output directory")
+    args = parser.parse_args(argv)
+
+    students_total = args.students or max(500, args.transactions // 20)
+    rng = np.random.default_rng(args.seed)
+    now = int(datetime.now().replace(microsecond=0).timestamp())
+    os.makedirs(args.out, exist_ok=True)
+    writers = {table: TableWriter(args.out, table) for table in LOAD_ORDER}
+    started = time.monotonic()
+
+    try:
+        generate_admins(rng, writers["admin"], args.admins)
+        category_names = generate_categories(rng, writers["category"], args.categories)
+        students = plan_students(rng, students_total, now)
+        listings = generate_listings(rng, writers["listing"], students, category_names,
+                                     args.provider_share, now, args.chunk)
+        generate_availability(rng, writers["availability"], listings, args.slots_per_listing, now, args.chunk)
+        suspended_ids = generate_transactions(rng, writers, listings, students_total, args.admins,
+                                              args.transactions, now, args.chunk)
+        write_students(rng, writers["student"], students, suspended_ids, args.chunk)
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    counts = {table: writer.rows for table, writer in writers.items()}
+    write_load_script(args.out, counts)
+
+    for table in LOAD_ORDER:
+        print(f"{table:14} {counts[table]:>12,}")
+    print(f"generated in {time.monotonic() - started:.1f}s -> {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
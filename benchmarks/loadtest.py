@@ -0,0 +1,468 @@
+"""
+HuskyHub API load test.
+
+Drives a weighted mix of persona traffic (Emma browses and books,
+Jessica manages availability and requests, Timothy triages reports,
+Chris loads dashboards) against a locally running API, then reports
+throughput, p50/p95/p99 latency and error rate per endpoint.
+
+Runs are reproducible: every worker draws from a random.Random seeded
+from --seed, so the same seed replays the same request sequence
+against the same data.
+
+Examples:
+    python benchmarks/loadtest.py --duration 60 --workers 16
+    python benchmarks/loadtest.py --save-baseline benchmarks/baselines/local.json
+    python benchmarks/loadtest.py --baseline benchmarks/baselines/local.json
+    python benchmarks/loadtest.py --mix suspension-contention --workers 8
+"""
+import argparse
+import http.client
+import json
+import math
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlencode, urlsplit
+
+
+# ============================================
+# HTTP client (one keep-alive connection per worker)
+# ============================================
+class ApiClient:
+    def __init__(self, base_url, timeout):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self.conn = None
+
+    def request(self, method, path, params=None, body=None, headers=None):
+        if params:
+            path = f"{path}?{urlencode(params)}"
+        payload = json.dumps(body) if body is not None else None
+        headers = dict(headers or {})
+        if payload:
+            headers["Content-Type"] = "application/json"
+
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.conn.request(method, path, body=payload, headers=headers)
+                response = self.conn.getresponse()
+                data = response.read()
+                return response.status, data
+            except (http.client.HTTPException, ConnectionError, OSError):
+                # Reconnect once if the server closed the keep-alive socket
+                self.conn.close()
+                self.conn = None
+                if attempt == 1:
+                    raise
+
+    def get_json(self, path, params=None):
+        status, data = self.request("GET", path, params)
+        if status != 200:
+            return None
+        return json.loads(data)
+
+
+# ============================================
+# Id pools discovered from the target database
+# ============================================
+def discover_pools(client):
+    """Collect real ids so generated traffic hits existing rows"""
+    listings = client.get_json("/listings/", {"status": "active"}) or []
+    students = client.get_json("/students/") or []
+    reports = client.get_json("/admin/reports") or []
+    categories = client.get_json("/listings/categories") or []
+
+    pools = {
+        "listings": [row["listingId"] for row in listings] or [1],
+        "providers": sorted({row["provider_id"] for row in listings}) or [1],
+        "students": [row["stuId"] for row in students if row.get("accountStatus") == "active"] or [1],
+        "reports": [row["reportId"] for row in reports] or [1],
+        "categories": sorted({row["name"] for row in categories}) or ["tutoring"],
+    }
+    return pools
+
+
+# ============================================
+# Persona actions
+# Each returns (label, method, path, params, body)
+# ============================================
+def emma_browse(rng, pools):
+    params = {"status": "active"}
+    if rng.random() < 0.5:
+        params["category"] = rng.choice(pools["categories"])
+    return "listings.browse", "GET", "/listings/", params, None
+
+
+def emma_view_listing(rng, pools):
+    return "listings.detail", "GET", f"/listings/{rng.choice(pools['listings'])}", None, None
+
+
+def emma_view_availability(rng, pools):
+    listing_id = rng.choice(pools["listings"])
+    return "listings.availability", "GET", f"/listings/{listing_id}/availability", None, None
+
+
+def emma_my_bookings(rng, pools):
+    params = {"buyerId": rng.choice(pools["students"])}
+    return "transactions.by_buyer", "GET", "/transactions/", params, None
+
+
+def emma_book(rng, pools):
+    book_date = datetime.now() + timedelta(days=rng.randint(1, 60), hours=rng.randint(0, 12))
+    body = {
+        "buyerId": rng.choice(pools["students"]),
+        "listId": rng.choice(pools["listings"]),
+        "bookDate": book_date.strftime("%Y-%m-%d %H:00:00"),
+        "paymentAmt": round(rng.uniform(10, 150), 2),
+        "agreementDetails": "load test booking",
+    }
+    return "transactions.create", "POST", "/transactions/", None, body
+
+
+def jessica_dashboard(rng, pools):
+    return "students.metrics", "GET", f"/students/{rng.choice(pools['providers'])}/metrics", None, None
+
+
+def jessica_pending(rng, pools):
+    params = {"providerId": rng.choice(pools["providers"]), "status": "requested"}
+    return "transactions.pending", "GET", "/transactions/", params, None
+
+
+def jessica_add_availability(rng, pools):
+    start = datetime.now() + timedelta(days=rng.randint(1, 90), hours=rng.randint(8, 18))
+    # Random minute offset keeps the (listId, startTime, endTime) key unique
+    start = start.replace(minute=rng.randint(0, 59), second=rng.randint(0, 59), microsecond=0)
+    end = start + timedelta(hours=1)
+    body = {"slots": [{
+        "startTime": start.strftime("%Y-%m-%d %H:%M:%S"),
+        "endTime": end.strftime("%Y-%m-%d %H:%M:%S"),
+    }]}
+    listing_id = rng.choice(pools["listings"])
+    return "listings.add_availability", "POST", f"/listings/{listing_id}/availability", None, body
+
+
+def jessica_reviews(rng, pools):
+    params = {"providerId": rng.choice(pools["providers"])}
+    return "reviews.by_provider", "GET", "/reviews/reviews", params, None
+
+
+def timothy_reports(rng, pools):
+    return "admin.reports", "GET", "/admin/reports", None, None
+
+
+def timothy_report_detail(rng, pools):
+    return "admin.report_detail", "GET", f"/admin/reports/{rng.choice(pools['reports'])}", None, None
+
+
+def timothy_suspensions(rng, pools):
+    return "admin.suspensions", "GET", "/admin/suspensions", None, None
+
+
+def timothy_users(rng, pools):
+    return "students.list", "GET", "/students/", {"sortBy": "status"}, None
+
+
+def chris_provider_metrics(rng, pools):
+    params = {"sortBy": rng.choice(["rating", "transactions"])}
+    return "students.provider_metrics", "GET", "/students/provider/metrics", params, None
+
+
+def chris_consumer_metrics(rng, pools):
+    return "students.consumer_metrics", "GET", "/students/consumer/metrics", None, None
+
+
+def chris_completion(rng, pools):
+    return "transactions.completion", "GET", "/transactions/completion", None, None
+
+
+def chris_all_transactions(rng, pools):
+    return "transactions.all", "GET", "/transactions/", None, None
+
+
+# persona -> (share of traffic, [(weight, action, writes)])
+PERSONAS = {
+    "emma": (0.50, [
+        (40, emma_browse, False),
+        (25, emma_view_listing, False),
+        (15, emma_view_availability, False),
+        (15, emma_my_bookings, False),
+        (5, emma_book, True),
+    ]),
+    "jessica": (0.25, [
+        (35, jessica_dashboard, False),
+        (35, jessica_pending, False),
+        (20, jessica_reviews, False),
+        (10, jessica_add_availability, True),
+    ]),
+    "timothy": (0.15, [
+        (40, timothy_reports, False),
+        (25, timothy_report_detail, False),
+        (15, timothy_suspensions, False),
+        (20, timothy_users, False),
+    ]),
+    "chris": (0.10, [
+        (30, chris_provider_metrics, False),
+        (20, chris_consumer_metrics, False),
+        (20, chris_completion, False),
+        (30, chris_all_transactions, False),
+    ]),
+}
+
+
+# ============================================
+# Suspension contention mix
+# Concurrent suspensions of providers that share bookings, used to
+# compare lock-wait time of the suspension cascade between builds.
+# WARNING: suspends and reactivates real students in the target DB.
+# ============================================
+def suspend_single(rng, pools):
+    body = {"stuId": rng.choice(pools["providers"]), "type": "temp",
+            "endDate": (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")}
+    return "admin.suspend", "POST", "/admin/suspensions", None, body
+
+
+def suspend_bulk(rng, pools):
+    stu_ids = rng.sample(pools["providers"], min(5, len(pools["providers"])))
+    body = {"stuIds": stu_ids, "type": "temp",
+            "endDate": (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")}
+    return "admin.suspend_bulk", "POST", "/admin/suspensions/bulk", None, body
+
+
+def unsuspend(rng, pools):
+    stu_id = rng.choice(pools["providers"])
+    return "students.unsuspend", "PUT", f"/students/{stu_id}/unsuspend", None, None
+
+
+MIXES = {
+    "personas": PERSONAS,
+    "suspension-contention": {
+        "timothy": (1.0, [
+            (45, suspend_single, True),
+            (15, suspend_bulk, True),
+            (40, unsuspend, True),
+        ]),
+    },
+}
+
+
+# ============================================
+# Runner
+# ============================================
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}
+
+    def add(self, label, elapsed_ms, ok):
+        with self.lock:
+            entry = self.samples.setdefault(label, {"latencies": [], "errors": 0})
+            entry["latencies"].append(elapsed_ms)
+            if not ok:
+                entry["errors"] += 1
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    # nearest-rank method
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def build_plan(mix, read_only):
+    personas = []
+    for name, (share, actions) in mix.items():
+        allowed = [(w, a) for w, a, writes in actions if not (read_only and writes)]
+        if allowed:
+            personas.append((name, share, allowed))
+    if not personas:
+        raise SystemExit("The selected mix has no actions left with --read-only")
+    return personas
+
+
+def worker(worker_id, args, pools, plan, recorder, deadline, warmup_until, counter):
+    rng = random.Random(f"{args.seed}-{worker_id}")
+    client = ApiClient(args.url, args.timeout)
+    persona_weights = [share for _, share, _ in plan]
+
+    while time.monotonic() < deadline:
+        if args.requests and counter.next() > args.requests:
+            break
+
+        _, _, actions = rng.choices(plan, weights=persona_weights)[0]
+        action = rng.choices([a for _, a in actions], weights=[w for w, _ in actions])[0]
+        label, method, path, params, body = action(rng, pools)
+
+        started = time.perf_counter()
+        try:
+            status, _ = client.request(method, path, params, body)
+            ok = status < 400
+        except Exception:
+            ok = False
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        if time.monotonic() >= warmup_until:
+            recorder.add(label, elapsed_ms, ok)
+
+        if args.think_ms:
+            time.sleep(rng.uniform(0, args.think_ms) / 1000.0)
+
+
+class Counter:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.value = 0
+
+    def next(self):
+        with self.lock:
+            self.value += 1
+            return self.value
+
+
+def summarize(recorder, measured_seconds):
+    endpoints = {}
+    all_latencies = []
+    total_errors = 0
+
+    for label, entry in sorted(recorder.samples.items()):
+        latencies = sorted(entry["latencies"])
+        all_latencies.extend(latencies)
+        total_errors += entry["errors"]
+        endpoints[label] = {
+            "requests": len(latencies),
+            "throughput_rps": round(len(latencies) / measured_seconds, 2),
+            "error_rate": round(entry["errors"] / len(latencies), 4),
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "max_ms": round(latencies[-1], 2),
+        }
+
+    all_latencies.sort()
+    overall = {
+        "requests": len(all_latencies),
+        "throughput_rps": round(len(all_latencies) / measured_seconds, 2) if measured_seconds else 0,
+        "error_rate": round(total_errors / len(all_latencies), 4) if all_latencies else 0,
+        "p50_ms": round(percentile(all_latencies, 50), 2),
+        "p95_ms": round(percentile(all_latencies, 95), 2),
+        "p99_ms": round(percentile(all_latencies, 99), 2),
+    }
+    return overall, endpoints
+
+
+def compare(result, baseline, tolerance):
+    """Return a list of regressions beyond tolerance versus the baseline run"""
+    regressions = []
+
+    def check(name, current, previous):
+        if previous is None or current is None:
+            return
+        if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f'{name}: p95 {previous["p95_ms"]} -> {current["p95_ms"]} ms')
+        if previous["throughput_rps"] and current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(f'{name}: throughput {previous["throughput_rps"]} -> {current["throughput_rps"]} rps')
+        if current["error_rate"] > previous["error_rate"] + 0.01:
+            regressions.append(f'{name}: error rate {previous["error_rate"]} -> {current["error_rate"]}')
+
+    check("overall", result["overall"], baseline.get("overall"))
+    for label, stats in result["endpoints"].items():
+        check(label, stats, baseline.get("endpoints", {}).get(label))
+    return regressions
+
+
+def print_report(result, baseline=None):
+    overall = result["overall"]
+    print(f'\n{"endpoint":32} {"reqs":>7} {"rps":>8} {"err%":>6} {"p50":>8} {"p95":>8} {"p99":>8}')
+    rows = list(result["endpoints"].items()) + [("OVERALL", overall)]
+    for label, stats in rows:
+        line = (f'{label:32} {stats["requests"]:>7} {stats["throughput_rps"]:>8} '
+                f'{stats["error_rate"] * 100:>6.2f} {stats["p50_ms"]:>8} {stats["p95_ms"]:>8} {stats["p99_ms"]:>8}')
+        if baseline:
+            previous = baseline.get("overall") if label == "OVERALL" else baseline.get("endpoints", {}).get(label)
+            if previous and previous["p95_ms"]:
+                delta = (stats["p95_ms"] - previous["p95_ms"]) / previous["p95_ms"] * 100
+                line += f'  p95 {delta:+.1f}%'
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HuskyHub persona load test")
+    parser.add_argument("--url", default="http://localhost:4000", help="API base URL")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="personas")
+    parser.add_argument("--workers", type=int, default=8, help="concurrent simulated clients")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to run after warmup")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds of unrecorded traffic first")
+    parser.add_argument("--requests", type=int, default=0, help="stop after this many requests (0 = no cap)")
+    parser.add_argument("--think-ms", type=float, default=0, help="max random pause between requests")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", default="huskyhub", help="seed for the request sequence")
+    parser.add_argument("--read-only", action="store_true", help="skip booking/availability writes")
+    parser.add_argument("--out", help="write the JSON result here")
+    parser.add_argument("--baseline", help="compare against a stored JSON result")
+    parser.add_argument("--save-baseline", help="store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed regression (fraction)")
+    args = parser.parse_args(argv)
+
+    pools = discover_pools(ApiClient(args.url, args.timeout))
+    plan = build_plan(MIXES[args.mix], args.read_only)
+    recorder = Recorder()
+    counter = Counter()
+
+    started = time.monotonic()
+    warmup_until = started + args.warmup
+    deadline = warmup_until + args.duration
+
+    threads = [
+        threading.Thread(target=worker, args=(i, args, pools, plan, recorder, deadline, warmup_until, counter))
+        for i in range(args.workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    measured_seconds = max(0.001, time.monotonic() - max(warmup_until, started))
+    overall, endpoints = summarize(recorder, measured_seconds)
+    result = {
+        "run_at": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "url": args.url, "mix": args.mix, "workers": args.workers,
+            "duration": args.duration, "warmup": args.warmup, "seed": args.seed,
+            "read_only": args.read_only,
+        },
+        "overall": overall,
+        "endpoints": endpoints,
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print_report(result, baseline)
+
+    for path in (args.out, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(result, f, indent=2)
+
+    if baseline:
+        regressions = compare(result, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions versus baseline:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print("\nNo regressions versus baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
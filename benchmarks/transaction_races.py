@@ -0,0 +1,229 @@
+"""
+Concurrency checks for the booking state machine.
+
+Each round creates a fresh booking, then releases a buyer client and a
+provider client at the same instant (threading.Barrier) with
+conflicting requests. Afterwards it re-reads the booking and checks
+that the outcome is one a serial order of the successful requests
+could have produced:
+
+    accept-vs-decline    PUT confirmed  vs  PUT cancelled       (from requested)
+    complete-vs-cancel   PUT /complete  vs  DELETE              (from confirmed)
+    double-cancel        DELETE         vs  DELETE              (from requested)
+    stale-version        PUT confirmed  vs  PUT reschedule, both sending the version read first
+    bulk-vs-cancel       POST /bulk-status confirmed  vs  DELETE
+
+For every scenario the booking's version must equal the number of
+successful requests (no lost updates), every rejected request must be a
+409, and the final status must be reachable from the successful ones.
+
+It creates and changes bookings, so only point it at a disposable
+database.
+
+Examples:
+    python benchmarks/transaction_races.py --rounds 50
+    python benchmarks/transaction_races.py --scenario complete-vs-cancel --rounds 200
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+from datetime import datetime, timedelta
+
+from loadtest import ApiClient, discover_pools
+
+
+# ============================================
+# Scenarios
+# Each returns (setup statuses, [(client, method, path, body, headers)], check)
+# ============================================
+def _put(path, body, headers=None):
+    return ("PUT", path, body, headers)
+
+
+def accept_vs_decline(transact_id, version):
+    requests_ = [
+        ("provider",) + _put(f"/transactions/{transact_id}", {"transactStatus": "confirmed"}),
+        ("provider",) + _put(f"/transactions/{transact_id}", {"transactStatus": "cancelled"}),
+    ]
+
+    def check(codes, final):
+        # decline after accept is legal (confirmed -> cancelled), accept after decline is not
+        if codes == [200, 200]:
+            return final == "cancelled"
+        return codes.count(200) == 1 and final == ("confirmed" if codes[0] == 200 else "cancelled")
+    return [], requests_, check
+
+
+def complete_vs_cancel(transact_id, version):
+    requests_ = [
+        ("provider",) + _put(f"/transactions/{transact_id}/complete", None),
+        ("buyer", "DELETE", f"/transactions/{transact_id}", None, None),
+    ]
+
+    def check(codes, final):
+        # completed and cancelled are both terminal: exactly one may win
+        return codes.count(200) == 1 and final == ("completed" if codes[0] == 200 else "cancelled")
+    return ["confirmed"], requests_, check
+
+
+def double_cancel(transact_id, version):
+    requests_ = [
+        ("buyer", "DELETE", f"/transactions/{transact_id}", None, None),
+        ("buyer", "DELETE", f"/transactions/{transact_id}", None, None),
+    ]
+
+    def check(codes, final):
+        return codes.count(200) == 1 and final == "cancelled"
+    return [], requests_, check
+
+
+def stale_version(transact_id, version):
+    new_date = (datetime.now() + timedelta(days=30)).strftime("%Y-%m-%d %H:00:00")
+    requests_ = [
+        ("provider",) + _put(f"/transactions/{transact_id}",
+                             {"transactStatus": "confirmed", "version": version}),
+        ("buyer",) + _put(f"/transactions/{transact_id}",
+                          {"transactStatus": "requested", "bookDate": new_date},
+                          {"If-Match": f'"{version}"'}),
+    ]
+
+    def check(codes, final):
+        # both were based on the same version, so only one can apply
+        return codes.count(200) == 1 and final == ("confirmed" if codes[0] == 200 else "requested")
+    return [], requests_, check
+
+
+def bulk_vs_cancel(transact_id, version):
+    requests_ = [
+        ("provider", "POST", "/transactions/bulk-status",
+         {"updates": [{"transactId": transact_id, "transactStatus": "confirmed"}], "allOrNothing": True},
+         None),
+        ("buyer", "DELETE", f"/transactions/{transact_id}", None, None),
+    ]
+
+    def check(codes, final):
+        if codes == [200, 200]:
+            return final == "cancelled"
+        return codes.count(200) == 1 and final == ("confirmed" if codes[0] == 200 else "cancelled")
+    return [], requests_, check
+
+
+SCENARIOS = {
+    "accept-vs-decline": accept_vs_decline,
+    "complete-vs-cancel": complete_vs_cancel,
+    "double-cancel": double_cancel,
+    "stale-version": stale_version,
+    "bulk-vs-cancel": bulk_vs_cancel,
+}
+
+
+# ============================================
+# Round execution
+# ============================================
+def create_booking(client, rng, pools):
+    book_date = datetime.now() + timedelta(days=rng.randint(1, 60))
+    status, data = client.request("POST", "/transactions/", body={
+        "buyerId": rng.choice(pools["students"]),
+        "listId": rng.choice(pools["listings"]),
+        "bookDate": book_date.strftime("%Y-%m-%d %H:00:00"),
+        "paymentAmt": 25,
+        "agreementDetails": "transaction_races.py",
+    })
+    if status != 201:
+        raise RuntimeError(f"Could not create booking: {status} {data[:200]}")
+    return json.loads(data)["transactId"]
+
+
+def read_booking(client, transact_id):
+    detail = client.get_json(f"/transactions/{transact_id}")
+    if detail is None:
+        raise RuntimeError(f"Could not read booking {transact_id}")
+    return detail["transaction"]["transactStatus"], detail["transaction"]["version"]
+
+
+def fire(clients, requests_):
+    """Send the requests at the same time, one client each; returns their status codes"""
+    barrier = threading.Barrier(len(requests_))
+    codes = [None] * len(requests_)
+
+    def run(i, who, method, path, body, headers):
+        barrier.wait()
+        try:
+            codes[i], _ = clients[i].request(method, path, body=body, headers=headers)
+        except Exception as e:
+            codes[i] = f"error: {e}"
+
+    threads = [threading.Thread(target=run, args=(i,) + req) for i, req in enumerate(requests_)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return codes
+
+
+def run_round(name, setup_client, clients, rng, pools):
+    """One race on a fresh booking; returns (ok, description)"""
+    transact_id = create_booking(setup_client, rng, pools)
+    _, version = read_booking(setup_client, transact_id)
+
+    setup, requests_, check = SCENARIOS[name](transact_id, version)
+    for status in setup:
+        code, data = setup_client.request("PUT", f"/transactions/{transact_id}",
+                                          body={"transactStatus": status})
+        if code != 200:
+            raise RuntimeError(f"Setup {status} failed for {transact_id}: {code} {data[:200]}")
+    if setup:
+        _, version = read_booking(setup_client, transact_id)
+        setup, requests_, check = SCENARIOS[name](transact_id, version)
+
+    codes = fire(clients, requests_)
+    final, final_version = read_booking(setup_client, transact_id)
+
+    successes = codes.count(200)
+    problems = []
+    if any(code not in (200, 409) for code in codes):
+        problems.append("unexpected status code")
+    if final_version != version + successes:
+        problems.append(f"version {final_version} after {successes} successful writes from {version}")
+    if not check(codes, final):
+        problems.append("final status not reachable from the successful requests")
+
+    description = f"{name} #{transact_id}: {codes} -> {final} v{final_version}"
+    return not problems, description + (f"  [{'; '.join(problems)}]" if problems else "")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Race buyer and provider requests on bookings")
+    parser.add_argument("--url", default="http://localhost:4000", help="API base URL")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), action="append",
+                        help="scenario to run (repeatable; default all)")
+    parser.add_argument("--rounds", type=int, default=20, help="rounds per scenario")
+    parser.add_argument("--timeout", type=float, default=10.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--verbose", action="store_true", help="print every round")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    setup_client = ApiClient(args.url, args.timeout)
+    clients = [ApiClient(args.url, args.timeout) for _ in range(2)]
+    pools = discover_pools(setup_client)
+
+    failures = 0
+    for name in args.scenario or sorted(SCENARIOS):
+        outcomes = {}
+        for _ in range(args.rounds):
+            ok, description = run_round(name, setup_client, clients, rng, pools)
+            if args.verbose or not ok:
+                print(("ok    " if ok else "FAIL  ") + description)
+            failures += not ok
+            key = "ok" if ok else "fail"
+            outcomes[key] = outcomes.get(key, 0) + 1
+        print(f"{name:20} {outcomes.get('ok', 0):>5} ok  {outcomes.get('fail', 0):>5} failed")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -21,8 +21,12 @@ CREATE TABLE student(
    accountStatus ENUM('active','suspended','deleted') NOT NULL DEFAULT 'active',
    verifiedStatus tinyint(1) DEFAULT FALSE,
    profilePhotoUrl varchar(500),
+   providerRatingCount int NOT NULL DEFAULT 0,
+   providerRatingSum int NOT NULL DEFAULT 0,
+   providerRatingScore decimal(6, 4) DEFAULT NULL,
    INDEX idx_first_name (firstName),
-   INDEX idx_last_name (lastName)
+   INDEX idx_last_name (lastName),
+   INDEX idx_student_provider_rating (providerRatingScore)
 );
 
 
@@ -48,6 +52,9 @@ CREATE TABLE listing(
    createDate datetime NOT NULL DEFAULT CURRENT_TIMESTAMP,
    lastUpdate datetime NOT NULL,
    listingStatus ENUM('draft','active','inactive','removed') NOT NULL,
+   ratingCount int NOT NULL DEFAULT 0,
+   ratingSum int NOT NULL DEFAULT 0,
+   ratingScore decimal(6, 4) DEFAULT NULL,
    FOREIGN KEY (categoryId) REFERENCES category(categoryId)
                    ON UPDATE CASCADE
                    ON DELETE RESTRICT,
@@ -55,7 +62,8 @@ CREATE TABLE listing(
                    ON UPDATE CASCADE
                    ON DELETE SET NULL,
    INDEX idx_listing_category (categoryId),
-   INDEX idx_listing_provider (providerId)
+   INDEX idx_listing_provider (providerId),
+   INDEX idx_listing_rating_score (ratingScore)
 );
 
 
@@ -70,6 +78,8 @@ CREATE TABLE transact(
    paymentAmt decimal(7, 2),
    platformFee decimal(7, 2),
    agreementDetails mediumtext,
+   -- bumped on every status change; used for compare-and-set updates
+   version int NOT NULL DEFAULT 0,
    FOREIGN KEY (listId) REFERENCES listing(listingId)
                        ON UPDATE CASCADE
                        ON DELETE RESTRICT,
@@ -77,10 +87,52 @@ CREATE TABLE transact(
                        ON UPDATE CASCADE
                        ON DELETE RESTRICT,
    INDEX idx_transact_buyer (buyerId),
-   INDEX idx_transact_listing (listId)
+   INDEX idx_transact_listing (listId),
+   INDEX idx_transact_status_date (transactStatus, bookDate)
 );
 
 
+-- Completed and cancelled bookings older than TRANSACT_ARCHIVE_RETENTION_DAYS,
+-- moved out of transact by the archiver (backend/transactions/transaction_archive.py).
+-- Same columns as transact; rows keep their transactId.
+DROP TABLE IF EXISTS transact_archive;
+CREATE TABLE transact_archive(
+   transactId int PRIMARY KEY,
+   buyerId int NOT NULL,
+   listId int NOT NULL,
+   bookDate datetime NOT NULL,
+   transactStatus ENUM('requested', 'confirmed', 'completed', 'cancelled') NOT NULL,
+   fulfillmentDate datetime,
+   paymentAmt decimal(7, 2),
+   platformFee decimal(7, 2),
+   agreementDetails mediumtext,
+   version int NOT NULL DEFAULT 0,
+   archivedAt datetime NOT NULL DEFAULT CURRENT_TIMESTAMP,
+   FOREIGN KEY (listId) REFERENCES listing(listingId)
+                       ON UPDATE CASCADE
+                       ON DELETE RESTRICT,
+   FOREIGN KEY (buyerId) REFERENCES student(stuId)
+                       ON UPDATE CASCADE
+                       ON DELETE RESTRICT,
+   INDEX idx_transact_archive_buyer (buyerId),
+   INDEX idx_transact_archive_listing (listId),
+   INDEX idx_transact_archive_date (bookDate)
+);
+
+
+-- Every booking, current and archived. Current views (pending requests,
+-- My Bookings) read transact directly; history and analytics read this.
+DROP VIEW IF EXISTS transact_all;
+CREATE VIEW transact_all AS
+   SELECT transactId, buyerId, listId, bookDate, transactStatus, fulfillmentDate,
+          paymentAmt, platformFee, agreementDetails, version
+   FROM transact
+   UNION ALL
+   SELECT transactId, buyerId, listId, bookDate, transactStatus, fulfillmentDate,
+          paymentAmt, platformFee, agreementDetails, version
+   FROM transact_archive;
+
+
 DROP TABLE IF EXISTS availability;
 CREATE TABLE availability(
    listId int NOT NULL,
@@ -110,9 +162,25 @@ CREATE TABLE review(
                   ON UPDATE CASCADE
                   ON DELETE SET NULL,
    INDEX idx_review_reviewer (reviewerId),
-   INDEX idx_review_listing (listId)
+   INDEX idx_review_listing_date (listId, createDate)
+);
+
+
+-- Global prior for the Bayesian rating scores on listing and student:
+-- the running review count and rating sum across every review, and the
+-- prior mean the stored scores were computed with
+-- (see backend/review/rating_score.py)
+DROP TABLE IF EXISTS rating_prior;
+CREATE TABLE rating_prior(
+   priorId tinyint PRIMARY KEY,
+   priorWeight decimal(6, 2) NOT NULL DEFAULT 5,
+   reviewCount bigint NOT NULL DEFAULT 0,
+   ratingSum bigint NOT NULL DEFAULT 0,
+   scoredMean decimal(6, 4) NOT NULL DEFAULT 3
 );
 
+INSERT INTO rating_prior (priorId) VALUES (1);
+
 
 DROP TABLE IF EXISTS admin;
 CREATE TABLE admin(
@@ -163,7 +231,9 @@ CREATE TABLE suspension(
                       ON DELETE RESTRICT,
    FOREIGN KEY (reportId) REFERENCES report(reportId)
                       ON UPDATE CASCADE
-                      ON DELETE RESTRICT
+                      ON DELETE RESTRICT,
+   INDEX idx_suspension_end (endDate),
+   INDEX idx_suspension_student (stuId, endDate)
 );
 
 
@@ -181,3 +251,42 @@ CREATE TABLE admin_notes(
                        ON UPDATE CASCADE
                        ON DELETE RESTRICT
 );
+
+
+-- Responses of create requests sent with an Idempotency-Key header,
+-- replayed when the client retries the same request
+DROP TABLE IF EXISTS idempotency_key;
+CREATE TABLE idempotency_key(
+   scope varchar(50) NOT NULL,
+   idemKey varchar(100) NOT NULL,
+   requestHash char(64) NOT NULL,
+   statusCode int,
+   responseBody mediumtext,
+   createDate datetime NOT NULL DEFAULT CURRENT_TIMESTAMP,
+   expiresAt datetime NOT NULL,
+   PRIMARY KEY (scope, idemKey),
+   INDEX idx_idempotency_expires (expiresAt)
+);
+
+
+-- Transactional outbox: one row per committed marketplace change,
+-- written in the same transaction as the change itself
+DROP TABLE IF EXISTS outbox_event;
+CREATE TABLE outbox_event(
+   eventId bigint PRIMARY KEY AUTO_INCREMENT,
+   eventType varchar(50) NOT NULL,
+   entity varchar(30) NOT NULL,
+   entityId int NOT NULL,
+   payload json NOT NULL,
+   createDate datetime(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+   INDEX idx_outbox_created (createDate)
+);
+
+
+-- Last eventId each durable outbox consumer has processed
+DROP TABLE IF EXISTS outbox_offset;
+CREATE TABLE outbox_offset(
+   consumer varchar(50) PRIMARY KEY,
+   lastEventId bigint NOT NULL DEFAULT 0,
+   updatedAt datetime NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,42 @@
+USE HuskyHub;
+
+-- Rating counters, global prior and Bayesian scores for the seeded reviews.
+-- The API keeps them current from then on (backend/review/rating_score.py).
+UPDATE listing l
+INNER JOIN (
+   SELECT listId, COUNT(*) AS reviews, SUM(rating) AS total
+   FROM review
+   GROUP BY listId
+) r ON r.listId = l.listingId
+SET l.ratingCount = r.reviews,
+    l.ratingSum = r.total;
+
+UPDATE student s
+INNER JOIN (
+   SELECT providerId, SUM(ratingCount) AS reviews, SUM(ratingSum) AS total
+   FROM listing
+   GROUP BY providerId
+) r ON r.providerId = s.stuId
+SET s.providerRatingCount = r.reviews,
+    s.providerRatingSum = r.total;
+
+UPDATE rating_prior p
+INNER JOIN (
+   SELECT COUNT(*) AS reviews, COALESCE(SUM(rating), 0) AS total
+   FROM review
+) r
+SET p.reviewCount = r.reviews,
+    p.ratingSum = r.total,
+    p.scoredMean = IF(r.reviews > 0, r.total / r.reviews, 3)
+WHERE p.priorId = 1;
+
+UPDATE listing l
+INNER JOIN rating_prior p ON p.priorId = 1
+SET l.ratingScore = (p.priorWeight * p.scoredMean + l.ratingSum) / (p.priorWeight + l.ratingCount)
+WHERE l.ratingCount > 0;
+
+UPDATE student s
+INNER JOIN rating_prior p ON p.priorId = 1
+SET s.providerRatingScore = (p.priorWeight * p.scoredMean + s.providerRatingSum)
+                            / (p.priorWeight + s.providerRatingCount)
+WHERE s.providerRatingCount > 0;
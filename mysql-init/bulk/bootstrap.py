@@ -0,0 +1,323 @@
+"""
+Bulk-load bootstrap for the HuskyHub MySQL image.
+
+The seed scripts in mysql-init/ insert one row per statement, which
+the MySQL entrypoint replays through the client on first start. This
+script turns them into one tab-separated file per table and an init
+directory that:
+
+    01_create_tables_and_data.sql  schema with secondary indexes removed
+    02_bulk_load.sql               LOAD DATA INFILE per table, FK and unique checks off
+    03_create_indexes.sql          the removed indexes, one ALTER TABLE per table
+    04_post_load.sql               seed scripts without INSERTs (backfills), in order
+
+Modes:
+    sql        copy the seed scripts unchanged (the original behaviour)
+    bulk       convert the seed scripts to TSV and load them in bulk
+    generated  bulk-load a directory produced by benchmarks/datagen.py
+
+The Dockerfile runs this in a build stage, so no generated file is
+committed to the repository.
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import shutil
+import sys
+
+
+# Where the MySQL image allows server-side LOAD DATA INFILE (secure_file_priv)
+SERVER_FILE_DIR = "/var/lib/mysql-files/seed"
+
+NULL = "\\N"
+
+_INSERT = re.compile(r"insert\s+into\s+(\w+)\s*\(([^)]*)\)\s*values\s*", re.IGNORECASE)
+_CREATE_TABLE = re.compile(r"CREATE\s+TABLE\s+(\w+)\s*\(", re.IGNORECASE)
+_INDEX_ITEM = re.compile(r"^(?:INDEX|KEY)\s+(\w+)\s*\((.*)\)$", re.IGNORECASE | re.DOTALL)
+
+
+# ============================================
+# Seed script parsing
+# ============================================
+def _read_value(text, pos):
+    """Parse one SQL literal starting at pos; returns (python value, next pos)"""
+    if text[pos] == "'":
+        chars = []
+        pos += 1
+        while True:
+            ch = text[pos]
+            if ch == "\\":
+                chars.append({"n": "\n", "t": "\t", "r": "\r", "0": "\0"}.get(text[pos + 1], text[pos + 1]))
+                pos += 2
+            elif ch == "'":
+                if pos + 1 < len(text) and text[pos + 1] == "'":
+                    chars.append("'")
+                    pos += 2
+                else:
+                    return "".join(chars), pos + 1
+            else:
+                chars.append(ch)
+                pos += 1
+
+    match = re.compile(r"[^,)\s]+").match(text, pos)
+    token = match.group(0)
+    lowered = token.lower()
+    if lowered == "null":
+        return None, match.end()
+    if lowered == "true":
+        return "1", match.end()
+    if lowered == "false":
+        return "0", match.end()
+    return token, match.end()
+
+
+def _skip_space(text, pos):
+    while pos < len(text) and text[pos].isspace():
+        pos += 1
+    return pos
+
+
+def parse_inserts(sql):
+    """Yield (table, columns, rows) for each INSERT ... VALUES statement"""
+    pos = 0
+    while True:
+        match = _INSERT.search(sql, pos)
+        if match is None:
+            return
+        table = match.group(1)
+        columns = [c.strip() for c in match.group(2).split(",")]
+        pos = match.end()
+        rows = []
+
+        while True:
+            pos = _skip_space(sql, pos)
+            if sql[pos] != "(":
+                raise ValueError(f"Expected '(' in INSERT INTO {table} at offset {pos}")
+            pos += 1
+            row = []
+            while True:
+                pos = _skip_space(sql, pos)
+                value, pos = _read_value(sql, pos)
+                row.append(value)
+                pos = _skip_space(sql, pos)
+                if sql[pos] == ",":
+                    pos += 1
+                    continue
+                if sql[pos] == ")":
+                    pos += 1
+                    break
+                raise ValueError(f"Unexpected {sql[pos]!r} in INSERT INTO {table} at offset {pos}")
+
+            if len(row) != len(columns):
+                raise ValueError(f"INSERT INTO {table}: {len(columns)} columns but {len(row)} values")
+            rows.append(row)
+
+            pos = _skip_space(sql, pos)
+            if sql[pos] == ",":
+                pos += 1
+                continue
+            break
+
+        yield table, columns, rows
+
+
+def _escape(value):
+    if value is None:
+        return NULL
+    return (str(value).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+
+def convert_seed_scripts(sql_dir, files_dir):
+    """Write one TSV per table from the NN_*.sql seed scripts; returns the manifest"""
+    tables = []
+    columns = {}
+    rows = {}
+    handles = {}
+
+    try:
+        for path in sorted(glob.glob(os.path.join(sql_dir, "*.sql"))):
+            if os.path.basename(path).startswith("01_"):
+                continue
+            with open(path, encoding="utf-8") as f:
+                sql = f.read()
+
+            for table, cols, values in parse_inserts(sql):
+                if table not in columns:
+                    tables.append(table)
+                    columns[table] = cols
+                    rows[table] = 0
+                    handles[table] = open(os.path.join(files_dir, f"{table}.tsv"), "w",
+                                          encoding="utf-8", newline="\n")
+                elif columns[table] != cols:
+                    # Same table with a different column list: reorder to the first one
+                    index = [cols.index(c) for c in columns[table]]
+                    values = [[row[i] for i in index] for row in values]
+
+                for row in values:
+                    handles[table].write("\t".join(_escape(v) for v in row) + "\n")
+                rows[table] += len(values)
+    finally:
+        for handle in handles.values():
+            handle.close()
+
+    return {"tables": tables, "columns": columns, "rows": rows}
+
+
+def post_load_scripts(sql_dir):
+    """
+    Seed scripts that insert nothing, e.g. backfills computed from the
+    loaded rows. They run after the bulk load, in file order.
+    """
+    scripts = []
+    for path in sorted(glob.glob(os.path.join(sql_dir, "*.sql"))):
+        if os.path.basename(path).startswith("01_"):
+            continue
+        with open(path, encoding="utf-8") as f:
+            sql = f.read()
+        if next(parse_inserts(sql), None) is None:
+            scripts.append(sql)
+    return scripts
+
+
+# ============================================
+# Schema handling
+# ============================================
+def _split_top_level(body):
+    items, depth, current = [], 0, []
+    for ch in body:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            items.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    if "".join(current).strip():
+        items.append("".join(current).strip())
+    return items
+
+
+def defer_secondary_indexes(schema_sql):
+    """
+    Remove plain INDEX/KEY definitions from every CREATE TABLE.
+    Returns (schema without them, list of ALTER TABLE statements adding them back).
+    PRIMARY KEY, UNIQUE and FOREIGN KEY definitions stay in place.
+    """
+    output = []
+    alters = []
+    pos = 0
+
+    for match in _CREATE_TABLE.finditer(schema_sql):
+        table = match.group(1)
+        body_start = match.end()
+        depth = 1
+        i = body_start
+        while depth:
+            if schema_sql[i] == "(":
+                depth += 1
+            elif schema_sql[i] == ")":
+                depth -= 1
+            i += 1
+        body_end = i - 1
+
+        kept, indexes = [], []
+        for item in _split_top_level(schema_sql[body_start:body_end]):
+            index = _INDEX_ITEM.match(item)
+            if index:
+                indexes.append(f"ADD INDEX {index.group(1)} ({index.group(2).strip()})")
+            else:
+                kept.append(item)
+
+        output.append(schema_sql[pos:body_start])
+        output.append("\n   " + ",\n   ".join(kept) + "\n")
+        pos = body_end
+        if indexes:
+            alters.append(f"ALTER TABLE {table}\n   " + ",\n   ".join(indexes) + ";")
+
+    output.append(schema_sql[pos:])
+    return "".join(output), alters
+
+
+def render_load_script(manifest, database):
+    lines = [
+        f"USE {database};",
+        "SET FOREIGN_KEY_CHECKS = 0;",
+        "SET UNIQUE_CHECKS = 0;",
+        "SET autocommit = 0;",
+    ]
+    for table in manifest["tables"]:
+        cols = ", ".join(manifest["columns"][table])
+        lines.append(
+            f"LOAD DATA INFILE '{SERVER_FILE_DIR}/{table}.tsv' INTO TABLE {table} "
+            f"CHARACTER SET utf8mb4 FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({cols});"
+        )
+        lines.append("COMMIT;")
+    lines += [
+        "SET autocommit = 1;",
+        "SET UNIQUE_CHECKS = 1;",
+        "SET FOREIGN_KEY_CHECKS = 1;",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def build(args):
+    initdb_dir = os.path.join(args.out, "initdb")
+    files_dir = os.path.join(args.out, "files")
+    os.makedirs(initdb_dir, exist_ok=True)
+    os.makedirs(files_dir, exist_ok=True)
+
+    schema_path = os.path.join(args.sql_dir, "01_create_tables_and_data.sql")
+
+    if args.mode == "sql":
+        for path in sorted(glob.glob(os.path.join(args.sql_dir, "*.sql"))):
+            shutil.copy(path, initdb_dir)
+        print(f"sql mode: copied seed scripts to {initdb_dir}")
+        return 0
+
+    if args.mode == "bulk":
+        manifest = convert_seed_scripts(args.sql_dir, files_dir)
+    else:
+        with open(os.path.join(args.data_dir, "manifest.json")) as f:
+            manifest = json.load(f)
+        for table in manifest["tables"]:
+            shutil.copy(os.path.join(args.data_dir, f"{table}.tsv"), files_dir)
+
+    with open(schema_path, encoding="utf-8") as f:
+        schema, alters = defer_secondary_indexes(f.read())
+
+    with open(os.path.join(initdb_dir, "01_create_tables_and_data.sql"), "w", encoding="utf-8") as f:
+        f.write(schema)
+    with open(os.path.join(initdb_dir, "02_bulk_load.sql"), "w", encoding="utf-8") as f:
+        f.write(render_load_script(manifest, args.database))
+    with open(os.path.join(initdb_dir, "03_create_indexes.sql"), "w", encoding="utf-8") as f:
+        f.write(f"USE {args.database};\n" + "\n".join(alters) + "\n")
+    with open(os.path.join(initdb_dir, "04_post_load.sql"), "w", encoding="utf-8") as f:
+        f.write("\n".join(post_load_scripts(args.sql_dir)))
+
+    for table in manifest["tables"]:
+        print(f"{args.mode} mode: {table:14} {manifest['rows'].get(table, 0):>10,} rows")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the MySQL init directory")
+    parser.add_argument("--mode", choices=["sql", "bulk", "generated"], default="bulk")
+    parser.add_argument("--sql-dir", default=os.path.join(os.path.dirname(__file__), ".."),
+                        help="directory holding the NN_*.sql seed scripts")
+    parser.add_argument("--data-dir", help="benchmarks/datagen.py output (generated mode)")
+    parser.add_argument("--database", default="HuskyHub")
+    parser.add_argument("--out", required=True, help="output directory (initdb/ and files/)")
+    args = parser.parse_args(argv)
+
+    if args.mode == "generated" and not args.data_dir:
+        parser.error("--data-dir is required in generated mode")
+    return build(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())